@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""Offline throughput benchmark for DataIngestionAgent.
+
+Yahoo Finance is replaced by deterministic in-process ``yf.Ticker`` stand-ins
+and Alpha Vantage by a local HTTP stub, both with configurable latency and
+payload size, so only the agent and the database are measured. Runs against
+the Postgres configured in ``.env`` using synthetic ``BX0001``-style tickers,
+whose rows are deleted afterwards unless ``--keep-data`` is given.
+
+Reports tickers/sec, DB statements per ticker (mean and max, from
+``aurora.database.sql_profiler``), statement shapes repeated within one ticker,
+p50/p99 per-ticker latency and peak memory for each watchlist size.
+
+Usage:
+    python scripts/benchmark_ingestion.py --sizes 10,100,1000
+    python scripts/benchmark_ingestion.py --sizes 100 --concurrency 16 --repeat 2 --json bench.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+from aiohttp import web
+from sqlalchemy import delete, select
+
+# Add project root to path
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+
+from aurora.agents.data_ingestion import DataIngestionAgent, _STATEMENT_ROWS
+from aurora.database import AsyncSessionLocal, async_engine, sql_profiler
+from aurora.log import configure_logging
+from aurora.models import (
+    Company,
+    FinancialData,
+    FinancialMetrics,
+    FinancialMetricsInput,
+    IngestionWatermark,
+    NewsArticle,
+    NewsArticleCompany,
+    SentimentDaily,
+)
+from aurora.providers import configure_rate_limiter, get_provider_cache
+
+logger = logging.getLogger("AuroraBenchmark")
+
+TICKER_PREFIX = "BX"
+# Exactly the generated symbols; a plain prefix match would also hit listed
+# tickers such as BX, BXP or BXMT
+TICKER_PATTERN = f"^{TICKER_PREFIX}[0-9]{{4}}$"
+NEWS_URL_PREFIX = "https://bench.example/"
+
+
+def bench_tickers(count: int) -> List[str]:
+    return [f"{TICKER_PREFIX}{i:04d}" for i in range(1, count + 1)]
+
+
+def _rng(*parts: str) -> random.Random:
+    # crc32 rather than hash() so payloads are identical across processes
+    return random.Random(zlib.crc32(":".join(parts).encode()))
+
+
+class StubYahooTicker:
+    """Deterministic stand-in for ``yf.Ticker`` with a fixed per-call latency.
+
+    Each statement has the mapped line items plus ``extra_rows`` filler rows
+    (real yfinance statements carry ~40) over ``periods`` quarter-ends.
+    """
+
+    latency = 0.0
+    periods = 8
+    extra_rows = 30
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    def _statement(self, statement: str, annual: bool) -> pd.DataFrame:
+        time.sleep(self.latency)
+        rng = _rng(self.ticker, statement, str(annual))
+        step = 12 if annual else 3
+        columns = pd.DatetimeIndex([
+            pd.Timestamp("2024-12-31") - pd.DateOffset(months=step * i) for i in range(self.periods)
+        ])
+        rows = list(_STATEMENT_ROWS[statement]) + [f"Filler Item {i}" for i in range(self.extra_rows)]
+        # Per-share rows stay in NUMERIC(10,3) range
+        values = [
+            [rng.uniform(-2, 10) if row.endswith("EPS") else rng.uniform(1e6, 1e11) for _ in columns]
+            for row in rows
+        ]
+        return pd.DataFrame(values, index=rows, columns=columns)
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        rng = _rng(self.ticker, "info")
+        return {
+            "longName": f"{self.ticker} Benchmark Corp",
+            "sector": rng.choice(["Technology", "Healthcare", "Energy", "Financials"]),
+            "industry": "Benchmarking",
+            "country": "United States",
+            "currency": "USD",
+            "marketCap": rng.randint(10**9, 10**12),
+        }
+
+    quarterly_financials = property(lambda self: self._statement("financials", False))
+    quarterly_balance_sheet = property(lambda self: self._statement("balance_sheet", False))
+    quarterly_cashflow = property(lambda self: self._statement("cashflow", False))
+    financials = property(lambda self: self._statement("financials", True))
+    balance_sheet = property(lambda self: self._statement("balance_sheet", True))
+    cashflow = property(lambda self: self._statement("cashflow", True))
+
+
+def _news_item(ticker_pairs: List[str], index: int, published: datetime, rng: random.Random) -> Dict[str, Any]:
+    key = "-".join(ticker_pairs)
+    return {
+        "title": f"Benchmark headline {key} #{index}",
+        "url": f"{NEWS_URL_PREFIX}{key}/{index}",
+        "time_published": published.strftime("%Y%m%dT%H%M%S"),
+        "summary": "Lorem ipsum " * rng.randint(5, 40),
+        "source": "Benchmark Wire",
+        "overall_sentiment_score": round(rng.uniform(-1, 1), 3),
+        "overall_sentiment_label": "Neutral",
+        "ticker_sentiment": [
+            {
+                "ticker": ticker,
+                "relevance_score": str(round(rng.uniform(0.05, 1), 3)),
+                "ticker_sentiment_score": str(round(rng.uniform(-1, 1), 3)),
+                "ticker_sentiment_label": "Neutral",
+            }
+            for ticker in ticker_pairs
+        ],
+    }
+
+
+def create_alpha_vantage_stub(watchlist: List[str], latency: float, items_per_ticker: int) -> web.Application:
+    """NEWS_SENTIMENT stand-in: per-ticker feeds plus an unfiltered batched feed.
+
+    Items are spaced a minute apart ending at server start, and every fifth
+    article also mentions the next ticker, so shared articles are exercised.
+    ``time_from`` and ``limit`` are honoured.
+    """
+    started = datetime.now(timezone.utc).replace(microsecond=0)
+    positions = {ticker: i for i, ticker in enumerate(watchlist)}
+
+    def neighbour(ticker: str, offset: int) -> str:
+        if ticker not in positions:
+            return ticker
+        return watchlist[(positions[ticker] + offset) % len(watchlist)]
+
+    def own_feed(ticker: str) -> List[Dict[str, Any]]:
+        rng = _rng(ticker, "news")
+        other = neighbour(ticker, 1)
+        return [
+            _news_item(
+                [ticker, other] if i % 5 == 0 and other != ticker else [ticker],
+                i,
+                started - timedelta(minutes=i),
+                rng,
+            )
+            for i in range(items_per_ticker)
+        ]
+
+    async def query(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        params = request.query
+        if params.get("function") != "NEWS_SENTIMENT":
+            return web.json_response({"Information": "unsupported function"})
+        tickers = [t for t in params.get("tickers", "").split(",") if t]
+        if tickers:
+            # A filtered feed also carries the previous ticker's articles that mention it
+            items = [
+                item
+                for ticker in tickers
+                for source in {ticker, neighbour(ticker, -1)}
+                for item in own_feed(source)
+                if any(entry["ticker"] == ticker for entry in item["ticker_sentiment"])
+            ]
+        else:
+            items = [item for ticker in watchlist for item in own_feed(ticker)]
+        if "time_from" in params:
+            since = params["time_from"] + "00"
+            items = [item for item in items if item["time_published"] >= since]
+        items.sort(key=lambda item: item["time_published"], reverse=True)
+        limit = int(params.get("limit", "50"))
+        return web.json_response({"items": str(min(limit, len(items))), "feed": items[:limit]})
+
+    app = web.Application()
+    app.router.add_get("/query", query)
+    return app
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run_round(tickers: List[str], args: argparse.Namespace, av_url: str) -> Dict[str, Any]:
+    """Ingest ``tickers`` once and measure it."""
+    agent = DataIngestionAgent({
+        "yahoo_client": StubYahooTicker,
+        "alpha_vantage_url": av_url,
+        "alpha_vantage_key": "benchmark",
+        "max_concurrency": args.concurrency,
+        "backfill": args.backfill,
+        "news_batch": args.news_batch,
+        "news_feed_limit": args.news_items,
+    })
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with sql_profiler.profile(async_engine):
+            results = await agent.run(tickers)
+    finally:
+        elapsed = time.perf_counter() - started
+        peak_bytes = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+        if args.trace_memory:
+            tracemalloc.stop()
+
+    latencies = [result["seconds"] for result in results.values()]
+    sql = sql_profiler.summary(unit="ticker")
+    return {
+        "tickers": len(tickers),
+        "seconds": round(elapsed, 3),
+        "tickers_per_sec": round(len(tickers) / elapsed, 2) if elapsed else 0.0,
+        "statements": sql["statements"],
+        "statements_per_ticker": round(sql["statements"] / len(tickers), 2),
+        "max_statements_per_ticker": sql.get("max_statements_per_ticker", 0),
+        "db_seconds": sql["seconds"],
+        "repeated_shapes": len(sql_profiler.repeated(unit="ticker")),
+        "p50_seconds": round(percentile(latencies, 0.50), 4),
+        "p99_seconds": round(percentile(latencies, 0.99), 4),
+        "errors": sum(1 for result in results.values() if result["status"] != "ok"),
+        "peak_traced_mb": round(peak_bytes / 2**20, 1) if peak_bytes is not None else None,
+        # ru_maxrss is KiB on Linux: the process-wide high-water mark so far
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+async def delete_bench_data() -> None:
+    """Remove every row created for benchmark tickers and articles."""
+    async with AsyncSessionLocal() as session:
+        is_bench = Company.ticker.regexp_match(TICKER_PATTERN)
+        company_ids = select(Company.id).where(is_bench)
+        await session.execute(delete(NewsArticleCompany).where(NewsArticleCompany.company_id.in_(company_ids)))
+        await session.execute(delete(NewsArticle).where(NewsArticle.url.like(f"{NEWS_URL_PREFIX}%")))
+        await session.execute(delete(FinancialData).where(FinancialData.company_id.in_(company_ids)))
+        await session.execute(delete(FinancialMetrics).where(FinancialMetrics.company_id.in_(company_ids)))
+        await session.execute(
+            delete(FinancialMetricsInput).where(FinancialMetricsInput.company_id.in_(company_ids))
+        )
+        await session.execute(delete(IngestionWatermark).where(IngestionWatermark.company_id.in_(company_ids)))
+        await session.execute(delete(SentimentDaily).where(SentimentDaily.company_id.in_(company_ids)))
+        await session.execute(delete(Company).where(is_bench))
+        await session.commit()
+
+
+async def benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    StubYahooTicker.latency = args.yahoo_latency
+    StubYahooTicker.periods = args.periods
+    StubYahooTicker.extra_rows = args.extra_rows
+    # The stand-ins have no quota; measure the agent, not the limiter
+    configure_rate_limiter("yahoo")
+    configure_rate_limiter("alpha_vantage")
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    app = create_alpha_vantage_stub(bench_tickers(max(sizes)), args.av_latency, args.news_items)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    av_url = f"http://{host}:{port}/query"
+
+    report: List[Dict[str, Any]] = []
+    try:
+        for size in sizes:
+            await delete_bench_data()
+            get_provider_cache().clear()
+            for attempt in range(1, args.repeat + 1):
+                # Later attempts re-ingest the same tickers: the incremental path
+                row = await run_round(bench_tickers(size), args, av_url)
+                row["run"] = "cold" if attempt == 1 else f"warm{attempt - 1}"
+                report.append(row)
+                get_provider_cache().clear()
+    finally:
+        if not args.keep_data:
+            await delete_bench_data()
+        await runner.cleanup()
+        await async_engine.dispose()
+    return report
+
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    columns = [
+        ("tickers", "tickers"), ("run", "run"), ("tickers_per_sec", "tickers/s"),
+        ("statements_per_ticker", "stmts/ticker"), ("max_statements_per_ticker", "max stmts"),
+        ("repeated_shapes", "repeats"), ("p50_seconds", "p50 s"),
+        ("p99_seconds", "p99 s"), ("peak_traced_mb", "peak MB"), ("max_rss_mb", "rss MB"),
+        ("errors", "errors"),
+    ]
+    widths = [max(len(title), *(len(str(row[key])) for row in report)) for key, title in columns]
+    print("  ".join(title.rjust(width) for (_, title), width in zip(columns, widths)))
+    for row in report:
+        print("  ".join(str(row[key]).rjust(width) for (key, _), width in zip(columns, widths)))
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark DataIngestionAgent against stub providers")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated watchlist sizes")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size (later runs are incremental)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--yahoo-latency", type=float, default=0.05, help="Seconds per yfinance call")
+    parser.add_argument("--av-latency", type=float, default=0.1, help="Seconds per Alpha Vantage call")
+    parser.add_argument("--periods", type=int, default=8, help="Periods per financial statement")
+    parser.add_argument("--extra-rows", type=int, default=30, help="Unmapped rows per statement")
+    parser.add_argument("--news-items", type=int, default=50, help="Articles per ticker feed")
+    parser.add_argument("--backfill", action="store_true", help="Store every statement period")
+    parser.add_argument("--news-batch", action="store_true", help="Use the batched news feed")
+    parser.add_argument("--trace-memory", action="store_true", help="Track peak Python heap (slower)")
+    parser.add_argument("--keep-data", action="store_true", help="Leave benchmark rows in the database")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    configure_logging(level="WARNING")
+    report = asyncio.run(benchmark(args))
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Recompute derived financial ratios and TTM/growth metrics."""
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parents[1]
+sys.path.append(str(project_root))
+
+from aurora.analytics.fundamentals import main
+from aurora.log import configure_logging
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
@@ -9,6 +9,7 @@ project_root = Path(__file__).resolve().parents[1]
 sys.path.append(str(project_root))
 
 from aurora.agents.data_ingestion import DataIngestionAgent
+from aurora.log import configure_logging
 
 async def main():
     """Test data ingestion for sample tickers."""
@@ -21,10 +22,12 @@ async def main():
         print("Starting data ingestion test...")
         await agent.run(test_tickers)
         print("Data ingestion completed successfully!")
+        print(agent.metrics.export_json(indent=2))
         
     except Exception as e:
         print(f"Error during data ingestion: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
+    configure_logging()
     asyncio.run(main())
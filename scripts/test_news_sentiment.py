@@ -5,17 +5,18 @@ from dotenv import load_dotenv
 from sqlalchemy import select, func
 from aurora.agents.data_ingestion import DataIngestionAgent
 from aurora.database import Base, engine, SessionLocal
-from aurora.models import Company, NewsSentiment
+from aurora.log import configure_logging
+from aurora.models import Company, NewsArticle, NewsArticleCompany
 
 async def validate_data(session):
     """Validate the ingested news sentiment data."""
     # Get count of news items per company
     stmt = select(
         Company.ticker,
-        func.count(NewsSentiment.id).label('news_count'),
-        func.min(NewsSentiment.sentiment_score).label('min_score'),
-        func.max(NewsSentiment.sentiment_score).label('max_score')
-    ).join(NewsSentiment).group_by(Company.ticker)
+        func.count(NewsArticleCompany.article_id).label('news_count'),
+        func.min(NewsArticle.sentiment_score).label('min_score'),
+        func.max(NewsArticle.sentiment_score).label('max_score')
+    ).join(NewsArticleCompany).join(NewsArticle).group_by(Company.ticker)
     
     results = session.execute(stmt).all()
     
@@ -64,4 +65,5 @@ async def main():
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     asyncio.run(main())
@@ -31,6 +31,8 @@ CREATE TABLE IF NOT EXISTS financial_data (
     total_liabilities DECIMAL(20,2),
     total_equity DECIMAL(20,2),
     cash_and_equivalents DECIMAL(20,2),
+    current_assets DECIMAL(20,2),
+    current_liabilities DECIMAL(20,2),
     -- Cash Flow
     operating_cash_flow DECIMAL(20,2),
     investing_cash_flow DECIMAL(20,2),
@@ -63,6 +65,31 @@ CREATE TABLE IF NOT EXISTS news_sentiment (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- News articles, stored once and mapped to every company they mention
+CREATE TABLE IF NOT EXISTS news_articles (
+    id SERIAL PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT,
+    source VARCHAR(255) NOT NULL,
+    sentiment_score DECIMAL(4,3) CHECK (sentiment_score >= -1 AND sentiment_score <= 1),
+    sentiment_label VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- published_at is copied from the article for per-company timelines
+CREATE TABLE IF NOT EXISTS news_article_companies (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    article_id INTEGER NOT NULL REFERENCES news_articles(id),
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    relevance_score DECIMAL(4,3) CHECK (relevance_score >= 0 AND relevance_score <= 1),
+    ticker_sentiment_score DECIMAL(4,3) CHECK (ticker_sentiment_score >= -1 AND ticker_sentiment_score <= 1),
+    ticker_sentiment_label VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (company_id, article_id)
+);
+
 -- Research reports - generated by our agents
 CREATE TABLE IF NOT EXISTS research_reports (
     id SERIAL PRIMARY KEY,
@@ -79,11 +106,100 @@ CREATE TABLE IF NOT EXISTS research_reports (
     UNIQUE(company_id, report_type, report_date)
 );
 
+-- Checkpoints for the COPY-based bulk loader (aurora.bulk_load)
+CREATE TABLE IF NOT EXISTS bulk_load_progress (
+    id SERIAL PRIMARY KEY,
+    dataset VARCHAR(50) NOT NULL,
+    source TEXT NOT NULL,
+    source_size BIGINT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    rows_loaded BIGINT NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(dataset, source)
+);
+
+-- Per-company ingestion watermarks for incremental fetches
+-- cursor holds the URLs published exactly at watermark_at
+CREATE TABLE IF NOT EXISTS ingestion_watermarks (
+    id SERIAL PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    source VARCHAR(50) NOT NULL,
+    watermark_at TIMESTAMP WITH TIME ZONE,
+    cursor TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(company_id, source)
+);
+
+-- Durable per-ticker ingestion jobs claimed with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id SERIAL PRIMARY KEY,
+    ticker VARCHAR(10) NOT NULL UNIQUE,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    interval_seconds INTEGER,
+    next_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Precomputed per-company daily sentiment (aurora.analytics.sentiment)
+CREATE TABLE IF NOT EXISTS sentiment_daily (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    day DATE NOT NULL,
+    article_count INTEGER NOT NULL,
+    scored_count INTEGER NOT NULL,
+    mean_sentiment DECIMAL(5,4),
+    ewma_sentiment DECIMAL(5,4),
+    mean_7d DECIMAL(5,4),
+    count_7d INTEGER NOT NULL,
+    mean_30d DECIMAL(5,4),
+    count_30d INTEGER NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (company_id, day)
+);
+
+-- TTM sums and growth rates computed by aurora.analytics.fundamentals
+CREATE TABLE IF NOT EXISTS financial_metrics (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    report_date DATE NOT NULL,
+    report_type VARCHAR(10) NOT NULL CHECK (report_type IN ('10-K', '10-Q')),
+    revenue_ttm DECIMAL(20,2),
+    operating_income_ttm DECIMAL(20,2),
+    net_income_ttm DECIMAL(20,2),
+    operating_cash_flow_ttm DECIMAL(20,2),
+    eps_diluted_ttm DECIMAL(10,3),
+    revenue_growth_qoq DECIMAL(12,4),
+    revenue_growth_yoy DECIMAL(12,4),
+    net_income_growth_qoq DECIMAL(12,4),
+    net_income_growth_yoy DECIMAL(12,4),
+    eps_growth_yoy DECIMAL(12,4),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (company_id, report_date, report_type)
+);
+
+-- Hash of the statement inputs each company's metrics were computed from
+CREATE TABLE IF NOT EXISTS financial_metrics_inputs (
+    company_id INTEGER PRIMARY KEY REFERENCES companies(id),
+    input_hash VARCHAR(32) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for performance
 CREATE INDEX idx_companies_ticker ON companies(ticker);
 CREATE INDEX idx_financial_data_company_date ON financial_data(company_id, report_date);
 CREATE INDEX idx_news_company_date ON news_sentiment(company_id, published_at);
 CREATE INDEX idx_reports_company_date ON research_reports(company_id, report_date);
+CREATE INDEX idx_article_companies_company_date ON news_article_companies(company_id, published_at);
+CREATE INDEX idx_article_companies_article ON news_article_companies(article_id);
+CREATE INDEX idx_article_companies_created ON news_article_companies(created_at);
+CREATE INDEX idx_ingestion_jobs_due ON ingestion_jobs(status, next_run_at);
 
 -- Update function for timestamps
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -0,0 +1,15 @@
+-- Checkpoints for the COPY-based bulk loader (aurora.bulk_load)
+-- One row per loaded file; chunks_done advances in the same transaction
+-- as each merged chunk so an interrupted load resumes where it stopped.
+CREATE TABLE IF NOT EXISTS bulk_load_progress (
+    id SERIAL PRIMARY KEY,
+    dataset VARCHAR(50) NOT NULL,
+    source TEXT NOT NULL,
+    source_size BIGINT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    rows_loaded BIGINT NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(dataset, source)
+);
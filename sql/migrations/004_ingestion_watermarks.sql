@@ -0,0 +1,13 @@
+-- Per-company ingestion watermarks for incremental fetches
+-- watermark_at is the newest item timestamp already stored for a source;
+-- cursor holds the URLs published exactly at that timestamp so items the
+-- provider returns again at the window boundary can be skipped.
+CREATE TABLE IF NOT EXISTS ingestion_watermarks (
+    id SERIAL PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    source VARCHAR(50) NOT NULL,
+    watermark_at TIMESTAMP WITH TIME ZONE,
+    cursor TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(company_id, source)
+);
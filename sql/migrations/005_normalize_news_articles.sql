@@ -0,0 +1,49 @@
+-- Store each news article once and map it to the companies it mentions.
+-- news_sentiment keyed articles by company under a globally unique url, so an
+-- article mentioning several companies could only belong to one of them.
+
+CREATE TABLE IF NOT EXISTS news_articles (
+    id SERIAL PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT,
+    source VARCHAR(255) NOT NULL,
+    sentiment_score DECIMAL(4,3) CHECK (sentiment_score >= -1 AND sentiment_score <= 1),
+    sentiment_label VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- published_at is copied from the article so per-company timelines are
+-- served from the narrow (company_id, published_at) index alone
+CREATE TABLE IF NOT EXISTS news_article_companies (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    article_id INTEGER NOT NULL REFERENCES news_articles(id),
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    relevance_score DECIMAL(4,3) CHECK (relevance_score >= 0 AND relevance_score <= 1),
+    ticker_sentiment_score DECIMAL(4,3) CHECK (ticker_sentiment_score >= -1 AND ticker_sentiment_score <= 1),
+    ticker_sentiment_label VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (company_id, article_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_companies_company_date
+    ON news_article_companies(company_id, published_at);
+CREATE INDEX IF NOT EXISTS idx_article_companies_article
+    ON news_article_companies(article_id);
+
+-- Backfill from the legacy per-company table
+INSERT INTO news_articles (url, published_at, title, summary, source, sentiment_score, sentiment_label, created_at)
+SELECT url, published_at, title, summary, source, sentiment_score, sentiment_label, created_at
+FROM news_sentiment
+ON CONFLICT (url) DO NOTHING;
+
+INSERT INTO news_article_companies (company_id, article_id, published_at, created_at)
+SELECT ns.company_id, a.id, a.published_at, ns.created_at
+FROM news_sentiment ns
+JOIN news_articles a ON a.url = ns.url
+WHERE ns.company_id IS NOT NULL
+ON CONFLICT (company_id, article_id) DO NOTHING;
+
+-- news_sentiment is no longer written by ingestion; it is kept for rollback
+-- and can be dropped once nothing reads it.
@@ -0,0 +1,23 @@
+-- Durable per-ticker ingestion jobs shared by every worker process.
+-- Workers claim due rows with SELECT ... FOR UPDATE SKIP LOCKED, so several
+-- containers can drain the queue without fetching the same ticker twice.
+-- locked_at is a lease renewed while a job runs; a running job whose lease
+-- expired (crashed worker) becomes claimable again.
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id SERIAL PRIMARY KEY,
+    ticker VARCHAR(10) NOT NULL UNIQUE,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    interval_seconds INTEGER,
+    next_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_due
+    ON ingestion_jobs(status, next_run_at);
@@ -0,0 +1,23 @@
+-- Precomputed per-company daily sentiment, refreshed incrementally by
+-- aurora.analytics.sentiment from news_article_companies rows newer than the
+-- company's 'sentiment_daily' ingestion watermark.
+-- Rows are dense from a company's first to its latest news day, so the
+-- rolling windows also cover quiet days.
+CREATE TABLE IF NOT EXISTS sentiment_daily (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    day DATE NOT NULL,
+    article_count INTEGER NOT NULL,
+    scored_count INTEGER NOT NULL,
+    mean_sentiment DECIMAL(5,4),
+    ewma_sentiment DECIMAL(5,4),
+    mean_7d DECIMAL(5,4),
+    count_7d INTEGER NOT NULL,
+    mean_30d DECIMAL(5,4),
+    count_30d INTEGER NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (company_id, day)
+);
+
+-- Incremental refresh looks up links by insertion time
+CREATE INDEX IF NOT EXISTS idx_article_companies_created
+    ON news_article_companies(created_at);
@@ -0,0 +1,25 @@
+-- Inputs for the current ratio, now mapped from the yfinance balance sheet
+ALTER TABLE financial_data ADD COLUMN IF NOT EXISTS current_assets DECIMAL(20,2);
+ALTER TABLE financial_data ADD COLUMN IF NOT EXISTS current_liabilities DECIMAL(20,2);
+
+-- TTM sums and growth rates computed by aurora.analytics.fundamentals, which
+-- also fills the ratio columns of financial_data. Companies are recomputed
+-- only when the hash of their financial_data inputs (kept in the
+-- 'financial_metrics' ingestion watermark cursor) changes.
+CREATE TABLE IF NOT EXISTS financial_metrics (
+    company_id INTEGER NOT NULL REFERENCES companies(id),
+    report_date DATE NOT NULL,
+    report_type VARCHAR(10) NOT NULL CHECK (report_type IN ('10-K', '10-Q')),
+    revenue_ttm DECIMAL(20,2),
+    operating_income_ttm DECIMAL(20,2),
+    net_income_ttm DECIMAL(20,2),
+    operating_cash_flow_ttm DECIMAL(20,2),
+    eps_diluted_ttm DECIMAL(10,3),
+    revenue_growth_qoq DECIMAL(12,4),
+    revenue_growth_yoy DECIMAL(12,4),
+    net_income_growth_qoq DECIMAL(12,4),
+    net_income_growth_yoy DECIMAL(12,4),
+    eps_growth_yoy DECIMAL(12,4),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (company_id, report_date, report_type)
+);
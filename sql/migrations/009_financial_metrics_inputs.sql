@@ -0,0 +1,12 @@
+-- Per-company hash of the financial_data statement columns the derived
+-- metrics were last computed from (aurora.analytics.fundamentals). Market
+-- cap is left out of the hash, so a price move only refreshes P/E and P/B.
+CREATE TABLE IF NOT EXISTS financial_metrics_inputs (
+    company_id INTEGER PRIMARY KEY REFERENCES companies(id),
+    input_hash VARCHAR(32) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- The hashes used to live in 'financial_metrics' ingestion watermarks and
+-- covered market cap; drop them so each company is recomputed once
+DELETE FROM ingestion_watermarks WHERE source = 'financial_metrics';
@@ -1,7 +1,13 @@
 """Base agent classes and utilities."""
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
 from datetime import datetime
+import logging
+import time
+
+from aurora.log import log_context, parse_level
+from aurora.metrics import MetricsRegistry, get_metrics_registry
 
 class BaseAgent(ABC):
     """Base class for all agents in the system."""
@@ -10,6 +16,8 @@ class BaseAgent(ABC):
         self.name = name
         self.config = config or {}
         self.start_time = datetime.utcnow()
+        self.metrics: MetricsRegistry = get_metrics_registry()
+        self.logger = logging.getLogger(f"Aurora{name}")
 
     @abstractmethod
     async def initialize(self) -> None:
@@ -26,10 +34,43 @@ class BaseAgent(ABC):
         """Execute the agent's main task."""
         pass
 
-    def log_activity(self, message: str, level: str = "INFO") -> None:
-        """Log agent activity with timestamp."""
-        timestamp = datetime.utcnow().isoformat()
-        print(f"[{timestamp}] {level} - {self.name}: {message}")
+    def log_activity(
+        self, message: str, level: str = "INFO", sample_key: Optional[str] = None, **fields: Any
+    ) -> None:
+        """Log agent activity through the queue-backed logging pipeline.
+
+        ``fields`` (and any ``log_context`` fields such as ticker, run_id and
+        stage) are attached to the record. Warnings sharing a ``sample_key``
+        are rate-limited as one repeated message.
+        """
+        levelno = parse_level(level)
+        if not self.logger.isEnabledFor(levelno):
+            return
+        extra: Dict[str, Any] = {"fields": fields}
+        if sample_key:
+            extra["sample_key"] = f"{self.name}:{sample_key}"
+        self.logger.log(levelno, message, extra=extra)
+
+    @contextmanager
+    def stage(self, stage: str, **labels: Any) -> Iterator[None]:
+        """Time a stage of work (e.g. fetch, parse, db_write) into ``stage_seconds``.
+
+        A stage that raises also increments ``stage_errors_total``.
+        """
+        labels = {"agent": self.name, "stage": stage, **labels}
+        started = time.perf_counter()
+        try:
+            with log_context(stage=stage):
+                yield
+        except Exception:
+            self.metrics.inc("stage_errors_total", **labels)
+            raise
+        finally:
+            self.metrics.observe("stage_seconds", time.perf_counter() - started, **labels)
+
+    def count(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increment the counter ``name`` labelled with this agent."""
+        self.metrics.inc(name, value, agent=self.name, **labels)
 
     def get_runtime(self) -> float:
         """Get agent's runtime in seconds."""
@@ -1,56 +1,278 @@
 """Data ingestion agent for fetching and storing financial data."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Awaitable, Callable, Set, Tuple
 import asyncio
+import time
+import uuid
 import aiohttp
+import pandas as pd
 import yfinance as yf
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from aurora.agents.base import BaseAgent, DataFetchError
-from aurora.models import Company, FinancialData, NewsSentiment
-from aurora.database import SessionLocal
-from aurora.config import DISCLAIMER
+from aurora.models import (
+    Company,
+    FinancialData,
+    IngestionWatermark,
+    NewsArticle,
+    NewsArticleCompany,
+)
+from aurora.database import AsyncSessionLocal, get_pool_stats, sql_profiler
+from aurora.log import log_context
+from aurora.metrics import bucket_quantile
+from aurora.config import (
+    ALPHA_VANTAGE_BASE_URL,
+    DISCLAIMER,
+    INGESTION_BACKFILL,
+    INGESTION_MAX_CONCURRENCY,
+    NEWS_BATCH,
+    NEWS_BATCH_LIMIT,
+    NEWS_FEED_LIMIT,
+    NEWS_MAX_PAGES,
+    NEWS_MIN_RELEVANCE,
+)
+from aurora.providers import (
+    ProviderRecording,
+    create_http_session,
+    get_provider_cache,
+    get_provider_recording,
+    get_rate_limiter,
+    run_blocking,
+)
 
 __all__ = ["DataIngestionAgent"]
 
+# Watermark source for Alpha Vantage news
+NEWS_WATERMARK_SOURCE = "alpha_vantage_news"
+
+# Article columns refreshed when a fetched article already exists (matched on url)
+_NEWS_UPDATE_COLUMNS = (
+    "title",
+    "summary",
+    "source",
+    "published_at",
+    "sentiment_score",
+    "sentiment_label",
+)
+
+# Per-company columns of an article-to-company link
+_NEWS_LINK_COLUMNS = (
+    "relevance_score",
+    "ticker_sentiment_score",
+    "ticker_sentiment_label",
+)
+
+# Tables whose written/skipped row counts are reported per run
+_WRITE_STAT_TABLES = ("companies", "financial_data", "news_articles", "news_article_companies")
+
+
+def _content_changed(table, excluded, columns) -> Any:
+    """``WHERE`` clause for an upsert that only rewrites rows whose content changes.
+
+    Compares the values the update would write (fetched values, falling back
+    to stored ones for nulls) with the stored row, so a re-fetch of unchanged
+    data produces no new row version, WAL or trigger firing.
+    """
+    columns = list(columns)
+    return tuple_(
+        *(func.coalesce(getattr(excluded, column), table.c[column]) for column in columns)
+    ).is_distinct_from(tuple_(*(table.c[column] for column in columns)))
+
+
+# yfinance statement row label -> FinancialData column, per statement
+_STATEMENT_ROWS = {
+    "financials": {
+        "Total Revenue": "revenue",
+        "Operating Income": "operating_income",
+        "Net Income": "net_income",
+        "Basic EPS": "eps_basic",
+        "Diluted EPS": "eps_diluted",
+    },
+    "balance_sheet": {
+        "Total Assets": "total_assets",
+        "Total Liabilities Net Minority Interest": "total_liabilities",
+        "Total Equity Gross Minority Interest": "total_equity",
+        "Cash And Cash Equivalents": "cash_and_equivalents",
+        "Current Assets": "current_assets",
+        "Current Liabilities": "current_liabilities",
+    },
+    "cashflow": {
+        "Operating Cash Flow": "operating_cash_flow",
+        "Investing Cash Flow": "investing_cash_flow",
+        "Financing Cash Flow": "financing_cash_flow",
+    },
+}
+
+
+def statements_to_records(
+    financials: pd.DataFrame,
+    balance_sheet: pd.DataFrame,
+    cashflow: pd.DataFrame,
+    report_type: str,
+) -> List[Dict[str, Any]]:
+    """Turn yfinance statement frames (rows = line items, columns = periods) into
+    one FinancialData-shaped dict per period, newest first.
+
+    The statements are reindexed to the mapped line items, transposed and joined
+    on the period, so every column is converted in one pass. Missing values are None.
+    """
+    frames = []
+    for name, frame in (
+        ("financials", financials),
+        ("balance_sheet", balance_sheet),
+        ("cashflow", cashflow),
+    ):
+        if frame is None or frame.empty:
+            continue
+        rows = _STATEMENT_ROWS[name]
+        selected = frame.reindex(list(rows)).rename(index=rows).T
+        selected.index = pd.to_datetime(selected.index)
+        frames.append(selected)
+    if not frames:
+        return []
+
+    columns = [column for rows in _STATEMENT_ROWS.values() for column in rows.values()]
+    table = pd.concat(frames, axis=1).reindex(columns=columns).apply(pd.to_numeric, errors="coerce")
+    table = table.sort_index(ascending=False)
+    table.index = table.index.date
+    table = table.astype(object).where(table.notna(), None)
+
+    records = table.rename_axis("report_date").reset_index().to_dict("records")
+    for record in records:
+        record["report_type"] = report_type
+    return records
+
+
+def format_time_from(since: datetime) -> str:
+    """Format a watermark as Alpha Vantage's minute-precision ``time_from``."""
+    return since.astimezone(timezone.utc).strftime("%Y%m%dT%H%M")
+
+
+def parse_time_published(value: str) -> datetime:
+    """Parse Alpha Vantage's ``YYYYMMDDTHHMMSS`` timestamps as UTC."""
+    published = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    return published.replace(tzinfo=timezone.utc)
+
+
 class DataIngestionAgent(BaseAgent):
     """Agent responsible for fetching and storing financial data."""
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(name="DataIngestionAgent", config=config)
-        self.session: Optional[Session] = None
+        self.session: Optional[AsyncSession] = None
+        self.http: Optional[aiohttp.ClientSession] = None
+        self.cache = get_provider_cache()
         self.disclaimer = DISCLAIMER
         
+        # Maximum number of tickers ingested at the same time by run()
+        self.max_concurrency = max(
+            1, int((config or {}).get("max_concurrency") or INGESTION_MAX_CONCURRENCY)
+        )
+        
+        # Articles requested per news call
+        self.news_feed_limit = int((config or {}).get("news_feed_limit") or NEWS_FEED_LIMIT)
+        self.news_max_pages = max(1, int((config or {}).get("news_max_pages") or NEWS_MAX_PAGES))
+        
+        # Batched news: one market-wide request per run, fanned out per ticker
+        self.news_batch = bool((config or {}).get("news_batch", NEWS_BATCH))
+        self.news_batch_limit = int((config or {}).get("news_batch_limit") or NEWS_BATCH_LIMIT)
+        self.news_min_relevance = float(
+            (config or {}).get("news_min_relevance", NEWS_MIN_RELEVANCE)
+        )
+        self._prefetched_news: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        # How far back the last truncated batch feed reached; None while unknown
+        self._news_batch_span: Optional[timedelta] = None
+        
+        # Store every reported period instead of only the latest quarter
+        self.backfill = bool((config or {}).get("backfill", INGESTION_BACKFILL))
+
+        # Record provider responses to disk, or replay them instead of calling out
+        self.recording: Optional[ProviderRecording] = (
+            (config or {}).get("recording") or get_provider_recording()
+        )
+
         # Get Alpha Vantage API key from environment or config
         self.alpha_vantage_key = (
             (config or {}).get("alpha_vantage_key") 
             or os.getenv("ALPHA_VANTAGE_API_KEY")
         )
-        if not self.alpha_vantage_key:
+        if not self.alpha_vantage_key and not self.replaying:
             self.log_activity(
                 "Warning: No Alpha Vantage API key found. News fetching will be disabled.",
                 level="WARN"
             )
+        
+        # Provider endpoints; overridable so benchmarks can use local stand-ins
+        self.alpha_vantage_url = (config or {}).get("alpha_vantage_url") or ALPHA_VANTAGE_BASE_URL
+        self.yahoo_client = (config or {}).get("yahoo_client") or yf.Ticker
 
     async def initialize(self) -> None:
-        """Initialize database session."""
-        self.session = SessionLocal()
-        self.log_activity("Initialized database session")
+        """Initialize database session and the pooled HTTP client."""
+        if not self.session:
+            self.session = AsyncSessionLocal()
+            self.log_activity("Initialized database session")
+        if not self.http or self.http.closed:
+            self.http = create_http_session(self.config.get("http"))
+            self.log_activity("Initialized HTTP client")
 
     async def cleanup(self) -> None:
         """Clean up resources."""
         if self.session:
-            self.session.close()
+            await self.session.close()
+            self.session = None
             self.log_activity("Closed database session")
+        if self.http:
+            await self.http.close()
+            self.http = None
+            self.log_activity("Closed HTTP client")
+
+    def _load_yahoo(self, ticker: str, endpoint: str) -> Any:
+        """Blocking yfinance lookup of one ``yf.Ticker`` attribute (e.g. ``info``)."""
+        return getattr(self.yahoo_client(ticker), endpoint)
+
+    @property
+    def replaying(self) -> bool:
+        """Whether provider responses are served from a recording."""
+        return self.recording is not None and self.recording.mode == "replay"
+
+    async def call_provider(
+        self, provider: str, endpoint: str, key: Any, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Rate-limit and run one provider ``request``, through record/replay when enabled.
+
+        Replayed calls skip the rate limiter because no provider is contacted.
+        """
+        if not self.replaying:
+            with self.stage("throttle", provider=provider):
+                await get_rate_limiter(provider).acquire()
+        with self.stage("fetch", provider=provider, endpoint=endpoint):
+            if self.recording is None:
+                return await request()
+            return await self.recording.call(provider, endpoint, key, request)
+
+    async def fetch_yahoo(self, ticker: str, endpoint: str) -> Any:
+        """Fetch a yfinance endpoint for ``ticker`` through the provider cache."""
+        hit = True
+
+        async def load() -> Any:
+            nonlocal hit
+            hit = False
+            return await self.call_provider(
+                "yahoo", endpoint, ticker, lambda: run_blocking(self._load_yahoo, ticker, endpoint)
+            )
+
+        value = await self.cache.get_or_fetch(("yahoo", endpoint, ticker), load)
+        self.count("cache_requests_total", provider="yahoo", result="hit" if hit else "miss")
+        return value
 
     async def fetch_company_info(self, ticker: str) -> Dict[str, Any]:
         """Fetch basic company information."""
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = await self.fetch_yahoo(ticker, "info")
             
             return {
                 "ticker": ticker,
@@ -66,47 +288,124 @@ class DataIngestionAgent(BaseAgent):
     async def fetch_financial_data(self, ticker: str) -> Dict[str, Any]:
         """Fetch latest financial data."""
         try:
-            stock = yf.Ticker(ticker)
-            
-            # Get quarterly financials
-            financials = stock.quarterly_financials
-            balance_sheet = stock.quarterly_balance_sheet
-            cashflow = stock.quarterly_cashflow
+            # Get quarterly financials; info is usually cached from fetch_company_info
+            financials, balance_sheet, cashflow, info = await asyncio.gather(
+                self.fetch_yahoo(ticker, "quarterly_financials"),
+                self.fetch_yahoo(ticker, "quarterly_balance_sheet"),
+                self.fetch_yahoo(ticker, "quarterly_cashflow"),
+                self.fetch_yahoo(ticker, "info"),
+            )
             
             if financials.empty or balance_sheet.empty or cashflow.empty:
                 raise DataFetchError(f"No financial data available for {ticker}")
             
             # Get the latest quarter data
-            latest_quarter = financials.columns[0]
+            latest_quarter = pd.Timestamp(financials.columns[0]).date()
+            with self.stage("parse", source="financials"):
+                records = statements_to_records(financials, balance_sheet, cashflow, "10-Q")
+            latest = next(r for r in records if r["report_date"] == latest_quarter)
             
-            # Helper to safely get value from DataFrame
-            def safe_get(df, row_name, col):
-                try:
-                    return float(df.loc[row_name, col]) if row_name in df.index else None
-                except:
-                    return None
-
             return {
-                "report_date": latest_quarter if isinstance(latest_quarter, datetime) else datetime.strptime(str(latest_quarter), "%Y-%m-%d").date(),
-                "report_type": "10-Q",  # Assuming quarterly
-                "revenue": safe_get(financials, "Total Revenue", latest_quarter),
-                "operating_income": safe_get(financials, "Operating Income", latest_quarter),
-                "net_income": safe_get(financials, "Net Income", latest_quarter),
-                "total_assets": safe_get(balance_sheet, "Total Assets", latest_quarter),
-                "total_liabilities": safe_get(balance_sheet, "Total Liabilities Net Minority Interest", latest_quarter),
-                "total_equity": safe_get(balance_sheet, "Total Equity Gross Minority Interest", latest_quarter),
-                "operating_cash_flow": safe_get(cashflow, "Operating Cash Flow", latest_quarter),
-                "market_cap": stock.info.get("marketCap"),
+                **latest,
+                "market_cap": info.get("marketCap"),
                 "source_name": "Yahoo Finance",
                 "source_url": f"https://finance.yahoo.com/quote/{ticker}"
             }
         except Exception as e:
             raise DataFetchError(f"Failed to fetch financial data for {ticker}: {str(e)}")
 
-    async def store_company_data(self, ticker: str) -> None:
-        """Fetch and store company data."""
-        if not self.session:
+    async def fetch_financial_history(self, ticker: str) -> List[Dict[str, Any]]:
+        """Fetch every quarterly (10-Q) and annual (10-K) period yfinance returns.
+
+        Market cap is only known for today, so it is set on the latest quarter.
+        """
+        try:
+            endpoints = [
+                f"{prefix}{statement}"
+                for prefix in ("quarterly_", "")
+                for statement in ("financials", "balance_sheet", "cashflow")
+            ]
+            frames = await asyncio.gather(*(self.fetch_yahoo(ticker, e) for e in endpoints))
+            info = await self.fetch_yahoo(ticker, "info")
+            
+            with self.stage("parse", source="financials"):
+                quarterly = statements_to_records(*frames[:3], "10-Q")
+                annual = statements_to_records(*frames[3:], "10-K")
+            if not quarterly and not annual:
+                raise DataFetchError(f"No financial data available for {ticker}")
+            
+            if quarterly:
+                quarterly[0]["market_cap"] = info.get("marketCap")
+            
+            source = {
+                "source_name": "Yahoo Finance",
+                "source_url": f"https://finance.yahoo.com/quote/{ticker}"
+            }
+            return [{**record, **source} for record in quarterly + annual]
+        except DataFetchError:
+            raise
+        except Exception as e:
+            raise DataFetchError(f"Failed to fetch financial history for {ticker}: {str(e)}")
+
+    async def store_financial_data(
+        self,
+        company_id: int,
+        records: List[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+    ) -> Dict[str, int]:
+        """Upsert financial periods on ``(company_id, report_date, report_type)``.
+
+        Existing rows only take the non-null fetched values and are left
+        untouched when those match what is stored. Returns counts of inserted,
+        updated and unchanged rows.
+        """
+        session = session or self.session
+        if not session:
             raise RuntimeError("Database session not initialized")
+        if not records:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        
+        rows = [{**record, "company_id": company_id} for record in records]
+        columns = sorted({key for row in rows for key in row})
+        rows = [{column: row.get(column) for column in columns} for row in rows]
+        
+        update_columns = [
+            column for column in columns if column not in ("company_id", "report_date", "report_type")
+        ]
+        table = FinancialData.__table__
+        stmt = pg_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.company_id, table.c.report_date, table.c.report_type],
+            set_={
+                column: func.coalesce(getattr(stmt.excluded, column), table.c[column])
+                for column in update_columns
+            },
+            where=_content_changed(table, stmt.excluded, update_columns),
+        ).returning(literal_column("(xmax = 0)").label("inserted"))
+        
+        # Rows the WHERE clause skipped are not returned
+        flags = (await session.execute(stmt)).scalars().all()
+        inserted = sum(1 for flag in flags if flag)
+        return {
+            "inserted": inserted,
+            "updated": len(flags) - inserted,
+            "unchanged": len(rows) - len(flags),
+        }
+
+    async def store_company_data(
+        self, ticker: str, session: Optional[AsyncSession] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """Fetch and store company data.
+
+        Uses ``session`` when given (one per concurrent ticker), otherwise the
+        agent's shared session. The ticker is committed or rolled back on its own.
+        Returns rows written and skipped as unchanged, per table.
+        """
+        session = session or self.session
+        if not session:
+            raise RuntimeError("Database session not initialized")
+
+        writes = {table: {"written": 0, "skipped": 0} for table in _WRITE_STAT_TABLES}
 
         try:
             # Fetch company info
@@ -114,161 +413,599 @@ class DataIngestionAgent(BaseAgent):
             
             # Check if company exists
             stmt = select(Company).where(Company.ticker == ticker)
-            company = self.session.execute(stmt).scalar_one_or_none()
+            company = (await session.execute(stmt)).scalar_one_or_none()
             
             if company:
-                # Update existing company
-                for key, value in company_info.items():
+                # Update existing company only where a field changed, so an
+                # unchanged profile issues no UPDATE (and no updated_at trigger)
+                changed = {
+                    key: value for key, value in company_info.items()
+                    if getattr(company, key) != value
+                }
+                for key, value in changed.items():
                     setattr(company, key, value)
+                writes["companies"]["written" if changed else "skipped"] += 1
             else:
                 # Create new company
                 company = Company(**company_info)
-                self.session.add(company)
+                session.add(company)
+                writes["companies"]["written"] += 1
             
-            # Fetch and store financial data
-            financial_data = await self.fetch_financial_data(ticker)
-            financial_data["company_id"] = company.id
+            # Flush to ensure company has an ID
+            await session.flush()
+            if not isinstance(company.id, int):
+                raise DataFetchError("Could not get company ID")
             
-            # Check for existing financial data for this period
-            stmt = select(FinancialData).where(
-                FinancialData.company_id == company.id,
-                FinancialData.report_date == financial_data["report_date"]
-            )
-            existing = self.session.execute(stmt).scalar_one_or_none()
-            
-            if existing:
-                # Update existing record
-                for key, value in financial_data.items():
-                    setattr(existing, key, value)
+            # Fetch and store financial data (every period in backfill mode)
+            if self.backfill:
+                financial_records = await self.fetch_financial_history(ticker)
             else:
-                # Create new record
-                new_financial = FinancialData(**financial_data)
-                self.session.add(new_financial)
+                financial_records = [await self.fetch_financial_data(ticker)]
+            with self.stage("db_write", table="financial_data"):
+                counts = await self.store_financial_data(int(company.id), financial_records, session=session)
+            writes["financial_data"]["written"] += counts["inserted"] + counts["updated"]
+            writes["financial_data"]["skipped"] += counts["unchanged"]
+            if self.backfill:
+                self.log_activity(
+                    f"Backfilled {len(financial_records)} financial periods for {ticker} "
+                    f"({counts['inserted']} new, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged)"
+                )
             
-            # Fetch and store news data
-            news_items = await self.fetch_news_sentiment(ticker)
+            # Fetch and store only news published since the last run
+            watermark = await self.get_news_watermark(int(company.id), session=session)
+            if self._prefetched_news is not None and ticker in self._prefetched_news:
+                news_items = self._prefetched_news[ticker]
+            else:
+                news_items = await self.fetch_news_sentiment(
+                    ticker, since=watermark.watermark_at if watermark else None
+                )
+            news_items = self.drop_seen_news(news_items, watermark)
             if news_items:
-                # Flush to ensure company has an ID
-                self.session.flush()
-                if not isinstance(company.id, int):
-                    raise DataFetchError("Could not get company ID")
-                await self.store_news_data(int(company.id), news_items)
-                self.log_activity(f"Stored {len(news_items)} news items for {ticker}")
+                with self.stage("db_write", table="news_articles"):
+                    counts = await self.store_news_data(int(company.id), news_items, session=session)
+                writes["news_article_companies"]["written"] += counts["inserted"] + counts["updated"]
+                writes["news_article_companies"]["skipped"] += counts["unchanged"]
+                writes["news_articles"]["written"] += counts["articles_inserted"] + counts["articles_updated"]
+                writes["news_articles"]["skipped"] += counts["articles_unchanged"]
+                await self.advance_news_watermark(
+                    int(company.id), news_items, previous=watermark, session=session
+                )
+                self.log_activity(
+                    f"Stored {len(news_items)} news items for {ticker} "
+                    f"({counts['inserted']} new, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged)"
+                )
             
             # Commit changes
-            self.session.commit()
+            with self.stage("db_write", table="commit"):
+                await session.commit()
             self.log_activity(f"Successfully stored data for {ticker}")
+            return writes
             
         except Exception as e:
-            self.session.rollback()
+            await session.rollback()
             raise DataFetchError(f"Failed to store data for {ticker}: {str(e)}")
 
-    async def fetch_news_sentiment(self, ticker: str) -> List[Dict[str, Any]]:
-        """Fetch news and sentiment data for a company."""
-        if not self.alpha_vantage_key:
+    async def fetch_news_feed(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Request one Alpha Vantage NEWS_SENTIMENT feed and return its raw items."""
+        if not self.http:
+            raise RuntimeError("HTTP client not initialized")
+        
+        # Use the agent's pooled client to fetch news data from Alpha Vantage
+        params = {"function": "NEWS_SENTIMENT", "apikey": self.alpha_vantage_key, **params}
+        
+        async def request() -> Any:
+            async with self.http.get(self.alpha_vantage_url, params=params) as response:
+                if response.status != 200:
+                    raise DataFetchError(f"API returned status {response.status}")
+                return await response.json()
+        
+        news_data = await self.call_provider("alpha_vantage", params["function"], params, request)
+        
+        if not news_data or "feed" not in news_data:
+            return []
+        return news_data["feed"]
+
+    async def fetch_news_pages(self, params: Dict[str, str], since: datetime) -> List[Dict[str, Any]]:
+        """Page an EARLIEST-sorted feed forward from ``since`` while pages are full.
+
+        Each page starts at the minute of the newest article already received;
+        repeated articles are dropped by URL. Stops on a short page, a page
+        with nothing new, or after ``news_max_pages`` requests.
+        """
+        limit = int(params["limit"])
+        feed: List[Dict[str, Any]] = []
+        seen: Set[Any] = set()
+        cursor = since
+        for page_number in range(self.news_max_pages):
+            page = await self.fetch_news_feed({**params, "time_from": format_time_from(cursor)})
+            fresh = [item for item in page if item.get("url") not in seen]
+            seen.update(item.get("url") for item in fresh)
+            feed.extend(fresh)
+            if len(page) < limit or not fresh:
+                break
+            try:
+                cursor = max(parse_time_published(item.get("time_published", "")) for item in fresh)
+            except ValueError:
+                break
+            if page_number == self.news_max_pages - 1:
+                self.log_activity(
+                    f"News feed still truncated after {self.news_max_pages} pages for "
+                    f"{params.get('tickers')}; the rest follows next run",
+                    level="WARN",
+                    sample_key="news_pages",
+                )
+        return feed
+
+    @staticmethod
+    def parse_news_item(item: Dict[str, Any], ticker: Optional[str] = None) -> Dict[str, Any]:
+        """Convert a raw feed item, adding ``ticker``'s relevance and sentiment when listed."""
+        news_item = {
+            "title": item.get("title"),
+            "url": item.get("url"),
+            "source": item.get("source"),
+            "summary": item.get("summary"),
+            "published_at": parse_time_published(item.get("time_published", "")),
+            "sentiment_score": float(item.get("overall_sentiment_score", 0)),
+            "sentiment_label": item.get("overall_sentiment_label"),
+            "relevance_score": None,
+            "ticker_sentiment_score": None,
+            "ticker_sentiment_label": None,
+        }
+        for entry in item.get("ticker_sentiment") or []:
+            if ticker and entry.get("ticker") == ticker:
+                news_item["relevance_score"] = float(entry.get("relevance_score", 0))
+                news_item["ticker_sentiment_score"] = float(entry.get("ticker_sentiment_score", 0))
+                news_item["ticker_sentiment_label"] = entry.get("ticker_sentiment_label")
+                break
+        return news_item
+
+    async def fetch_news_sentiment(
+        self, ticker: str, since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Fetch news and sentiment data for a company, newest first.
+
+        Without ``since`` the latest ``news_feed_limit`` articles are requested.
+        With ``since``, articles from that minute on are requested oldest first,
+        paging forward while pages come back full (up to ``news_max_pages``), so
+        the newest article returned, which the watermark advances to, never
+        lies past articles that were cut off.
+        """
+        if not self.alpha_vantage_key and not self.replaying:
             self.log_activity(f"Skipping news fetch for {ticker} - no API key", level="WARN")
             return []
         
         try:
-            # Initialize results list
+            params = {"tickers": ticker, "limit": str(self.news_feed_limit)}
+            if since:
+                feed = await self.fetch_news_pages({**params, "sort": "EARLIEST"}, since)
+            else:
+                feed = await self.fetch_news_feed({**params, "sort": "LATEST"})
             results = []
+            with self.stage("parse", source="news"):
+                for item in feed:
+                    try:
+                        results.append(self.parse_news_item(item, ticker))
+                    except (ValueError, TypeError) as e:
+                        self.count("parse_errors_total", source="news")
+                        self.log_activity(
+                            f"Error processing news item: {str(e)}", level="WARN", sample_key="news_item"
+                        )
+                        continue
+            results.sort(key=lambda item: item["published_at"], reverse=True)
+            return results
             
-            # Use aiohttp to fetch news data from Alpha Vantage
-            async with aiohttp.ClientSession() as session:
-                url = "https://www.alphavantage.co/query"
-                params = {
-                    "function": "NEWS_SENTIMENT",
-                    "tickers": ticker,
-                    "apikey": self.alpha_vantage_key,
-                    "sort": "RELEVANCE"
-                }
-                
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        raise DataFetchError(f"API returned status {response.status}")
-                        
-                    news_data = await response.json()
-                    
-                    if not news_data or "feed" not in news_data:
-                        return []
-                    
-                    for item in news_data["feed"]:
-                        try:
-                            news_item = {
-                                "title": item.get("title"),
-                                "url": item.get("url"),
-                                "source": item.get("source"),
-                                "summary": item.get("summary"),
-                                "published_at": datetime.fromisoformat(item.get("time_published", "")).date(),
-                                "sentiment_score": float(item.get("overall_sentiment_score", 0)),
-                                "sentiment_label": item.get("overall_sentiment_label")
-                            }
-                            results.append(news_item)
-                        except (ValueError, TypeError) as e:
-                            self.log_activity(f"Error processing news item: {str(e)}", level="WARN")
-                            continue
-                    
-                    return results
-                
         except Exception as e:
             self.log_activity(f"Error fetching news for {ticker}: {str(e)}", level="ERROR")
             return []
 
-    async def store_news_data(self, company_id: int, news_items: List[Dict[str, Any]]) -> None:
-        """Store news items in the database."""
-        if not self.session:
+    async def fetch_news_sentiment_batch(
+        self, tickers: List[str], watermarks: Optional[Dict[str, Optional[datetime]]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch one market-wide feed and route each article to every watched ticker.
+
+        Alpha Vantage treats several ``tickers`` as "mentions all of them", so the
+        batch call requests the unfiltered LATEST feed instead and fans articles
+        out using each item's ``ticker_sentiment`` breakdown. Mentions below
+        ``news_min_relevance`` are dropped.
+
+        Only tickers with a watermark the feed can cover take part: a ticker
+        without one wants its own latest articles, which a market-wide feed
+        rarely holds, and a watermark older than the span the last truncated
+        feed reached would be cut off again. When no ticker qualifies no request
+        is made. The window starts at the oldest qualifying watermark. When the
+        feed comes back full it was cut off, and tickers whose watermark is
+        older than its oldest article are dropped as well. Tickers missing from
+        the result are for the caller to fetch one by one.
+        """
+        watermarks = watermarks or {}
+        now = datetime.now(timezone.utc)
+        reach = now - self._news_batch_span if self._news_batch_span is not None else None
+        batched = [
+            ticker for ticker in tickers
+            if watermarks.get(ticker) is not None and (reach is None or watermarks[ticker] >= reach)
+        ]
+        if not batched:
+            self.log_activity(
+                f"No ticker's news watermark is within the batched feed; "
+                f"fetching {len(tickers)} tickers individually",
+                sample_key="news_batch_skipped",
+            )
+            return {}
+        
+        routed: Dict[str, List[Dict[str, Any]]] = {ticker: [] for ticker in batched}
+        if not self.alpha_vantage_key and not self.replaying:
+            self.log_activity("Skipping batched news fetch - no API key", level="WARN")
+            return routed
+        
+        since = min(watermarks[ticker] for ticker in batched)
+        try:
+            params = {"sort": "LATEST", "limit": str(self.news_batch_limit), "time_from": format_time_from(since)}
+            feed = await self.fetch_news_feed(params)
+        except Exception as e:
+            self.log_activity(f"Error fetching batched news: {str(e)}", level="ERROR")
+            return routed
+        
+        with self.stage("parse", source="news"):
+            for item in feed:
+                for entry in item.get("ticker_sentiment") or []:
+                    ticker = entry.get("ticker")
+                    if ticker not in routed:
+                        continue
+                    try:
+                        news_item = self.parse_news_item(item, ticker)
+                    except (ValueError, TypeError) as e:
+                        self.count("parse_errors_total", source="news")
+                        self.log_activity(
+                            f"Error processing news item: {str(e)}", level="WARN", sample_key="news_item"
+                        )
+                        break
+                    if (news_item["relevance_score"] or 0) >= self.news_min_relevance:
+                        routed[ticker].append(news_item)
+        
+        if feed and len(feed) >= self.news_batch_limit:
+            oldest = min(
+                parse_time_published(item["time_published"]) for item in feed if item.get("time_published")
+            )
+            self._news_batch_span = now - oldest
+            uncovered = [ticker for ticker in batched if watermarks[ticker] < oldest]
+            for ticker in uncovered:
+                del routed[ticker]
+            if uncovered:
+                self.log_activity(
+                    f"Batched news feed truncated at {oldest.isoformat()}; "
+                    f"fetching {len(uncovered)} tickers individually",
+                    level="WARN",
+                    sample_key="news_batch_truncated",
+                )
+        elif self._news_batch_span is not None:
+            # A complete feed reached at least back to ``since``
+            self._news_batch_span = max(self._news_batch_span, now - since)
+        
+        self.log_activity(
+            f"Routed {len(feed)} batched articles to "
+            f"{sum(1 for items in routed.values() if items)}/{len(batched)} tickers"
+        )
+        return routed
+
+    async def get_news_watermark(
+        self, company_id: int, session: Optional[AsyncSession] = None
+    ) -> Optional[IngestionWatermark]:
+        """Return the company's news watermark, if news was ingested before."""
+        session = session or self.session
+        if not session:
+            raise RuntimeError("Database session not initialized")
+        stmt = select(IngestionWatermark).where(
+            IngestionWatermark.company_id == company_id,
+            IngestionWatermark.source == NEWS_WATERMARK_SOURCE,
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    @staticmethod
+    def drop_seen_news(
+        news_items: List[Dict[str, Any]], watermark: Optional[IngestionWatermark]
+    ) -> List[Dict[str, Any]]:
+        """Drop articles at or behind the watermark without touching the database."""
+        if not watermark or not watermark.watermark_at:
+            return news_items
+        seen_urls = set((watermark.cursor or "").splitlines())
+        return [
+            item for item in news_items
+            if item["published_at"] > watermark.watermark_at
+            or (item["published_at"] == watermark.watermark_at and item["url"] not in seen_urls)
+        ]
+
+    async def advance_news_watermark(
+        self,
+        company_id: int,
+        news_items: List[Dict[str, Any]],
+        previous: Optional[IngestionWatermark] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> None:
+        """Move the watermark to the newest stored article.
+
+        The cursor keeps the URLs published at that exact time, since the next
+        request's window starts on the same minute and returns them again.
+        """
+        session = session or self.session
+        if not session:
+            raise RuntimeError("Database session not initialized")
+        newest = max(item["published_at"] for item in news_items)
+        urls = {item["url"] for item in news_items if item["published_at"] == newest}
+        if previous and previous.watermark_at == newest:
+            urls.update((previous.cursor or "").splitlines())
+        cursor = "\n".join(sorted(urls))
+        
+        stmt = pg_insert(IngestionWatermark).values(
+            company_id=company_id,
+            source=NEWS_WATERMARK_SOURCE,
+            watermark_at=newest,
+            cursor=cursor,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IngestionWatermark.company_id, IngestionWatermark.source],
+            set_={
+                "watermark_at": stmt.excluded.watermark_at,
+                "cursor": stmt.excluded.cursor,
+                "updated_at": func.now(),
+            },
+            where=IngestionWatermark.watermark_at.is_(None)
+            | (IngestionWatermark.watermark_at <= stmt.excluded.watermark_at),
+        )
+        await session.execute(stmt)
+
+    async def store_news_data(
+        self,
+        company_id: int,
+        news_items: List[Dict[str, Any]],
+        session: Optional[AsyncSession] = None,
+    ) -> Dict[str, int]:
+        """Upsert a news feed for one company with two set-based statements.
+
+        Articles are stored once in ``news_articles`` (matched on ``url``; existing
+        rows only take non-null fetched values), then linked to the company in
+        ``news_article_companies`` with its per-ticker relevance and sentiment.
+        Rows whose content would not change are not rewritten. Returns counts of
+        inserted, updated and unchanged company links and articles.
+        """
+        session = session or self.session
+        if not session:
             raise RuntimeError("Database session not initialized")
             
         try:
+            # Deduplicate by URL (ON CONFLICT cannot touch the same row twice) and
+            # sort so concurrent tickers lock shared articles in the same order
+            items: Dict[str, Dict[str, Any]] = {}
             for item in news_items:
-                # Check for existing news item to avoid duplicates
-                stmt = select(NewsSentiment).where(
-                    NewsSentiment.company_id == company_id,
-                    NewsSentiment.url == item["url"]
-                )
-                existing = self.session.execute(stmt).scalar_one_or_none()
-                
-                # Prepare news item data
-                news_item = {
-                    "title": item.get("title"),
-                    "summary": item.get("summary"),
-                    "source": item.get("source"),
-                    "url": item.get("url"),
-                    "published_at": item.get("published_at"),
-                    "sentiment_score": item.get("sentiment_score"),
-                    "sentiment_label": item.get("sentiment_label"),
-                    "company_id": company_id
+                if all(item.get(key) for key in ("url", "title", "source", "published_at")):
+                    items[item["url"]] = item
+            if not items:
+                return {
+                    "inserted": 0, "updated": 0, "unchanged": 0,
+                    "articles_inserted": 0, "articles_updated": 0, "articles_unchanged": 0,
                 }
-                
-                if existing:
-                    # Update existing record
-                    for key, value in news_item.items():
-                        if value is not None:
-                            setattr(existing, key, value)
-                else:
-                    # Create new record
-                    news = NewsSentiment(**news_item)
-                    self.session.add(news)
-                    
+            urls = sorted(items)
+            
+            articles_table = NewsArticle.__table__
+            stmt = pg_insert(articles_table).values([
+                {column: items[url].get(column) for column in ("url",) + _NEWS_UPDATE_COLUMNS}
+                for url in urls
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[articles_table.c.url],
+                set_={
+                    column: func.coalesce(getattr(stmt.excluded, column), articles_table.c[column])
+                    for column in _NEWS_UPDATE_COLUMNS
+                },
+                where=_content_changed(articles_table, stmt.excluded, _NEWS_UPDATE_COLUMNS),
+            ).returning(
+                NewsArticle.id,
+                NewsArticle.url,
+                NewsArticle.published_at,
+                literal_column("(xmax = 0)").label("inserted"),
+            )
+            written = (await session.execute(stmt)).all()
+            
+            # Unchanged articles are skipped by the upsert, so look up their ids
+            unchanged_urls = set(urls) - {article.url for article in written}
+            articles = list(written)
+            if unchanged_urls:
+                articles += (await session.execute(
+                    select(
+                        NewsArticle.id,
+                        NewsArticle.url,
+                        NewsArticle.published_at,
+                        literal(False).label("inserted"),
+                    ).where(NewsArticle.url.in_(unchanged_urls))
+                )).all()
+            
+            links_table = NewsArticleCompany.__table__
+            link_columns = ("published_at",) + _NEWS_LINK_COLUMNS
+            stmt = pg_insert(links_table).values(sorted(
+                (
+                    {
+                        "company_id": company_id,
+                        "article_id": article.id,
+                        "published_at": article.published_at,
+                        **{column: items[article.url].get(column) for column in _NEWS_LINK_COLUMNS},
+                    }
+                    for article in articles
+                ),
+                key=lambda row: row["article_id"],
+            ))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[links_table.c.company_id, links_table.c.article_id],
+                set_={
+                    column: func.coalesce(getattr(stmt.excluded, column), links_table.c[column])
+                    for column in link_columns
+                },
+                where=_content_changed(links_table, stmt.excluded, link_columns),
+            ).returning(literal_column("(xmax = 0)").label("inserted"))
+            flags = (await session.execute(stmt)).scalars().all()
+            inserted = sum(1 for flag in flags if flag)
+            articles_inserted = sum(1 for article in written if article.inserted)
+            
             # Changes will be committed in store_company_data
+            return {
+                "inserted": inserted,
+                "updated": len(flags) - inserted,
+                "unchanged": len(articles) - len(flags),
+                "articles_inserted": articles_inserted,
+                "articles_updated": len(written) - articles_inserted,
+                "articles_unchanged": len(unchanged_urls),
+            }
             
         except Exception as e:
             raise DataFetchError(f"Failed to store news data: {str(e)}")
 
-    async def run(self, tickers: List[str]) -> None:
-        """Run data ingestion for multiple tickers."""
-        try:
-            await self.initialize()
-            
-            for ticker in tickers:
+    def stage_counts(self) -> Dict[str, Tuple[List[int], float]]:
+        """Bucket counts and total seconds per stage for this agent, from the metrics registry."""
+        counts: Dict[str, Tuple[List[int], float]] = {}
+        for labels, buckets, total in self.metrics.histogram_counts("stage_seconds"):
+            if labels.get("agent") != self.name:
+                continue
+            key = "/".join(
+                [labels["stage"]] + [labels[k] for k in sorted(labels) if k not in ("agent", "stage")]
+            )
+            counts[key] = (buckets, total)
+        return counts
+
+    def stage_summary(
+        self, since: Optional[Dict[str, Tuple[List[int], float]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Count, total seconds and p50/p99 per stage for this agent.
+
+        The registry is process-wide and cumulative; pass an earlier
+        :meth:`stage_counts` as ``since`` to summarise only what was observed
+        after it.
+        """
+        summary: Dict[str, Dict[str, Any]] = {}
+        for key, (buckets, total) in self.stage_counts().items():
+            if since and key in since:
+                before, before_total = since[key]
+                buckets = [now - then for now, then in zip(buckets, before)]
+                total -= before_total
+            count = sum(buckets)
+            if not count:
+                continue
+            summary[key] = {
+                "count": count,
+                "sum": round(total, 6),
+                "p50": bucket_quantile(self.metrics.buckets, buckets, 0.5),
+                "p99": bucket_quantile(self.metrics.buckets, buckets, 0.99),
+            }
+        return summary
+
+    async def ingest_ticker(self, ticker: str) -> Dict[str, Any]:
+        """Ingest one ticker in its own session and report how long it took."""
+        started = time.perf_counter()
+        error: Optional[str] = None
+        writes: Dict[str, Dict[str, int]] = {}
+        with log_context(ticker=ticker):
+            async with AsyncSessionLocal() as session:
                 try:
-                    await self.store_company_data(ticker)
+                    writes = await self.store_company_data(ticker, session=session)
+                    for table, counts in writes.items():
+                        for outcome, value in counts.items():
+                            self.count("rows_total", value, table=table, outcome=outcome)
                 except Exception as e:
-                    self.log_activity(f"Error processing {ticker}: {str(e)}", level="ERROR")
-                    continue
-                
-                # Add delay to avoid rate limiting
-                await asyncio.sleep(1)
+                    error = str(e)
+                    self.count("ticker_errors_total")
+                    self.log_activity(f"Error processing {ticker}: {error}", level="ERROR")
+
+        return {
+            "ticker": ticker,
+            "status": "error" if error else "ok",
+            "seconds": time.perf_counter() - started,
+            "error": error,
+            "writes": writes,
+        }
+
+    async def prefetch_news(self, tickers: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch news for all ``tickers`` with one batched request.
+
+        The window starts at the oldest watermark among the batched tickers;
+        each ticker's own watermark still filters its articles in
+        store_company_data. Tickers the batch does not cover (including those
+        with no watermark yet) are missing from the result and fetched per ticker.
+        """
+        async with AsyncSessionLocal() as session:
+            stmt = (
+                select(Company.ticker, IngestionWatermark.watermark_at)
+                .outerjoin(
+                    IngestionWatermark,
+                    (IngestionWatermark.company_id == Company.id)
+                    & (IngestionWatermark.source == NEWS_WATERMARK_SOURCE),
+                )
+                .where(Company.ticker.in_(tickers))
+            )
+            watermarks = dict((await session.execute(stmt)).all())
+        
+        return await self.fetch_news_sentiment_batch(tickers, watermarks=watermarks)
+
+    async def run(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Run data ingestion for multiple tickers.
+
+        Up to ``max_concurrency`` tickers are in flight at once. Returns the
+        per-ticker results (status, seconds, error, writes) keyed by ticker.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def ingest(ticker: str) -> None:
+            async with semaphore:
+                results[ticker] = await self.ingest_ticker(ticker)
+
+        run_id = uuid.uuid4().hex[:12]
+        stage_baseline = self.stage_counts()
+        with log_context(run_id=run_id):
+            try:
+                await self.initialize()
+                started = time.perf_counter()
+            
+                if self.news_batch:
+                    self._prefetched_news = await self.prefetch_news(tickers)
+            
+                await asyncio.gather(*(ingest(ticker) for ticker in tickers))
+            
+                failed = sum(1 for r in results.values() if r["status"] != "ok")
+                self.log_activity(
+                    f"Ingested {len(tickers) - failed}/{len(tickers)} tickers in "
+                    f"{time.perf_counter() - started:.1f}s "
+                    f"(max_concurrency={self.max_concurrency})"
+                )
+                for ticker in tickers:
+                    self.log_activity(f"{ticker}: {results[ticker]['status']} in {results[ticker]['seconds']:.2f}s")
+                writes = {table: {"written": 0, "skipped": 0} for table in _WRITE_STAT_TABLES}
+                for result in results.values():
+                    for table, counts in result["writes"].items():
+                        for key, value in counts.items():
+                            writes[table][key] += value
+                self.log_activity(
+                    "Rows written/skipped unchanged: "
+                    + ", ".join(f"{table} {c['written']}/{c['skipped']}" for table, c in writes.items())
+                )
+                self.log_activity(f"Provider cache: {self.cache.stats()}")
+                if self.recording is not None:
+                    self.log_activity(f"Provider {self.recording.mode}: {self.recording.stats}")
+                self.log_activity(f"DB pool: {get_pool_stats()['async']}")
+                self.log_activity(f"Stage timings (this run): {self.stage_summary(since=stage_baseline)}")
+                if sql_profiler.attached:
+                    self.log_activity(f"SQL: {sql_profiler.unit_stats('run_id', run_id)}")
+                    for suspect in sql_profiler.repeated(unit="ticker"):
+                        if suspect["value"] in results:
+                            self.log_activity(
+                                f"Repeated SQL for {suspect['value']} ({suspect['count']}x): {suspect['shape'][:200]}",
+                                level="WARN",
+                                sample_key=f"sql_repeated:{suspect['shape']}",
+                            )
+                    if not sql_profiler.retaining:
+                        sql_profiler.forget("run_id", run_id)
+                        sql_profiler.forget("ticker", *tickers)
+            
+                return results
             
-        finally:
-            await self.cleanup()
+            finally:
+                self._prefetched_news = None
+                await self.cleanup()
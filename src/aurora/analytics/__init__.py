@@ -0,0 +1,11 @@
+"""Precomputed analytics derived from ingested data."""
+from .fundamentals import compute_derived_metrics, refresh_financial_metrics
+from .sentiment import compute_sentiment_daily, load_sentiment_series, refresh_sentiment
+
+__all__ = [
+    "compute_derived_metrics",
+    "compute_sentiment_daily",
+    "load_sentiment_series",
+    "refresh_financial_metrics",
+    "refresh_sentiment",
+]
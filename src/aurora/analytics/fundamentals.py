@@ -0,0 +1,356 @@
+"""Derived ratios, TTM sums and growth rates for ``financial_data``.
+
+:func:`refresh_financial_metrics` recomputes only companies whose inputs
+changed. Each company's ``financial_data`` statement columns are hashed in
+Postgres and compared with the hash kept in ``financial_metrics_inputs``.
+The changed companies' periods are then loaded into one frame, and every
+metric is computed in a single vectorized pass over that frame:
+
+- ``financial_data`` ratios: P/E (market cap / TTM net income), P/B, debt to
+  equity (total liabilities / equity) and the current ratio. Ratios with a
+  non-positive denominator are left NULL.
+- ``financial_metrics``: TTM sums over four consecutive quarters (the year
+  itself for 10-K rows), QoQ growth and YoY growth.
+
+Market cap is only captured for the latest quarter at ingestion time, so P/E
+and P/B are only available on that row. Ingestion rewrites it on every run,
+so it is left out of the hash: for companies whose statements are unchanged
+only P/E and P/B are recomputed, from the stored TTM net income.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Text, and_, bindparam, cast, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aurora.database import AsyncSessionLocal, async_engine
+from aurora.log import configure_logging
+from aurora.models import Company, FinancialData, FinancialMetrics, FinancialMetricsInput
+
+__all__ = ["compute_derived_metrics", "refresh_financial_metrics"]
+
+logger = logging.getLogger("AuroraFundamentals")
+
+# financial_data statement columns; a change to any of them (or a new period)
+# marks the company for recomputation
+STATEMENT_COLUMNS = [
+    "revenue", "operating_income", "net_income", "eps_basic", "eps_diluted",
+    "total_assets", "total_liabilities", "total_equity", "cash_and_equivalents",
+    "current_assets", "current_liabilities",
+    "operating_cash_flow", "investing_cash_flow", "financing_cash_flow",
+]
+# Every column the metrics are derived from
+INPUT_COLUMNS = [*STATEMENT_COLUMNS, "market_cap"]
+RATIO_COLUMNS = ["pe_ratio", "price_to_book", "debt_to_equity", "current_ratio"]
+# Ratios that move with the price
+MARKET_RATIO_COLUMNS = ["pe_ratio", "price_to_book"]
+TTM_COLUMNS = {
+    "revenue": "revenue_ttm",
+    "operating_income": "operating_income_ttm",
+    "net_income": "net_income_ttm",
+    "operating_cash_flow": "operating_cash_flow_ttm",
+    "eps_diluted": "eps_diluted_ttm",
+}
+GROWTH_COLUMNS = {
+    "revenue_growth_qoq": ("revenue", "qoq"),
+    "revenue_growth_yoy": ("revenue", "yoy"),
+    "net_income_growth_qoq": ("net_income", "qoq"),
+    "net_income_growth_yoy": ("net_income", "yoy"),
+    "eps_growth_yoy": ("eps_diluted", "yoy"),
+}
+METRIC_COLUMNS = [*TTM_COLUMNS.values(), *GROWTH_COLUMNS]
+
+# Days between period ends that count as one quarter, three quarters and one year
+_QUARTER_GAP = (60, 120)
+_THREE_QUARTER_GAP = (250, 300)
+_YEAR_GAP = (330, 400)
+
+# Largest magnitudes the NUMERIC(10,3) ratio and NUMERIC(12,4) growth columns hold
+_RATIO_LIMIT = 1e7
+_GROWTH_LIMIT = 1e8
+
+_LOAD_CHUNK = 5000
+_WRITE_CHUNK = 2000
+
+
+def _within(gap: pd.Series, bounds: Tuple[int, int]) -> pd.Series:
+    return gap.between(*bounds)
+
+
+def _where_rows(frame: pd.DataFrame, mask: pd.Series, other: Any = np.nan) -> pd.DataFrame:
+    """``frame`` where the row mask holds, ``other`` elsewhere."""
+    return frame.where(np.broadcast_to(mask.to_numpy()[:, None], frame.shape), other)
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series, limit: float, digits: int) -> pd.Series:
+    """``numerator / denominator`` for positive denominators, NaN otherwise or when out of range."""
+    value = (numerator / denominator.where(denominator > 0)).round(digits)
+    return value.where(value.abs() < limit)
+
+
+def _growth(current: pd.Series, previous: pd.Series) -> pd.Series:
+    value = ((current - previous) / previous.abs().where(previous != 0)).round(4)
+    return value.where(value.abs() < _GROWTH_LIMIT)
+
+
+def _market_ratios(market_cap: pd.Series, net_income_ttm: pd.Series, total_equity: pd.Series) -> pd.DataFrame:
+    return pd.DataFrame({
+        "pe_ratio": _ratio(market_cap, net_income_ttm, _RATIO_LIMIT, 3),
+        "price_to_book": _ratio(market_cap, total_equity, _RATIO_LIMIT, 3),
+    })
+
+
+def compute_derived_metrics(frame: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Compute ratios and TTM/growth metrics for every period in ``frame``.
+
+    ``frame`` has ``id``, ``company_id``, ``report_date``, ``report_type`` and
+    the :data:`INPUT_COLUMNS`. Returns ``(ratios, metrics)``: ratios keyed by
+    ``id`` with :data:`RATIO_COLUMNS`, and metrics keyed by company, report
+    date and type with :data:`METRIC_COLUMNS`.
+    """
+    frame = frame.sort_values(["company_id", "report_type", "report_date"], ignore_index=True)
+    values = frame[INPUT_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(float)
+    dates = pd.to_datetime(frame["report_date"])
+    quarterly = frame["report_type"].eq("10-Q")
+    groups = [frame["company_id"], frame["report_type"]]
+
+    def shifted(data: pd.DataFrame, periods: int) -> pd.DataFrame:
+        return data.groupby(groups, sort=False).shift(periods)
+
+    def gap(periods: int) -> pd.Series:
+        return (dates - dates.groupby(groups, sort=False).shift(periods)).dt.days
+
+    # TTM: four consecutive quarters, or the annual figure itself
+    ttm_inputs = values[list(TTM_COLUMNS)]
+    four_quarters = ttm_inputs + shifted(ttm_inputs, 1) + shifted(ttm_inputs, 2) + shifted(ttm_inputs, 3)
+    consecutive = quarterly & _within(gap(3), _THREE_QUARTER_GAP)
+    ttm = _where_rows(_where_rows(four_quarters, consecutive), quarterly, ttm_inputs)
+
+    # Previous quarter (10-Q only) and same period a year earlier (4 quarters or 1 year back)
+    previous_quarter = _where_rows(shifted(values, 1), quarterly & _within(gap(1), _QUARTER_GAP))
+    year_back = _where_rows(shifted(values, 4), quarterly, shifted(values, 1))
+    year_gap = gap(4).where(quarterly, gap(1))
+    previous_year = _where_rows(year_back, _within(year_gap, _YEAR_GAP))
+
+    metrics = frame[["company_id", "report_date", "report_type"]].copy()
+    for column, name in TTM_COLUMNS.items():
+        metrics[name] = ttm[column].round(3 if column.startswith("eps") else 2)
+    for name, (column, period) in GROWTH_COLUMNS.items():
+        previous = previous_quarter if period == "qoq" else previous_year
+        metrics[name] = _growth(values[column], previous[column])
+
+    ratios = frame[["id"]].copy()
+    ratios[MARKET_RATIO_COLUMNS] = _market_ratios(values["market_cap"], ttm["net_income"], values["total_equity"])
+    ratios["debt_to_equity"] = _ratio(values["total_liabilities"], values["total_equity"], _RATIO_LIMIT, 3)
+    ratios["current_ratio"] = _ratio(values["current_assets"], values["current_liabilities"], _RATIO_LIMIT, 3)
+    return ratios, metrics
+
+
+def _input_hash_query():
+    """Per-company md5 over every period's statement columns, in a stable order."""
+    fields = [FinancialData.report_date, FinancialData.report_type] + [
+        getattr(FinancialData, column) for column in STATEMENT_COLUMNS
+    ]
+    row_text = func.concat_ws("|", *(func.coalesce(cast(field, Text), "") for field in fields))
+    ordered = aggregate_order_by(literal("\n"), FinancialData.report_date, FinancialData.report_type)
+    digest = func.md5(func.string_agg(row_text, ordered))
+    return (
+        select(FinancialData.company_id, digest)
+        .where(FinancialData.company_id.is_not(None))
+        .group_by(FinancialData.company_id)
+    )
+
+
+async def _changed_companies(
+    session: AsyncSession, company_ids: Optional[List[int]], full: bool
+) -> Dict[int, str]:
+    """Company -> current input hash, for companies whose hash differs from the stored one."""
+    stmt = _input_hash_query()
+    if company_ids is not None:
+        stmt = stmt.where(FinancialData.company_id.in_(company_ids))
+    hashes = dict((await session.execute(stmt)).all())
+    if full or not hashes:
+        return hashes
+    stored = dict(
+        (await session.execute(select(FinancialMetricsInput.company_id, FinancialMetricsInput.input_hash))).all()
+    )
+    return {company_id: digest for company_id, digest in hashes.items() if stored.get(company_id) != digest}
+
+
+async def _load_inputs(session: AsyncSession, company_ids: List[int]) -> pd.DataFrame:
+    columns = ["id", "company_id", "report_date", "report_type", *INPUT_COLUMNS, *RATIO_COLUMNS]
+    fields = [getattr(FinancialData, column) for column in columns]
+    rows: List[Any] = []
+    for offset in range(0, len(company_ids), _LOAD_CHUNK):
+        chunk = company_ids[offset:offset + _LOAD_CHUNK]
+        rows.extend((await session.execute(select(*fields).where(FinancialData.company_id.in_(chunk)))).all())
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+async def _store_ratios(
+    session: AsyncSession, ratios: pd.DataFrame, stored: pd.DataFrame, columns: List[str] = RATIO_COLUMNS
+) -> int:
+    """Bulk UPDATE the ``columns`` ratios of rows whose values changed. Returns rows updated."""
+    current = stored.set_index("id")[columns].apply(pd.to_numeric, errors="coerce").astype(float)
+    computed = ratios.set_index("id")[columns]
+    current = current.reindex(computed.index)
+    same = (computed.eq(current) | (computed.isna() & current.isna())).all(axis=1)
+    changed = computed[~same].rename(columns=lambda column: f"new_{column}")
+    if changed.empty:
+        return 0
+
+    table = FinancialData.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values({column: bindparam(f"new_{column}", type_=table.c[column].type) for column in columns})
+    )
+    params = _records(changed.rename_axis("row_id").reset_index())
+    for offset in range(0, len(params), _WRITE_CHUNK):
+        await session.execute(stmt, params[offset:offset + _WRITE_CHUNK])
+    return len(params)
+
+
+async def _store_metrics(session: AsyncSession, metrics: pd.DataFrame) -> int:
+    """Upsert TTM/growth rows, skipping unchanged ones. Returns rows written."""
+    table = FinancialMetrics.__table__
+    rows = _records(metrics)
+    written = 0
+    for offset in range(0, len(rows), _WRITE_CHUNK):
+        stmt = pg_insert(table).values(rows[offset:offset + _WRITE_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.company_id, table.c.report_date, table.c.report_type],
+            set_={**{name: stmt.excluded[name] for name in METRIC_COLUMNS}, "updated_at": func.now()},
+            where=tuple_(*(stmt.excluded[name] for name in METRIC_COLUMNS)).is_distinct_from(
+                tuple_(*(table.c[name] for name in METRIC_COLUMNS))
+            ),
+        )
+        result = await session.execute(stmt)
+        written += max(result.rowcount or 0, 0)
+    return written
+
+
+async def _refresh_market_ratios(
+    session: AsyncSession, company_ids: Optional[List[int]], recomputed: Iterable[int]
+) -> int:
+    """Recompute P/E and P/B from the current market cap for companies whose
+    statements are unchanged (all but ``recomputed``). Returns rows updated.
+
+    Only rows with a market cap are read, with the TTM net income stored in
+    ``financial_metrics`` for the same period.
+    """
+    data = FinancialData.__table__
+    metrics = FinancialMetrics.__table__
+    columns = ["id", "company_id", "market_cap", "total_equity", "net_income_ttm", *MARKET_RATIO_COLUMNS]
+    stmt = (
+        select(
+            data.c.id, data.c.company_id, data.c.market_cap, data.c.total_equity,
+            metrics.c.net_income_ttm, *(data.c[column] for column in MARKET_RATIO_COLUMNS),
+        )
+        .select_from(data.outerjoin(metrics, and_(
+            metrics.c.company_id == data.c.company_id,
+            metrics.c.report_date == data.c.report_date,
+            metrics.c.report_type == data.c.report_type,
+        )))
+        .where(data.c.market_cap.is_not(None))
+    )
+    if company_ids is not None:
+        stmt = stmt.where(data.c.company_id.in_(company_ids))
+    stored = pd.DataFrame((await session.execute(stmt)).all(), columns=columns)
+    stored = stored[~stored["company_id"].isin(set(recomputed))]
+    if stored.empty:
+        return 0
+
+    values = stored[["market_cap", "net_income_ttm", "total_equity"]].apply(pd.to_numeric, errors="coerce")
+    values = values.astype(float)
+    ratios = stored[["id"]].copy()
+    ratios[MARKET_RATIO_COLUMNS] = _market_ratios(
+        values["market_cap"], values["net_income_ttm"], values["total_equity"]
+    )
+    return await _store_ratios(session, ratios, stored, MARKET_RATIO_COLUMNS)
+
+
+async def _store_input_hashes(session: AsyncSession, hashes: Dict[int, str]) -> None:
+    rows = [{"company_id": company_id, "input_hash": digest} for company_id, digest in hashes.items()]
+    table = FinancialMetricsInput.__table__
+    for offset in range(0, len(rows), _WRITE_CHUNK):
+        stmt = pg_insert(table).values(rows[offset:offset + _WRITE_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.company_id],
+            set_={"input_hash": stmt.excluded.input_hash, "updated_at": func.now()},
+        )
+        await session.execute(stmt)
+
+
+async def refresh_financial_metrics(
+    session: Optional[AsyncSession] = None,
+    tickers: Optional[Iterable[str]] = None,
+    full: bool = False,
+) -> Dict[str, int]:
+    """Recompute ratios and TTM/growth metrics for companies whose inputs changed.
+
+    With ``full`` every company (or every one of ``tickers``) is recomputed.
+    The other companies only get P/E and P/B refreshed from their current
+    market cap. Commits once at the end. Returns counts of companies
+    recomputed, ratio rows updated (all ratios, and market-cap ratios only)
+    and metric rows written and left unchanged.
+    """
+    if session is None:
+        async with AsyncSessionLocal() as session:
+            return await refresh_financial_metrics(session, tickers, full)
+
+    company_ids = None
+    if tickers is not None:
+        tickers = [ticker.upper() for ticker in tickers]
+        company_ids = list((await session.execute(select(Company.id).where(Company.ticker.in_(tickers)))).scalars())
+
+    hashes = await _changed_companies(session, company_ids, full)
+    stats = {
+        "companies": len(hashes), "ratios_updated": 0, "market_ratios_updated": 0,
+        "metrics_written": 0, "metrics_unchanged": 0,
+    }
+    if hashes:
+        stored = await _load_inputs(session, sorted(hashes))
+        ratios, metrics = compute_derived_metrics(stored)
+        stats["ratios_updated"] = await _store_ratios(session, ratios, stored)
+        stats["metrics_written"] = await _store_metrics(session, metrics)
+        stats["metrics_unchanged"] = len(metrics) - stats["metrics_written"]
+        await _store_input_hashes(session, hashes)
+    stats["market_ratios_updated"] = await _refresh_market_ratios(session, company_ids, hashes)
+    await session.commit()
+    logger.info(
+        "Financial metrics: %d companies recomputed, %d ratio rows updated, %d metric rows written, "
+        "%d market-cap ratio rows updated",
+        stats["companies"], stats["ratios_updated"], stats["metrics_written"], stats["market_ratios_updated"],
+    )
+    return stats
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        print(await refresh_financial_metrics(tickers=args.tickers or None, full=args.full))
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute derived financial ratios and TTM/growth metrics")
+    parser.add_argument("tickers", nargs="*", help="Limit to these tickers")
+    parser.add_argument("--full", action="store_true", help="Recompute even if inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
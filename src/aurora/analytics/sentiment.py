@@ -0,0 +1,360 @@
+"""Daily per-company news sentiment with EWMA and rolling windows.
+
+:func:`refresh_sentiment` keeps ``sentiment_daily`` up to date without
+re-aggregating the whole news history:
+
+- Companies whose ``news_article_companies`` rows were inserted after their
+  ``sentiment_daily`` ingestion watermark are picked up, along with the
+  earliest publication day among those new rows.
+- Only days from that day on are recomputed, or from the day after the
+  stored series ends if that is earlier, so quiet days in between are
+  written and the series stays dense. Raw scores are read back as far
+  as the longest rolling window needs, and the EWMA continues from the value
+  stored for the previous day.
+- All selected companies in a batch are aggregated together as day x company
+  frames with pandas, and rows whose values did not change are not rewritten.
+
+The daily score is the ticker-level sentiment, falling back to the article's
+overall sentiment. Rolling means are article-weighted over calendar days; the
+EWMA advances on days with scored news only.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Date, DateTime, Integer, column, func, select, tuple_, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aurora.config import SENTIMENT_SETTINGS
+from aurora.database import AsyncSessionLocal, async_engine
+from aurora.log import configure_logging
+from aurora.models import Company, IngestionWatermark, NewsArticle, NewsArticleCompany, SentimentDaily
+
+__all__ = ["compute_sentiment_daily", "load_sentiment_series", "refresh_sentiment", "refresh_start_day"]
+
+logger = logging.getLogger("AuroraSentiment")
+
+WATERMARK_SOURCE = "sentiment_daily"
+# Calendar-day windows; they map onto the mean_7d/count_7d and mean_30d/count_30d columns
+ROLLING_WINDOWS = (7, 30)
+# Links are stamped with their transaction's start time, so one committed just
+# after a refresh can carry a created_at just before the new watermark
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+_VALUE_COLUMNS = [
+    "article_count", "scored_count", "mean_sentiment", "ewma_sentiment",
+    "mean_7d", "count_7d", "mean_30d", "count_30d",
+]
+_UPSERT_CHUNK = 2000
+
+
+def compute_sentiment_daily(
+    links: pd.DataFrame,
+    starts: Dict[int, date],
+    seeds: Optional[Dict[int, float]] = None,
+    ewma_span: Optional[int] = None,
+) -> pd.DataFrame:
+    """Aggregate scored links into daily rows for every company in ``starts``.
+
+    ``links`` has ``company_id``, ``published_at`` and ``score`` (NaN when
+    unscored) and must reach back ``max(ROLLING_WINDOWS) - 1`` days before each
+    company's start day. Rows are returned from the start day through the
+    company's latest news day. ``seeds`` holds the stored EWMA for the day
+    before the start, if any.
+    """
+    seeds = seeds or {}
+    ewma_span = ewma_span or SENTIMENT_SETTINGS["ewma_span"]
+    if links.empty:
+        return pd.DataFrame(columns=["company_id", "day", *_VALUE_COLUMNS])
+
+    links = links.assign(
+        day=pd.to_datetime(links["published_at"], utc=True).dt.tz_localize(None).dt.normalize(),
+        score=pd.to_numeric(links["score"], errors="coerce"),
+    )
+    daily = links.groupby(["day", "company_id"])["score"].agg(["size", "count", "sum"])
+
+    first_day = min(daily.index.get_level_values("day").min(), pd.Timestamp(min(starts.values())))
+    days = pd.date_range(first_day, daily.index.get_level_values("day").max())
+    companies = daily.index.get_level_values("company_id").unique()
+
+    def wide(field: str) -> pd.DataFrame:
+        return daily[field].unstack("company_id").reindex(index=days, columns=companies).fillna(0.0)
+
+    counts, scored, sums = wide("size"), wide("count"), wide("sum")
+    frames: Dict[str, pd.DataFrame] = {
+        "article_count": counts,
+        "scored_count": scored,
+        "mean_sentiment": sums / scored.where(scored > 0),
+    }
+    for window in ROLLING_WINDOWS:
+        window_scored = scored.rolling(window, min_periods=1).sum()
+        frames[f"count_{window}d"] = counts.rolling(window, min_periods=1).sum()
+        frames[f"mean_{window}d"] = sums.rolling(window, min_periods=1).sum() / window_scored.where(window_scored > 0)
+
+    # The EWMA only sees days from the start on; earlier ones are in the seed
+    start_days = pd.to_datetime(pd.Series([starts.get(c) for c in companies], index=companies))
+    after_start = days.values[:, None] >= start_days.values[None, :]
+    observed = frames["mean_sentiment"].where(after_start)
+    seed_row = pd.DataFrame([[seeds.get(c, np.nan) for c in companies]], columns=companies, index=[days[0] - pd.Timedelta(days=1)])
+    frames["ewma_sentiment"] = (
+        pd.concat([seed_row, observed])
+        .ewm(span=ewma_span, adjust=False, ignore_na=True)
+        .mean()
+        .iloc[1:]
+    )
+
+    # Back to long form, keeping each company's [start, latest news day]
+    last_days = counts.gt(0).iloc[::-1].idxmax()
+    day_values = np.repeat(days.values, len(companies))
+    company_values = np.tile(companies.values, len(days))
+    keep = (day_values >= np.tile(start_days.values, len(days))) & (
+        day_values <= np.tile(last_days.reindex(companies).values, len(days))
+    )
+    result = pd.DataFrame({"company_id": company_values[keep], "day": pd.DatetimeIndex(day_values[keep]).date})
+    for name in _VALUE_COLUMNS:
+        result[name] = frames[name].to_numpy().ravel()[keep]
+    for name in ("article_count", "scored_count", *(f"count_{w}d" for w in ROLLING_WINDOWS)):
+        result[name] = result[name].astype(int)
+    return result.sort_values(["company_id", "day"], ignore_index=True)
+
+
+def refresh_start_day(first_new_day: date, last_stored_day: Optional[date]) -> date:
+    """First day to recompute: the earliest new article's day, or the day after
+    the stored series ends if that is earlier, so the series stays dense."""
+    if last_stored_day is None:
+        return first_new_day
+    return min(first_new_day, last_stored_day + timedelta(days=1))
+
+
+async def _pending_companies(
+    session: AsyncSession, company_ids: Optional[List[int]], full: bool
+) -> Dict[int, Tuple[date, datetime]]:
+    """Company -> (first day to recompute, newest link created_at) for changed companies."""
+    link = NewsArticleCompany
+    pending: Dict[int, Tuple[date, datetime]] = {}
+
+    watermark = (
+        select(IngestionWatermark.company_id, IngestionWatermark.watermark_at)
+        .where(IngestionWatermark.source == WATERMARK_SOURCE)
+    )
+    if company_ids is not None:
+        watermark = watermark.where(IngestionWatermark.company_id.in_(company_ids))
+    watermarks = {} if full else dict((await session.execute(watermark)).all())
+
+    # Companies never aggregated (or all of them on a full refresh): whole history
+    new_companies = select(Company.id).where(~Company.id.in_(list(watermarks))) if watermarks else select(Company.id)
+    if company_ids is not None:
+        new_companies = new_companies.where(Company.id.in_(company_ids))
+    stmt = (
+        select(link.company_id, func.min(link.published_at), func.max(link.created_at))
+        .where(link.company_id.in_(new_companies))
+        .group_by(link.company_id)
+    )
+    for company_id, first_published, newest in await session.execute(stmt):
+        pending[company_id] = (first_published.astimezone(timezone.utc).date(), newest)
+
+    # Companies with links newer than their watermark: from the earliest such publication day
+    live = {company_id: at for company_id, at in watermarks.items() if at is not None}
+    if live:
+        marks = values(
+            column("company_id", Integer), column("watermark_at", DateTime(timezone=True)), name="marks"
+        ).data(list(live.items()))
+        stmt = (
+            select(link.company_id, func.min(link.published_at), func.max(link.created_at))
+            .join(marks, marks.c.company_id == link.company_id)
+            .where(
+                link.created_at > min(live.values()) - WATERMARK_OVERLAP,
+                link.created_at > marks.c.watermark_at - WATERMARK_OVERLAP,
+            )
+            .group_by(link.company_id)
+        )
+        changed = {
+            company_id: (first_published.astimezone(timezone.utc).date(), max(newest, live[company_id]))
+            for company_id, first_published, newest in await session.execute(stmt)
+        }
+        if changed:
+            # Quiet days between the stored series and the new articles are written too
+            stmt = (
+                select(SentimentDaily.company_id, func.max(SentimentDaily.day))
+                .where(SentimentDaily.company_id.in_(list(changed)))
+                .group_by(SentimentDaily.company_id)
+            )
+            last_stored = dict((await session.execute(stmt)).all())
+            for company_id, (first_new, newest) in changed.items():
+                pending[company_id] = (refresh_start_day(first_new, last_stored.get(company_id)), newest)
+    return pending
+
+
+async def _load_batch(
+    session: AsyncSession, starts: Dict[int, date]
+) -> Tuple[pd.DataFrame, Dict[int, float]]:
+    """Raw scored links and EWMA seeds needed to recompute ``starts``."""
+    lookback = timedelta(days=max(ROLLING_WINDOWS) - 1)
+    batch = values(
+        column("company_id", Integer), column("since", DateTime(timezone=True)), column("start_day", Date),
+        name="batch",
+    ).data([
+        (company_id, datetime.combine(start - lookback, dt_time.min, tzinfo=timezone.utc), start)
+        for company_id, start in starts.items()
+    ])
+    link = NewsArticleCompany
+    stmt = (
+        select(
+            link.company_id,
+            link.published_at,
+            func.coalesce(link.ticker_sentiment_score, NewsArticle.sentiment_score).label("score"),
+        )
+        .join(NewsArticle, NewsArticle.id == link.article_id)
+        .join(batch, (batch.c.company_id == link.company_id) & (link.published_at >= batch.c.since))
+    )
+    rows = (await session.execute(stmt)).all()
+    links = pd.DataFrame(rows, columns=["company_id", "published_at", "score"])
+
+    stmt = (
+        select(SentimentDaily.company_id, SentimentDaily.ewma_sentiment)
+        .join(batch, (batch.c.company_id == SentimentDaily.company_id) & (SentimentDaily.day < batch.c.start_day))
+        .where(SentimentDaily.ewma_sentiment.is_not(None))
+        .distinct(SentimentDaily.company_id)
+        .order_by(SentimentDaily.company_id, SentimentDaily.day.desc())
+    )
+    seeds = {company_id: float(ewma) for company_id, ewma in await session.execute(stmt)}
+    return links, seeds
+
+
+def _db_rows(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    frame = frame.astype(object).where(frame.notna(), None)
+    rows = frame.to_dict("records")
+    for row in rows:
+        for name in ("mean_sentiment", "ewma_sentiment", *(f"mean_{w}d" for w in ROLLING_WINDOWS)):
+            if row[name] is not None:
+                row[name] = round(float(row[name]), 4)
+    return rows
+
+
+async def _store_rows(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Upsert daily rows, skipping ones whose values are unchanged. Returns rows written."""
+    table = SentimentDaily.__table__
+    written = 0
+    for offset in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = pg_insert(table).values(rows[offset:offset + _UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.company_id, table.c.day],
+            set_={**{name: stmt.excluded[name] for name in _VALUE_COLUMNS}, "updated_at": func.now()},
+            where=tuple_(*(stmt.excluded[name] for name in _VALUE_COLUMNS)).is_distinct_from(
+                tuple_(*(table.c[name] for name in _VALUE_COLUMNS))
+            ),
+        )
+        result = await session.execute(stmt)
+        written += max(result.rowcount or 0, 0)
+    return written
+
+
+async def _store_watermarks(session: AsyncSession, newest: Dict[int, datetime]) -> None:
+    stmt = pg_insert(IngestionWatermark).values([
+        {"company_id": company_id, "source": WATERMARK_SOURCE, "watermark_at": at}
+        for company_id, at in newest.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IngestionWatermark.company_id, IngestionWatermark.source],
+        set_={"watermark_at": stmt.excluded.watermark_at, "updated_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+async def refresh_sentiment(
+    session: Optional[AsyncSession] = None,
+    tickers: Optional[Iterable[str]] = None,
+    full: bool = False,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Bring ``sentiment_daily`` up to date for changed companies (or ``tickers``).
+
+    With ``full`` every company is recomputed from its first article. Each
+    batch of companies is committed with its watermarks. Returns counts of
+    companies refreshed and rows computed, written and left unchanged.
+    """
+    if session is None:
+        async with AsyncSessionLocal() as session:
+            return await refresh_sentiment(session, tickers, full, batch_size)
+
+    batch_size = batch_size or SENTIMENT_SETTINGS["batch_size"]
+    company_ids = None
+    if tickers is not None:
+        tickers = [ticker.upper() for ticker in tickers]
+        company_ids = list((await session.execute(select(Company.id).where(Company.ticker.in_(tickers)))).scalars())
+
+    pending = await _pending_companies(session, company_ids, full)
+    stats = {"companies": len(pending), "rows": 0, "written": 0, "unchanged": 0}
+    ordered = sorted(pending)
+    for offset in range(0, len(ordered), batch_size):
+        batch = {company_id: pending[company_id] for company_id in ordered[offset:offset + batch_size]}
+        starts = {company_id: start for company_id, (start, _) in batch.items()}
+        links, seeds = await _load_batch(session, starts)
+        rows = _db_rows(compute_sentiment_daily(links, starts, seeds))
+        written = await _store_rows(session, rows)
+        await _store_watermarks(session, {company_id: newest for company_id, (_, newest) in batch.items()})
+        await session.commit()
+        stats["rows"] += len(rows)
+        stats["written"] += written
+        stats["unchanged"] += len(rows) - written
+    logger.info(
+        "Sentiment aggregates: %d companies, %d rows written, %d unchanged",
+        stats["companies"], stats["written"], stats["unchanged"],
+    )
+    return stats
+
+
+async def load_sentiment_series(
+    session: AsyncSession, ticker: str, since: Optional[date] = None
+) -> pd.DataFrame:
+    """Precomputed daily sentiment for ``ticker``, indexed by day."""
+    stmt = (
+        select(SentimentDaily.day, *(SentimentDaily.__table__.c[name] for name in _VALUE_COLUMNS))
+        .join(Company, Company.id == SentimentDaily.company_id)
+        .where(Company.ticker == ticker.upper())
+        .order_by(SentimentDaily.day)
+    )
+    if since is not None:
+        stmt = stmt.where(SentimentDaily.day >= since)
+    rows = (await session.execute(stmt)).all()
+    frame = pd.DataFrame(rows, columns=["day", *_VALUE_COLUMNS]).set_index("day")
+    for name in ("mean_sentiment", "ewma_sentiment", *(f"mean_{w}d" for w in ROLLING_WINDOWS)):
+        frame[name] = frame[name].astype(float)
+    return frame
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            if args.command == "refresh":
+                print(await refresh_sentiment(session, args.tickers or None, full=args.full))
+            else:
+                since = date.today() - timedelta(days=args.days) if args.days else None
+                frame = await load_sentiment_series(session, args.ticker, since)
+                print(frame.to_string() if not frame.empty else f"No sentiment aggregates for {args.ticker}")
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Refresh or show precomputed daily news sentiment")
+    commands = parser.add_subparsers(dest="command", required=True)
+    refresh = commands.add_parser("refresh", help="Aggregate newly ingested articles")
+    refresh.add_argument("tickers", nargs="*", help="Limit to these tickers")
+    refresh.add_argument("--full", action="store_true", help="Recompute from each company's first article")
+    show = commands.add_parser("show", help="Print the daily series for a ticker")
+    show.add_argument("ticker")
+    show.add_argument("--days", type=int, default=30, help="Most recent N days (0 = all)")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
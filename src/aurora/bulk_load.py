@@ -0,0 +1,339 @@
+"""Offline bulk loader for historical companies, fundamentals and news.
+
+Files are read in fixed-size chunks, streamed into a temporary staging table
+with PostgreSQL ``COPY`` and merged into the real tables with a single
+``INSERT ... SELECT ... ON CONFLICT`` per chunk. Each merged chunk is
+checkpointed in ``bulk_load_progress`` in the same transaction, so an
+interrupted load resumes from the first unmerged chunk. Only the columns a
+file contains are written, so a partial file leaves the other stored values
+alone.
+
+Usage:
+    python -m aurora.bulk_load companies data/companies.csv
+    python -m aurora.bulk_load fundamentals data/fundamentals.parquet --chunk-size 100000
+    python -m aurora.bulk_load news data/news/*.csv
+"""
+import argparse
+import io
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+
+from aurora.database import engine
+from aurora.log import configure_logging
+from aurora.models import Company, FinancialData, NewsArticle, NewsArticleCompany
+
+__all__ = ["DATASETS", "load_file", "main"]
+
+logger = logging.getLogger("AuroraBulkLoad")
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Columns never loaded from files: generated keys, the resolved company id
+# and server-side timestamps
+_SKIPPED_COLUMNS = {"id", "company_id", "created_at", "updated_at"}
+
+
+def _conflict_action(updates: Sequence[str]) -> str:
+    if not updates:
+        return "DO NOTHING"
+    return "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in updates)
+
+
+class _Dataset:
+    """How one input dataset maps onto its target table."""
+
+    def __init__(self, name: str, table: Table, conflict: Sequence[str], required: Sequence[str]):
+        self.name = name
+        self.table = table
+        self.conflict = list(conflict)
+        self.required = list(required)
+        self.by_company = "company_id" in table.c
+        # Input columns: the table's own columns, plus the ticker used to
+        # resolve company_id for company-scoped tables
+        self.columns = [c.name for c in table.columns if c.name not in _SKIPPED_COLUMNS]
+        if self.by_company:
+            self.columns.insert(0, "ticker")
+
+    @property
+    def staging_table(self) -> str:
+        return f"stage_{self.table.name}"
+
+    def _column_type(self, name: str) -> str:
+        if name == "ticker" and self.by_company:
+            return "VARCHAR(10)"
+        return self.table.c[name].type.compile(dialect=postgresql.dialect())
+
+    def staging_ddl(self) -> str:
+        columns = [f"{name} {self._column_type(name)}" for name in self.columns]
+        return (
+            f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} "
+            f"({', '.join(columns)}) ON COMMIT DELETE ROWS"
+        )
+
+    def file_columns(self, present: Sequence[str]) -> List[str]:
+        """The input columns a file actually has, in staging-table order."""
+        present = set(present)
+        return [c for c in self.columns if c in present]
+
+    def merge_statements(self, columns: Sequence[str]) -> List[str]:
+        """Upsert the staged chunk into the target table in one statement.
+
+        Only ``columns`` (those present in the file) are written, so a file
+        that leaves a column out keeps its stored values.
+        """
+        target_columns = [c for c in columns if c != "ticker" or not self.by_company]
+        if self.by_company:
+            target_columns.insert(0, "company_id")
+            select_columns = ["c.id"] + [f"s.{c}" for c in target_columns[1:]]
+            source = f"{self.staging_table} s JOIN companies c ON c.ticker = s.ticker"
+            distinct = ["c.id" if k == "company_id" else f"s.{k}" for k in self.conflict]
+        else:
+            select_columns = [f"s.{c}" for c in target_columns]
+            source = f"{self.staging_table} s"
+            distinct = [f"s.{k}" for k in self.conflict]
+
+        # Rows keep the company they were first loaded for
+        updates = [c for c in target_columns if c not in self.conflict and c != "company_id"]
+        return [
+            f"INSERT INTO {self.table.name} ({', '.join(target_columns)}) "
+            f"SELECT DISTINCT ON ({', '.join(distinct)}) {', '.join(select_columns)} "
+            f"FROM {source} ORDER BY {', '.join(distinct)} "
+            f"ON CONFLICT ({', '.join(self.conflict)}) {_conflict_action(updates)}"
+        ]
+
+
+class _NewsDataset(_Dataset):
+    """News rows (one per article and ticker) split into articles and company links."""
+
+    _ARTICLE_COLUMNS = [
+        "url", "published_at", "title", "summary", "source", "sentiment_score", "sentiment_label"
+    ]
+    _LINK_COLUMNS = ["relevance_score", "ticker_sentiment_score", "ticker_sentiment_label"]
+
+    def __init__(self, name: str):
+        super().__init__(
+            name,
+            NewsArticle.__table__,
+            conflict=["url"],
+            required=["ticker", "url", "title", "source", "published_at"],
+        )
+        self.link_table = NewsArticleCompany.__table__
+        self.columns = ["ticker"] + self._ARTICLE_COLUMNS + self._LINK_COLUMNS
+
+    def _column_type(self, name: str) -> str:
+        if name == "ticker":
+            return "VARCHAR(10)"
+        table = self.link_table if name in self._LINK_COLUMNS else self.table
+        return table.c[name].type.compile(dialect=postgresql.dialect())
+
+    def merge_statements(self, columns: Sequence[str]) -> List[str]:
+        """Upsert articles of known companies, then their company links."""
+        stage = self.staging_table
+        article_columns = [c for c in self._ARTICLE_COLUMNS if c in columns]
+        link_columns = [c for c in self._LINK_COLUMNS if c in columns]
+        return [
+            f"INSERT INTO news_articles ({', '.join(article_columns)}) "
+            f"SELECT DISTINCT ON (s.url) {', '.join(f's.{c}' for c in article_columns)} "
+            f"FROM {stage} s WHERE EXISTS (SELECT 1 FROM companies c WHERE c.ticker = s.ticker) "
+            "ORDER BY s.url "
+            f"ON CONFLICT (url) {_conflict_action([c for c in article_columns if c != 'url'])}",
+            "INSERT INTO news_article_companies "
+            f"({', '.join(['company_id', 'article_id', 'published_at'] + link_columns)}) "
+            "SELECT DISTINCT ON (c.id, a.id) "
+            f"{', '.join(['c.id', 'a.id', 'a.published_at'] + [f's.{c}' for c in link_columns])} "
+            f"FROM {stage} s JOIN companies c ON c.ticker = s.ticker "
+            "JOIN news_articles a ON a.url = s.url "
+            "ORDER BY c.id, a.id "
+            f"ON CONFLICT (company_id, article_id) {_conflict_action(['published_at'] + link_columns)}",
+        ]
+
+
+DATASETS: Dict[str, _Dataset] = {
+    "companies": _Dataset(
+        "companies", Company.__table__, conflict=["ticker"], required=["ticker", "name"]
+    ),
+    "fundamentals": _Dataset(
+        "fundamentals",
+        FinancialData.__table__,
+        conflict=["company_id", "report_date", "report_type"],
+        required=["ticker", "report_date", "report_type"],
+    ),
+    "news": _NewsDataset("news"),
+}
+
+
+def _read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the file in chunks of ``chunk_size`` rows (CSV or Parquet)."""
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Loading Parquet files requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif suffix in (".csv", ".gz"):
+        # Keep values as text; PostgreSQL parses them into the staging column types
+        yield from pd.read_csv(
+            path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[""]
+        )
+    else:
+        raise ValueError(f"Unsupported file type for {path} (expected .csv, .csv.gz or .parquet)")
+
+
+def _chunk_to_csv(chunk: pd.DataFrame, dataset: _Dataset, columns: Sequence[str]) -> io.StringIO:
+    missing = [c for c in dataset.required if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"{dataset.name} input is missing required columns: {', '.join(missing)}")
+    if "ticker" in chunk.columns:
+        chunk = chunk.assign(ticker=chunk["ticker"].str.strip().str.upper())
+
+    buffer = io.StringIO()
+    chunk[list(columns)].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    return buffer
+
+
+def _get_progress(
+    cursor: Any, dataset: str, source: str, size: int, chunk_size: int, restart: bool
+) -> int:
+    """Return the number of chunks already merged for this file."""
+    if restart:
+        cursor.execute(
+            "DELETE FROM bulk_load_progress WHERE dataset = %s AND source = %s", (dataset, source)
+        )
+    cursor.execute(
+        "INSERT INTO bulk_load_progress (dataset, source, source_size, chunk_size) "
+        "VALUES (%s, %s, %s, %s) ON CONFLICT (dataset, source) DO NOTHING",
+        (dataset, source, size, chunk_size),
+    )
+    cursor.execute(
+        "SELECT source_size, chunk_size, chunks_done FROM bulk_load_progress "
+        "WHERE dataset = %s AND source = %s",
+        (dataset, source),
+    )
+    stored_size, stored_chunk_size, chunks_done = cursor.fetchone()
+    if stored_size != size or stored_chunk_size != chunk_size:
+        if chunks_done:
+            raise RuntimeError(
+                f"{source} changed size or chunk size since the last partial load; "
+                "rerun with --restart"
+            )
+        cursor.execute(
+            "UPDATE bulk_load_progress SET source_size = %s, chunk_size = %s "
+            "WHERE dataset = %s AND source = %s",
+            (size, chunk_size, dataset, source),
+        )
+    return chunks_done
+
+
+def load_file(
+    dataset_name: str,
+    path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    restart: bool = False,
+) -> Dict[str, Any]:
+    """Bulk-load one CSV/Parquet file into the tables behind ``dataset_name``.
+
+    Returns a summary with the number of chunks and rows staged and merged.
+    Rows whose ticker has no company yet are dropped by the merge, so load
+    ``companies`` before ``fundamentals`` and ``news``.
+    """
+    dataset = DATASETS[dataset_name]
+    file_path = Path(path).resolve()
+    source = str(file_path)
+    size = file_path.stat().st_size
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        chunks_done = _get_progress(cursor, dataset.name, source, size, chunk_size, restart)
+        cursor.execute(dataset.staging_ddl())
+        connection.commit()
+        if chunks_done:
+            logger.info("%s: resuming %s after chunk %d", dataset.name, source, chunks_done)
+
+        started = time.perf_counter()
+        staged_total = merged_total = 0
+        index = -1
+        for index, chunk in enumerate(_read_chunks(file_path, chunk_size)):
+            if index < chunks_done:
+                continue
+
+            # Columns missing from the file are neither staged nor merged
+            columns = dataset.file_columns(chunk.columns)
+            buffer = _chunk_to_csv(chunk, dataset, columns)
+            cursor.copy_expert(
+                f"COPY {dataset.staging_table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            for statement in dataset.merge_statements(columns):
+                cursor.execute(statement)
+            # Rows written by the final statement (the company-level rows)
+            merged = cursor.rowcount
+            cursor.execute(
+                "UPDATE bulk_load_progress SET chunks_done = %s, rows_loaded = rows_loaded + %s, "
+                "updated_at = CURRENT_TIMESTAMP WHERE dataset = %s AND source = %s",
+                (index + 1, merged, dataset.name, source),
+            )
+            # Commit also empties the ON COMMIT DELETE ROWS staging table
+            connection.commit()
+
+            staged_total += len(chunk)
+            merged_total += merged
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "%s: chunk %d merged %d/%d rows (%d total, %.0f rows/s)",
+                dataset.name, index + 1, merged, len(chunk), merged_total,
+                staged_total / elapsed if elapsed else 0.0,
+            )
+
+        cursor.execute(
+            "UPDATE bulk_load_progress SET completed_at = CURRENT_TIMESTAMP "
+            "WHERE dataset = %s AND source = %s",
+            (dataset.name, source),
+        )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    return {
+        "dataset": dataset.name,
+        "source": source,
+        "chunks": index + 1,
+        "chunks_skipped": min(chunks_done, index + 1),
+        "rows_staged": staged_total,
+        "rows_merged": merged_total,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load historical datasets with COPY")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("files", nargs="+", help="CSV (.csv, .csv.gz) or Parquet files")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        summary = load_file(args.dataset, path, chunk_size=args.chunk_size, restart=args.restart)
+        logger.info(
+            "%s: loaded %s - %d rows merged from %d staged in %.1fs (%d chunks skipped)",
+            summary["dataset"], summary["source"], summary["rows_merged"],
+            summary["rows_staged"], summary["seconds"], summary["chunks_skipped"],
+        )
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
@@ -15,6 +15,132 @@ DB_PORT = os.getenv('POSTGRES_PORT', '5432')
 
 # SQLAlchemy database URL
 SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Async (asyncpg) URL for the same database, used by the agents
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# Ingestion settings
+# Alpha Vantage query endpoint
+ALPHA_VANTAGE_BASE_URL = os.getenv('ALPHA_VANTAGE_BASE_URL', 'https://www.alphavantage.co/query')
+# Maximum number of tickers processed concurrently by DataIngestionAgent.run
+INGESTION_MAX_CONCURRENCY = int(os.getenv('INGESTION_MAX_CONCURRENCY', '1'))
+# Maximum articles requested per Alpha Vantage NEWS_SENTIMENT call (provider max 1000)
+NEWS_FEED_LIMIT = int(os.getenv('NEWS_FEED_LIMIT', '50'))
+# Incremental fetches page forward (oldest first) from the watermark while pages
+# come back full, up to this many calls per ticker; the rest follow next run
+NEWS_MAX_PAGES = int(os.getenv('NEWS_MAX_PAGES', '5'))
+# Batched news: one market-wide feed per run fanned out to the watchlist by ticker
+NEWS_BATCH = os.getenv('NEWS_BATCH', 'false').lower() in ('1', 'true', 'yes')
+NEWS_BATCH_LIMIT = int(os.getenv('NEWS_BATCH_LIMIT', '1000'))
+# Minimum per-ticker relevance for routing a batched article to a company
+NEWS_MIN_RELEVANCE = float(os.getenv('NEWS_MIN_RELEVANCE', '0.1'))
+# Store every quarterly and annual period yfinance returns, not just the latest quarter
+INGESTION_BACKFILL = os.getenv('INGESTION_BACKFILL', 'false').lower() in ('1', 'true', 'yes')
+
+# Provider rate limits shared by every fetch in the process (0 = unlimited)
+PROVIDER_RATE_LIMITS = {
+    'alpha_vantage': {
+        'requests_per_minute': float(os.getenv('ALPHA_VANTAGE_REQUESTS_PER_MINUTE', '5')),
+        'requests_per_day': int(os.getenv('ALPHA_VANTAGE_REQUESTS_PER_DAY', '0')),
+        'burst': int(os.getenv('ALPHA_VANTAGE_BURST', '1')),
+    },
+    'yahoo': {
+        'requests_per_minute': float(os.getenv('YAHOO_REQUESTS_PER_MINUTE', '120')),
+        'requests_per_day': int(os.getenv('YAHOO_REQUESTS_PER_DAY', '0')),
+        'burst': int(os.getenv('YAHOO_BURST', '5')),
+    },
+}
+
+# Pooled HTTP client for provider APIs (timeouts in seconds)
+HTTP_CLIENT_SETTINGS = {
+    'pool_limit': int(os.getenv('HTTP_POOL_LIMIT', '100')),
+    'pool_limit_per_host': int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '10')),
+    'dns_cache_ttl': int(os.getenv('HTTP_DNS_CACHE_TTL', '300')),
+    'keepalive_timeout': float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60')),
+    'total_timeout': float(os.getenv('HTTP_TOTAL_TIMEOUT', '30')),
+    'connect_timeout': float(os.getenv('HTTP_CONNECT_TIMEOUT', '10')),
+    'read_timeout': float(os.getenv('HTTP_READ_TIMEOUT', '20')),
+}
+
+# Worker threads for blocking provider clients (yfinance)
+PROVIDER_THREAD_POOL_SIZE = int(os.getenv('PROVIDER_THREAD_POOL_SIZE', '8'))
+
+# Provider record/replay (PROVIDER_MODE live, record or replay; replay sleeps
+# each recorded call duration / PROVIDER_REPLAY_SPEED, 0 = no delay)
+PROVIDER_RECORDING = {
+    'mode': os.getenv('PROVIDER_MODE', 'live').lower(),
+    'dir': os.getenv('PROVIDER_RECORDING_DIR', '.recordings/providers'),
+    'speed': float(os.getenv('PROVIDER_REPLAY_SPEED', '1')),
+}
+
+# Provider response cache (CACHE_DIR empty = in-memory only)
+ENABLE_CACHE = os.getenv('ENABLE_CACHE', 'true').lower() in ('1', 'true', 'yes')
+CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '5000'))
+CACHE_DIR = os.getenv('CACHE_DIR', '')
+
+# Database connection pool (applies to the sync and async engines separately)
+DB_POOL_SETTINGS = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+    'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+}
+# Server-side statement timeout in milliseconds (0 = no limit)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))
+
+# Postgres-backed ingestion job queue (SCHEDULE_MODE=queue; times in seconds)
+JOB_QUEUE_SETTINGS = {
+    'batch_size': int(os.getenv('JOB_BATCH_SIZE', '5')),
+    'poll_interval': float(os.getenv('JOB_POLL_INTERVAL', '5')),
+    'lease_seconds': int(os.getenv('JOB_LEASE_SECONDS', '600')),
+    'max_attempts': int(os.getenv('JOB_MAX_ATTEMPTS', '5')),
+    'backoff_base': float(os.getenv('JOB_BACKOFF_BASE', '30')),
+    'backoff_max': float(os.getenv('JOB_BACKOFF_MAX', '3600')),
+}
+
+# Adaptive refresh intervals for recurring queue jobs (times in seconds;
+# REFRESH_BUDGET_PER_DAY 0 = keep the total refreshes of the base interval)
+REFRESH_POLICY_SETTINGS = {
+    'enabled': os.getenv('ADAPTIVE_REFRESH', 'false').lower() in ('1', 'true', 'yes'),
+    'budget_per_day': float(os.getenv('REFRESH_BUDGET_PER_DAY', '0')),
+    'min_interval': int(os.getenv('REFRESH_MIN_INTERVAL', '900')),
+    'max_interval': int(os.getenv('REFRESH_MAX_INTERVAL', '86400')),
+    'lookback_days': int(os.getenv('REFRESH_LOOKBACK_DAYS', '14')),
+    'update_every': int(os.getenv('REFRESH_UPDATE_EVERY', '3600')),
+}
+
+# Logging (LOG_FORMAT text or json; repeated warnings pass LOG_SAMPLE_BURST
+# times per LOG_SAMPLE_WINDOW seconds, 0 = no sampling)
+LOGGING_SETTINGS = {
+    'level': os.getenv('LOG_LEVEL', 'INFO'),
+    'format': os.getenv('LOG_FORMAT', 'text').lower(),
+    'sample_window': float(os.getenv('LOG_SAMPLE_WINDOW', '60')),
+    'sample_burst': int(os.getenv('LOG_SAMPLE_BURST', '5')),
+}
+
+# Daily sentiment aggregates (aurora.analytics.sentiment). The EWMA spans
+# SENTIMENT_EWMA_SPAN days with news; SENTIMENT_REFRESH_SECONDS > 0 schedules
+# a refresh in the local scheduler.
+SENTIMENT_SETTINGS = {
+    'ewma_span': int(os.getenv('SENTIMENT_EWMA_SPAN', '10')),
+    'batch_size': int(os.getenv('SENTIMENT_BATCH_SIZE', '500')),
+    'refresh_seconds': int(os.getenv('SENTIMENT_REFRESH_SECONDS', '0')),
+}
+
+# Derived financial ratios and TTM/growth metrics (aurora.analytics.fundamentals);
+# FUNDAMENTALS_REFRESH_SECONDS > 0 schedules a refresh in the local scheduler
+FUNDAMENTALS_SETTINGS = {
+    'refresh_seconds': int(os.getenv('FUNDAMENTALS_REFRESH_SECONDS', '0')),
+}
+
+# SQL statement profiler (off by default). Statement shapes repeated more than
+# SQL_PROFILE_REPEAT_THRESHOLD times within one ticker are reported as N+1 suspects.
+SQL_PROFILER_SETTINGS = {
+    'enabled': os.getenv('SQL_PROFILE', 'false').lower() in ('1', 'true', 'yes'),
+    'repeat_threshold': int(os.getenv('SQL_PROFILE_REPEAT_THRESHOLD', '5')),
+    'units': [u.strip() for u in os.getenv('SQL_PROFILE_UNITS', 'ticker,run_id').split(',') if u.strip()],
+}
 
 # Other configurations
 DISCLAIMER = """Research for informational and educational purposes only; not investment advice. 
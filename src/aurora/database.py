@@ -1,15 +1,140 @@
+import threading
+import time
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from aurora.config import (
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    DB_POOL_SETTINGS,
+    DB_STATEMENT_TIMEOUT_MS,
+    SQL_PROFILER_SETTINGS,
+    SQLALCHEMY_DATABASE_URL,
+)
+from aurora.sql_profiler import SQLProfiler
+
+
+class PoolStats:
+    """Checkout counters collected by the instrumented connection pools."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record(self, wait: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout and counts overflow connections and pool timeouts."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self.stats = PoolStats()
+        super().__init__(*args, **kwargs)
+
+    def connect(self):
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except sa_exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        # _overflow counts connections beyond pool_size once it goes positive
+        overflowed = self._overflow > max(overflow_before, 0)
+        self.stats.record(time.perf_counter() - started, overflowed)
+        return connection
+
+    def recreate(self):
+        # Keep counters across engine.dispose()
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
 
-from aurora.config import SQLALCHEMY_DATABASE_URL
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_sync_connect_args = {}
+_async_connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS:
+    _sync_connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    _async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
 
 # Create SQLAlchemy engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    connect_args=_sync_connect_args,
+    **DB_POOL_SETTINGS,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for agents; use one AsyncSession per concurrent task
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    connect_args=_async_connect_args,
+    **DB_POOL_SETTINGS,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Statement profiler; listening only when SQL_PROFILE is set or inside profile()
+sql_profiler = SQLProfiler(
+    units=SQL_PROFILER_SETTINGS["units"],
+    repeat_threshold=SQL_PROFILER_SETTINGS["repeat_threshold"],
+)
+if SQL_PROFILER_SETTINGS["enabled"]:
+    sql_profiler.attach(engine, async_engine)
+
 # Create base class for declarative models
 Base = declarative_base()
 
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Report usage of the sync and async connection pools."""
+    report = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        stats = pool.stats
+        report[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "checkouts": stats.checkouts,
+            "wait_seconds_total": round(stats.wait_seconds_total, 6),
+            "wait_seconds_max": round(stats.wait_seconds_max, 6),
+            "wait_seconds_avg": (
+                round(stats.wait_seconds_total / stats.checkouts, 6) if stats.checkouts else 0.0
+            ),
+            "overflow_events": stats.overflow_events,
+            "timeouts": stats.timeouts,
+        }
+    return report
+
 # Database dependency
 def get_db():
     db = SessionLocal()
@@ -17,3 +142,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async database dependency
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
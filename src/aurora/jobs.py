@@ -0,0 +1,408 @@
+"""Postgres-backed ingestion job queue for running several workers at once.
+
+Each ticker has one row in ``ingestion_jobs``. Workers claim due rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` inside a single ``UPDATE``, so concurrent
+workers never claim the same job, and hold a lease (``locked_at``) that they
+renew while ingesting. A worker that dies leaves its lease to expire, after
+which another worker reclaims the job. Failed attempts are retried with
+exponential backoff; recurring jobs go back to ``queued`` after each run.
+
+Usage:
+    python -m aurora.jobs enqueue AAPL MSFT --interval 3600
+    python -m aurora.jobs work --batch-size 10
+    python -m aurora.jobs status
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aurora.agents.data_ingestion import DataIngestionAgent
+from aurora.config import JOB_QUEUE_SETTINGS, REFRESH_POLICY_SETTINGS
+from aurora.database import AsyncSessionLocal, async_engine
+from aurora.log import configure_logging
+from aurora.models import IngestionJob
+from aurora.refresh_policy import update_job_intervals
+
+__all__ = [
+    "JobWorker", "claim_jobs", "complete_job", "enqueue_jobs", "fail_job",
+    "queue_status", "renew_leases", "retry_delay", "main",
+]
+
+logger = logging.getLogger("AuroraJobs")
+
+_CLAIMED_COLUMNS = (
+    IngestionJob.id, IngestionJob.ticker, IngestionJob.attempts,
+    IngestionJob.max_attempts, IngestionJob.interval_seconds,
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """Seconds to wait before retrying after ``attempts`` failures (full jitter)."""
+    base = JOB_QUEUE_SETTINGS["backoff_base"] if base is None else base
+    cap = JOB_QUEUE_SETTINGS["backoff_max"] if cap is None else cap
+    ceiling = min(cap, base * 2 ** max(attempts - 1, 0))
+    # Jitter keeps a batch that failed together (provider outage) from retrying in lockstep
+    return random.uniform(ceiling / 2, ceiling)
+
+
+async def enqueue_jobs(
+    tickers: List[str],
+    priority: int = 0,
+    interval_seconds: Optional[int] = None,
+    run_at: Optional[datetime] = None,
+    session: Optional[AsyncSession] = None,
+    adaptive: Optional[bool] = None,
+) -> int:
+    """Create or update one job per ticker and return how many rows were written.
+
+    Enqueueing is idempotent, so every node can enqueue the same watchlist on
+    start-up. Existing jobs keep their schedule; only failed jobs are reset
+    to run again at ``run_at`` (default now). With ``adaptive`` refresh on,
+    an existing job keeps the interval the refresh policy gave it and
+    ``interval_seconds`` only fills in jobs that have none.
+    """
+    adaptive = REFRESH_POLICY_SETTINGS["enabled"] if adaptive is None else adaptive
+    tickers = sorted({t.strip().upper() for t in tickers if t.strip()})
+    if not tickers:
+        return 0
+
+    run_at = run_at or _now()
+    rows = [
+        {
+            "ticker": ticker,
+            "priority": priority,
+            "interval_seconds": interval_seconds,
+            "max_attempts": JOB_QUEUE_SETTINGS["max_attempts"],
+            "next_run_at": run_at,
+        }
+        for ticker in tickers
+    ]
+    table = IngestionJob.__table__
+    stmt = pg_insert(table).values(rows)
+    excluded = stmt.excluded
+    failed = table.c.status == "failed"
+    interval = (
+        func.coalesce(table.c.interval_seconds, excluded.interval_seconds)
+        if adaptive else excluded.interval_seconds
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.ticker],
+        set_={
+            "priority": excluded.priority,
+            "interval_seconds": interval,
+            "max_attempts": excluded.max_attempts,
+            "status": case((failed, "queued"), else_=table.c.status),
+            "attempts": case((failed, 0), else_=table.c.attempts),
+            "next_run_at": case((failed, excluded.next_run_at), else_=table.c.next_run_at),
+            "updated_at": func.now(),
+        },
+    )
+
+    if session is not None:
+        result = await session.execute(stmt)
+        return result.rowcount
+    async with AsyncSessionLocal() as own_session:
+        result = await own_session.execute(stmt)
+        await own_session.commit()
+        return result.rowcount
+
+
+async def claim_jobs(
+    session: AsyncSession,
+    worker_id: str,
+    limit: int,
+    lease_seconds: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Lease up to ``limit`` due jobs to ``worker_id`` and return them.
+
+    Due jobs are queued ones whose ``next_run_at`` has passed, plus running
+    ones whose lease expired. Rows locked by another worker's claim are
+    skipped rather than waited on. The caller commits.
+    """
+    lease_seconds = lease_seconds or JOB_QUEUE_SETTINGS["lease_seconds"]
+    now = func.now()
+    due = (
+        select(IngestionJob.id)
+        .where(
+            ((IngestionJob.status == "queued") & (IngestionJob.next_run_at <= now))
+            | (
+                (IngestionJob.status == "running")
+                & (IngestionJob.locked_at < now - timedelta(seconds=lease_seconds))
+            )
+        )
+        .order_by(IngestionJob.priority.desc(), IngestionJob.next_run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(IngestionJob)
+        .where(IngestionJob.id.in_(due))
+        .values(
+            status="running",
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=IngestionJob.attempts + 1,
+            updated_at=now,
+        )
+        .returning(*_CLAIMED_COLUMNS)
+    )
+    result = await session.execute(stmt)
+    return [dict(row._mapping) for row in result]
+
+
+async def renew_leases(session: AsyncSession, worker_id: str, job_ids: List[int]) -> int:
+    """Extend the leases ``worker_id`` still holds; returns how many were renewed."""
+    if not job_ids:
+        return 0
+    result = await session.execute(
+        update(IngestionJob)
+        .where(
+            IngestionJob.id.in_(job_ids),
+            IngestionJob.locked_by == worker_id,
+            IngestionJob.status == "running",
+        )
+        .values(locked_at=func.now())
+    )
+    return result.rowcount
+
+
+def _owned(job: Dict[str, Any], worker_id: str):
+    # A worker only finishes jobs it still holds; a lease that expired and was
+    # reclaimed belongs to the new worker
+    return (
+        (IngestionJob.id == job["id"])
+        & (IngestionJob.locked_by == worker_id)
+        & (IngestionJob.status == "running")
+    )
+
+
+async def complete_job(session: AsyncSession, job: Dict[str, Any], worker_id: str) -> bool:
+    """Mark a claimed job done, or requeue it one interval out if it recurs.
+
+    The interval is read from the row, not the claimed copy, so a refresh
+    policy update made while the job ran takes effect immediately.
+    """
+    recurring = IngestionJob.interval_seconds.is_not(None)
+    next_run = func.now() + func.make_interval(0, 0, 0, 0, 0, 0, IngestionJob.interval_seconds)
+    result = await session.execute(
+        update(IngestionJob)
+        .where(_owned(job, worker_id))
+        .values(
+            status=case((recurring, "queued"), else_="done"),
+            next_run_at=case((recurring, next_run), else_=IngestionJob.next_run_at),
+            attempts=0,
+            locked_by=None,
+            locked_at=None,
+            last_error=None,
+        )
+    )
+    return result.rowcount == 1
+
+
+async def fail_job(session: AsyncSession, job: Dict[str, Any], worker_id: str, error: str) -> str:
+    """Record a failed attempt and return the job's new status.
+
+    The job is retried after :func:`retry_delay` until it reaches
+    ``max_attempts``. One-off jobs then stay ``failed``; recurring jobs skip
+    to their next interval with a fresh attempt count. Returns ``"lost"``
+    when the lease expired and another worker owns the job now.
+    """
+    values: Dict[str, Any] = {"locked_by": None, "locked_at": None, "last_error": error[:2000]}
+    if job["attempts"] < job["max_attempts"]:
+        values.update(status="queued", next_run_at=_now() + timedelta(seconds=retry_delay(job["attempts"])))
+    elif job["interval_seconds"]:
+        values.update(
+            status="queued", attempts=0,
+            next_run_at=_now() + timedelta(seconds=job["interval_seconds"]),
+        )
+    else:
+        values.update(status="failed")
+    result = await session.execute(update(IngestionJob).where(_owned(job, worker_id)).values(**values))
+    return values["status"] if result.rowcount == 1 else "lost"
+
+
+async def queue_status(session: Optional[AsyncSession] = None) -> Dict[str, int]:
+    """Job counts by status, plus how many queued jobs are already due."""
+    stmt_counts = select(IngestionJob.status, func.count()).group_by(IngestionJob.status)
+    stmt_due = select(func.count()).where(
+        IngestionJob.status == "queued", IngestionJob.next_run_at <= func.now()
+    )
+
+    async def collect(s: AsyncSession) -> Dict[str, int]:
+        counts = {status: count for status, count in (await s.execute(stmt_counts)).all()}
+        counts["due"] = (await s.execute(stmt_due)).scalar_one()
+        return counts
+
+    if session is not None:
+        return await collect(session)
+    async with AsyncSessionLocal() as own_session:
+        return await collect(own_session)
+
+
+class JobWorker:
+    """Claims batches of due jobs and runs them through DataIngestionAgent.
+
+    With ``adaptive`` enabled the worker also re-derives recurring job
+    intervals from recent change rates every ``REFRESH_UPDATE_EVERY`` seconds
+    (see :mod:`aurora.refresh_policy`); only one worker per pass does the work.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[int] = None,
+        agent: Optional[DataIngestionAgent] = None,
+        adaptive: Optional[bool] = None,
+        base_interval: Optional[int] = None,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size or JOB_QUEUE_SETTINGS["batch_size"]
+        self.poll_interval = poll_interval or JOB_QUEUE_SETTINGS["poll_interval"]
+        self.lease_seconds = lease_seconds or JOB_QUEUE_SETTINGS["lease_seconds"]
+        self.agent = agent or DataIngestionAgent()
+        self.adaptive = REFRESH_POLICY_SETTINGS["enabled"] if adaptive is None else adaptive
+        self.base_interval = base_interval
+        self._intervals_updated = float("-inf")
+        self.stats = {"claimed": 0, "completed": 0, "retried": 0, "failed": 0, "lost": 0}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _renew_while_running(self, job_ids: List[int]) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            # A failed renewal is retried on the next tick; the lease has two
+            # more ticks before it expires
+            try:
+                async with AsyncSessionLocal() as session:
+                    await renew_leases(session, self.worker_id, job_ids)
+                    await session.commit()
+            except Exception as e:
+                logger.warning("Worker %s failed to renew leases: %s", self.worker_id, e)
+
+    async def update_intervals(self) -> None:
+        """Re-derive recurring job intervals when the last pass is old enough."""
+        if time.monotonic() - self._intervals_updated < REFRESH_POLICY_SETTINGS["update_every"]:
+            return
+        self._intervals_updated = time.monotonic()
+        async with AsyncSessionLocal() as session:
+            await update_job_intervals(session, base_interval=self.base_interval)
+            await session.commit()
+
+    async def run_once(self) -> int:
+        """Claim and ingest one batch; returns the number of jobs claimed."""
+        async with AsyncSessionLocal() as session:
+            jobs = await claim_jobs(session, self.worker_id, self.batch_size, self.lease_seconds)
+            await session.commit()
+        if not jobs:
+            return 0
+
+        self.stats["claimed"] += len(jobs)
+        tickers = [job["ticker"] for job in jobs]
+        logger.info("Worker %s claimed %s", self.worker_id, tickers)
+
+        heartbeat = asyncio.create_task(self._renew_while_running([job["id"] for job in jobs]))
+        try:
+            results = await self.agent.run(tickers)
+        except Exception as e:
+            results = {t: {"status": "error", "error": str(e)} for t in tickers}
+        finally:
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                # Still report the results; complete/fail detect lost leases
+                logger.warning("Worker %s lease heartbeat failed: %s", self.worker_id, e)
+
+        async with AsyncSessionLocal() as session:
+            for job in jobs:
+                result = results.get(job["ticker"]) or {"status": "error", "error": "no result"}
+                if result["status"] == "ok":
+                    if await complete_job(session, job, self.worker_id):
+                        self.stats["completed"] += 1
+                    else:
+                        self.stats["lost"] += 1
+                        logger.warning("Lease on %s expired before it completed", job["ticker"])
+                else:
+                    status = await fail_job(session, job, self.worker_id, result.get("error") or "unknown error")
+                    if status == "lost":
+                        self.stats["lost"] += 1
+                        logger.warning("Lease on %s expired before it failed", job["ticker"])
+                    else:
+                        self.stats["retried" if status == "queued" else "failed"] += 1
+            await session.commit()
+        return len(jobs)
+
+    async def run_forever(self) -> None:
+        """Drain due jobs, polling every ``poll_interval`` seconds when idle."""
+        logger.info("Job worker %s started (batch_size=%d)", self.worker_id, self.batch_size)
+        while not self._stopping.is_set():
+            try:
+                if self.adaptive:
+                    await self.update_intervals()
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error("Job worker %s batch failed: %s", self.worker_id, e)
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Job worker %s stopped: %s", self.worker_id, self.stats)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "enqueue":
+            written = await enqueue_jobs(args.tickers, priority=args.priority, interval_seconds=args.interval)
+            logger.info("Enqueued %d jobs", written)
+        elif args.command == "work":
+            await JobWorker(batch_size=args.batch_size).run_forever()
+        else:
+            logger.info("Queue status: %s", await queue_status())
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the Postgres ingestion job queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="Queue ingestion jobs for tickers")
+    enqueue.add_argument("tickers", nargs="+")
+    enqueue.add_argument("--priority", type=int, default=0, help="Higher runs first")
+    enqueue.add_argument("--interval", type=int, default=None, help="Requeue every N seconds")
+    work = commands.add_parser("work", help="Run a worker until interrupted")
+    work.add_argument("--batch-size", type=int, default=None)
+    commands.add_parser("status", help="Show job counts by status")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        logger.info("Interrupted by user")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    main()
@@ -0,0 +1,224 @@
+"""Structured, non-blocking logging for agents and services.
+
+:func:`configure_logging` routes every record through a ``QueueHandler``, so
+the event loop only enqueues records. A ``QueueListener`` thread formats and
+writes them to stderr as text or JSON lines. Context fields (``run_id``,
+``ticker``, ``stage``) set with :func:`log_context` are attached to every
+record logged inside the block, including from concurrent asyncio tasks.
+Repeated warnings are sampled: each distinct message (or ``sample_key``)
+passes ``sample_burst`` times per ``sample_window`` seconds, and the next one
+through reports how many were suppressed.
+
+Library code only logs; entry points (``__main__`` blocks and scripts) call
+:func:`configure_logging` once at startup.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+from aurora.config import LOGGING_SETTINGS
+
+__all__ = [
+    "ContextFilter", "JsonFormatter", "SamplingFilter", "TextFormatter",
+    "configure_logging", "current_context", "log_context", "parse_level",
+]
+
+_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("aurora_log_context", default={})
+
+# Level names the agents have historically used
+_LEVEL_ALIASES = {"WARN": logging.WARNING, "FATAL": logging.CRITICAL}
+
+# LogRecord attributes that are not user fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "fields"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def parse_level(level: Any) -> int:
+    """Map a level name (``"WARN"``, ``"info"``) or number to a logging level."""
+    if isinstance(level, int):
+        return level
+    name = str(level).upper()
+    if name in _LEVEL_ALIASES:
+        return _LEVEL_ALIASES[name]
+    value = logging.getLevelName(name)
+    return value if isinstance(value, int) else logging.INFO
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach ``fields`` to every record logged inside the block (task-local)."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_context() -> Dict[str, Any]:
+    """The :func:`log_context` fields in effect for the current task."""
+    return _context.get()
+
+
+def _record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    fields = dict(getattr(record, "fields", None) or {})
+    fields.update(
+        (key, value) for key, value in vars(record).items()
+        if key not in _RESERVED and key not in fields
+    )
+    return fields
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current :func:`log_context` fields onto each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        if context:
+            record.fields = {**context, **(getattr(record, "fields", None) or {})}
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Let each repeated warning through ``burst`` times per ``window`` seconds.
+
+    Records are grouped by their ``sample_key`` extra when given, otherwise by
+    logger and unformatted message. Records below ``level`` always pass.
+    """
+
+    def __init__(self, window: float = 60.0, burst: int = 5, level: int = logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.level = level
+        self._lock = threading.Lock()
+        # key -> [window start, passed in window, suppressed in window]
+        self._windows: Dict[Hashable, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno < self.level:
+            return True
+        key: Hashable = getattr(record, "sample_key", None) or (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                if len(self._windows) > 10_000:
+                    self._prune(now)
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, s in self._windows.items() if now - s[0] >= self.window and not s[2]]:
+            del self._windows[key]
+
+
+class TextFormatter(logging.Formatter):
+    """``[timestamp] LEVEL - logger: message key=value ...``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+        line = f"[{timestamp}] {record.levelname} - {record.name}: {record.getMessage()}"
+        fields = _record_fields(record)
+        fields.pop("sample_key", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with timestamp, level, logger, message and fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = _record_fields(record)
+        fields.pop("sample_key", None)
+        entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the message on the caller's thread; keep
+    # args and fields intact so the listener thread does the formatting.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+def configure_logging(
+    level: Optional[Any] = None,
+    json_format: Optional[bool] = None,
+    sample_window: Optional[float] = None,
+    sample_burst: Optional[int] = None,
+    stream=None,
+) -> None:
+    """Install the queue-backed root handler; safe to call more than once.
+
+    Defaults come from ``LOG_LEVEL``, ``LOG_FORMAT``, ``LOG_SAMPLE_WINDOW`` and
+    ``LOG_SAMPLE_BURST``. Calling again replaces the previous configuration.
+    """
+    global _listener
+    settings = LOGGING_SETTINGS
+    level = parse_level(level if level is not None else settings["level"])
+    json_format = settings["format"] == "json" if json_format is None else json_format
+
+    with _configure_lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter() if json_format else TextFormatter())
+
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        handler = _QueueHandler(records)
+        handler.addFilter(ContextFilter())
+        handler.addFilter(SamplingFilter(
+            window=settings["sample_window"] if sample_window is None else sample_window,
+            burst=settings["sample_burst"] if sample_burst is None else sample_burst,
+        ))
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+
+
+def _stop_listener() -> None:
+    # Flush records still queued when the interpreter exits
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
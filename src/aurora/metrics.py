@@ -0,0 +1,204 @@
+"""In-process metrics: counters, gauges and latency histograms.
+
+Agents record into the shared registry from :func:`get_metrics_registry`
+(see ``BaseAgent.stage`` and ``BaseAgent.count``). The registry renders as
+Prometheus text for the scheduler's ``/metrics`` endpoint or as JSON for
+ad-hoc runs and logs.
+"""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+__all__ = ["MetricsRegistry", "bucket_quantile", "get_metrics_registry"]
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def bucket_quantile(buckets: Tuple[float, ...], counts: List[int], q: float) -> Optional[float]:
+    """Upper bucket bound below which ``q`` of the observations in ``counts`` fall."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, count in zip(buckets + (float("inf"),), counts):
+        seen += count
+        if seen >= rank:
+            return bound
+    return float("inf")
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound below which ``q`` of the observations fall."""
+        return bucket_quantile(self.buckets, self.counts, q)
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms keyed by name and labels."""
+
+    def __init__(self, prefix: str = "aurora", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Set the ``# HELP`` text exported for ``name``."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add ``value`` to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge to ``value``."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one histogram observation (seconds for timings)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block, including awaits inside it."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def histogram_counts(self, name: str) -> List[Tuple[Dict[str, str], List[int], float]]:
+        """Per-series ``(labels, bucket counts, sum)`` of a histogram, for computing deltas."""
+        with self._lock:
+            return [
+                (dict(key), list(h.counts), h.sum)
+                for key, h in self._histograms.get(name, {}).items()
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All series as plain data: counters, gauges and histogram summaries."""
+        def series(values: Dict[LabelKey, Any], render) -> List[Dict[str, Any]]:
+            return [{"labels": dict(key), **render(value)} for key, value in values.items()]
+
+        with self._lock:
+            return {
+                "counters": {
+                    name: series(values, lambda v: {"value": v})
+                    for name, values in self._counters.items()
+                },
+                "gauges": {
+                    name: series(values, lambda v: {"value": v})
+                    for name, values in self._gauges.items()
+                },
+                "histograms": {
+                    name: series(values, lambda h: {
+                        "count": h.count,
+                        "sum": round(h.sum, 6),
+                        "p50": h.quantile(0.5),
+                        "p99": h.quantile(0.99),
+                    })
+                    for name, values in self._histograms.items()
+                },
+            }
+
+    def export_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.snapshot(), default=str, **kwargs)
+
+    def export_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, full: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+
+        with self._lock:
+            for name, values in sorted(self._counters.items()):
+                full = f"{self.prefix}_{name}"
+                header(name, full, "counter")
+                lines.extend(f"{full}{_format_labels(key)} {value}" for key, value in values.items())
+            for name, values in sorted(self._gauges.items()):
+                full = f"{self.prefix}_{name}"
+                header(name, full, "gauge")
+                lines.extend(f"{full}{_format_labels(key)} {value}" for key, value in values.items())
+            for name, values in sorted(self._histograms.items()):
+                full = f"{self.prefix}_{name}"
+                header(name, full, "histogram")
+                for key, histogram in values.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{full}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{full}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide registry shared by every agent."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+            _registry.describe("stage_seconds", "Wall time of agent stages (fetch, parse, db_write)")
+            _registry.describe("stage_errors_total", "Agent stages that raised")
+            _registry.describe("rows_total", "Rows written or skipped as unchanged, per table")
+            _registry.describe("cache_requests_total", "Provider cache lookups by result")
+        return _registry
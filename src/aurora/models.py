@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, Numeric, Text, ForeignKey, CheckConstraint, UniqueConstraint, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, Numeric, Text, ForeignKey, CheckConstraint, UniqueConstraint, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -20,6 +20,8 @@ class Company(Base):
     # Relationships
     financials = relationship("FinancialData", back_populates="company")
     news = relationship("NewsSentiment", back_populates="company")
+    article_links = relationship("NewsArticleCompany", back_populates="company")
+    sentiment_daily = relationship("SentimentDaily", back_populates="company")
     reports = relationship("ResearchReport", back_populates="company")
 
 class FinancialData(Base):
@@ -42,6 +44,8 @@ class FinancialData(Base):
     total_liabilities = Column(Numeric(20, 2))
     total_equity = Column(Numeric(20, 2))
     cash_and_equivalents = Column(Numeric(20, 2))
+    current_assets = Column(Numeric(20, 2))
+    current_liabilities = Column(Numeric(20, 2))
     
     # Cash Flow
     operating_cash_flow = Column(Numeric(20, 2))
@@ -91,6 +95,68 @@ class NewsSentiment(Base):
         CheckConstraint('sentiment_score >= -1 AND sentiment_score <= 1'),
     )
 
+class IngestionWatermark(Base):
+    __tablename__ = "ingestion_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    source = Column(String(50), nullable=False)  # e.g. 'alpha_vantage_news'
+    watermark_at = Column(DateTime(timezone=True))  # Newest item timestamp already ingested
+    cursor = Column(Text)  # Provider cursor at the watermark (newline-separated item URLs)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('company_id', 'source'),
+    )
+
+class NewsArticle(Base):
+    """A news article stored once, however many companies it mentions."""
+    __tablename__ = "news_articles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(Text, unique=True, nullable=False)  # News article URL
+    published_at = Column(DateTime(timezone=True), nullable=False)
+    title = Column(Text, nullable=False)
+    summary = Column(Text)
+    source = Column(String(255), nullable=False)  # News source name
+    sentiment_score = Column(Numeric(4, 3))  # Alpha Vantage's overall_sentiment_score
+    sentiment_label = Column(String(20))  # Alpha Vantage's overall_sentiment_label
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    company_links = relationship("NewsArticleCompany", back_populates="article")
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('sentiment_score >= -1 AND sentiment_score <= 1'),
+    )
+
+class NewsArticleCompany(Base):
+    """Mapping of an article to a company it mentions, with per-ticker scores."""
+    __tablename__ = "news_article_companies"
+
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    article_id = Column(Integer, ForeignKey("news_articles.id"), primary_key=True)
+    published_at = Column(DateTime(timezone=True), nullable=False)  # Copied from the article for per-company timelines
+    relevance_score = Column(Numeric(4, 3))  # Alpha Vantage's ticker relevance_score
+    ticker_sentiment_score = Column(Numeric(4, 3))
+    ticker_sentiment_label = Column(String(20))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    company = relationship("Company", back_populates="article_links")
+    article = relationship("NewsArticle", back_populates="company_links")
+
+    # Constraints
+    __table_args__ = (
+        Index('idx_article_companies_company_date', 'company_id', 'published_at'),
+        Index('idx_article_companies_article', 'article_id'),
+        Index('idx_article_companies_created', 'created_at'),
+        CheckConstraint('relevance_score >= 0 AND relevance_score <= 1'),
+        CheckConstraint('ticker_sentiment_score >= -1 AND ticker_sentiment_score <= 1'),
+    )
+
 class ResearchReport(Base):
     __tablename__ = "research_reports"
 
@@ -111,3 +177,101 @@ class ResearchReport(Base):
     __table_args__ = (
         UniqueConstraint('company_id', 'report_type', 'report_date'),
     )
+
+class BulkLoadProgress(Base):
+    __tablename__ = "bulk_load_progress"
+
+    id = Column(Integer, primary_key=True, index=True)
+    dataset = Column(String(50), nullable=False)  # companies, fundamentals, news
+    source = Column(Text, nullable=False)  # Absolute path of the loaded file
+    source_size = Column(BigInteger, nullable=False)  # Detects a changed file on resume
+    chunk_size = Column(Integer, nullable=False)
+    chunks_done = Column(Integer, nullable=False, server_default='0')
+    rows_loaded = Column(BigInteger, nullable=False, server_default='0')
+    completed_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('dataset', 'source'),
+    )
+
+class IngestionJob(Base):
+    """A per-ticker ingestion job claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED."""
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String(10), unique=True, nullable=False)
+    priority = Column(Integer, nullable=False, server_default='0')  # Higher runs first
+    status = Column(String(20), nullable=False, server_default='queued')
+    attempts = Column(Integer, nullable=False, server_default='0')
+    max_attempts = Column(Integer, nullable=False, server_default='5')
+    interval_seconds = Column(Integer)  # Requeue this long after success; NULL = run once
+    next_run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime(timezone=True))  # Lease start, renewed while the job runs
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'done', 'failed')"),
+        Index('idx_ingestion_jobs_due', 'status', 'next_run_at'),
+    )
+
+class SentimentDaily(Base):
+    """Per-company daily news sentiment with EWMA and rolling windows, precomputed."""
+    __tablename__ = "sentiment_daily"
+
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC publication date
+    article_count = Column(Integer, nullable=False)  # Articles linked that day
+    scored_count = Column(Integer, nullable=False)  # ... of which carry a sentiment score
+    mean_sentiment = Column(Numeric(5, 4))  # NULL on days without scored articles
+    ewma_sentiment = Column(Numeric(5, 4))  # EWMA of mean_sentiment over days with news
+    mean_7d = Column(Numeric(5, 4))  # Article-weighted mean over the 7 days ending on day
+    count_7d = Column(Integer, nullable=False)
+    mean_30d = Column(Numeric(5, 4))
+    count_30d = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    company = relationship("Company", back_populates="sentiment_daily")
+
+class FinancialMetrics(Base):
+    """Trailing-twelve-month sums and growth rates derived from financial_data."""
+    __tablename__ = "financial_metrics"
+
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    report_date = Column(Date, primary_key=True)
+    report_type = Column(String(10), primary_key=True)
+
+    # Trailing twelve months (four consecutive quarters; the year itself for 10-K)
+    revenue_ttm = Column(Numeric(20, 2))
+    operating_income_ttm = Column(Numeric(20, 2))
+    net_income_ttm = Column(Numeric(20, 2))
+    operating_cash_flow_ttm = Column(Numeric(20, 2))
+    eps_diluted_ttm = Column(Numeric(10, 3))
+
+    # Growth as a fraction of the prior period's absolute value
+    revenue_growth_qoq = Column(Numeric(12, 4))
+    revenue_growth_yoy = Column(Numeric(12, 4))
+    net_income_growth_qoq = Column(Numeric(12, 4))
+    net_income_growth_yoy = Column(Numeric(12, 4))
+    eps_growth_yoy = Column(Numeric(12, 4))
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("report_type IN ('10-K', '10-Q')"),
+    )
+
+class FinancialMetricsInput(Base):
+    """Hash of the statement inputs a company's derived metrics were last computed from."""
+    __tablename__ = "financial_metrics_inputs"
+
+    company_id = Column(Integer, ForeignKey("companies.id"), primary_key=True)
+    input_hash = Column(String(32), nullable=False)  # md5 over every period's statement columns
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,35 @@
+"""Provider access utilities shared by agents."""
+from .cache import ProviderCache, get_provider_cache
+from .executor import get_provider_executor, run_blocking, shutdown_provider_executor
+from .http import create_http_session
+from .recording import (
+    ProviderRecording,
+    RecordedProviderError,
+    RecordingMissError,
+    get_provider_recording,
+)
+from .rate_limit import (
+    RateLimitExceeded,
+    TokenBucket,
+    configure_rate_limiter,
+    get_rate_limiter,
+    rate_limit_state,
+)
+
+__all__ = [
+    "ProviderCache",
+    "ProviderRecording",
+    "RateLimitExceeded",
+    "RecordedProviderError",
+    "RecordingMissError",
+    "TokenBucket",
+    "configure_rate_limiter",
+    "create_http_session",
+    "get_provider_cache",
+    "get_provider_executor",
+    "get_provider_recording",
+    "get_rate_limiter",
+    "rate_limit_state",
+    "run_blocking",
+    "shutdown_provider_executor",
+]
@@ -0,0 +1,208 @@
+"""TTL/LRU cache for raw provider responses, optionally persisted to disk."""
+import asyncio
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+from aurora.config import CACHE_DIR, CACHE_MAX_ENTRIES, CACHE_TTL, ENABLE_CACHE
+
+__all__ = ["CacheKey", "ProviderCache", "get_provider_cache"]
+
+T = TypeVar("T")
+
+# (provider, endpoint, ticker)
+CacheKey = Tuple[str, str, str]
+
+_MISSING = object()
+
+
+class ProviderCache:
+    """Cache of provider responses keyed by ``(provider, endpoint, ticker)``.
+
+    Entries expire ``ttl`` seconds after being stored and the least recently
+    used entry is evicted once ``max_entries`` is reached. When ``cache_dir`` is
+    set, entries are also pickled to disk so later runs within the TTL reuse them.
+    Concurrent misses for one key share a single provider call.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        cache_dir: Optional[str] = CACHE_DIR,
+        enabled: bool = ENABLE_CACHE,
+    ):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Loads in progress, so concurrent misses for a key await the same call
+        self._inflight: Dict[CacheKey, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        if self.enabled and self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, key: CacheKey) -> Path:
+        digest = hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.pkl"  # type: ignore[operator]
+
+    def _read_disk(self, key: CacheKey) -> Tuple[float, Any]:
+        path = self._disk_path(key)
+        try:
+            with path.open("rb") as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return 0.0, _MISSING
+        if expires_at <= time.time():
+            path.unlink(missing_ok=True)
+            return 0.0, _MISSING
+        return expires_at, value
+
+    def _write_disk(self, key: CacheKey, expires_at: float, value: Any) -> None:
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with tmp.open("wb") as f:
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        except (OSError, pickle.PicklingError, TypeError):
+            tmp.unlink(missing_ok=True)
+
+    def _store(self, key: CacheKey, expires_at: float, value: Any) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: CacheKey, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` when absent or expired."""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: CacheKey) -> Any:
+        if not self.enabled:
+            self.misses += 1
+            return _MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self.cache_dir:
+                expires_at, value = self._read_disk(key)
+                if value is not _MISSING:
+                    self._store(key, expires_at, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return _MISSING
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, value)
+            if self.cache_dir:
+                self._write_disk(key, expires_at, value)
+
+    async def get_or_fetch(self, key: CacheKey, loader: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value for ``key``, awaiting ``loader()`` on a miss.
+
+        While one ``loader()`` for ``key`` is running, other callers missing
+        the same key wait for its result instead of calling the provider again.
+        Empty DataFrames (what yfinance returns when a call fails or has no
+        data) are returned but not cached.
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+        if not self.enabled:
+            return await loader()
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The caller that was loading was cancelled; load it ourselves
+                return await self.get_or_fetch(key, loader)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; nobody else has to retrieve it
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if not (isinstance(value, pd.DataFrame) and value.empty):
+            self.set(key, value)
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir and self.cache_dir.exists():
+                for path in self.cache_dir.glob("*.pkl"):
+                    path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache: Optional[ProviderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_provider_cache() -> ProviderCache:
+    """Return the process-wide provider cache, creating it from config."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProviderCache()
+        return _cache
@@ -0,0 +1,44 @@
+"""Dedicated thread pool for blocking provider clients such as yfinance."""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from aurora.config import PROVIDER_THREAD_POOL_SIZE
+
+__all__ = ["get_provider_executor", "run_blocking", "shutdown_provider_executor"]
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_provider_executor() -> ThreadPoolExecutor:
+    """Return the process-wide provider thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PROVIDER_THREAD_POOL_SIZE,
+                thread_name_prefix="aurora-provider",
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking provider call on the provider pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_provider_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_provider_executor(wait: bool = True) -> None:
+    """Shut down the provider pool; the next call to run_blocking recreates it."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
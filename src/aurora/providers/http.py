@@ -0,0 +1,30 @@
+"""Pooled HTTP client used for provider APIs."""
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from aurora.config import HTTP_CLIENT_SETTINGS
+
+__all__ = ["create_http_session"]
+
+
+def create_http_session(settings: Optional[Dict[str, Any]] = None) -> aiohttp.ClientSession:
+    """Create a long-lived ``aiohttp.ClientSession`` with a keep-alive connection pool.
+
+    ``settings`` overrides keys of ``HTTP_CLIENT_SETTINGS``. Must be called from a
+    running event loop; the caller owns the session and must close it.
+    """
+    options = {**HTTP_CLIENT_SETTINGS, **(settings or {})}
+    connector = aiohttp.TCPConnector(
+        limit=options["pool_limit"],
+        limit_per_host=options["pool_limit_per_host"],
+        use_dns_cache=True,
+        ttl_dns_cache=options["dns_cache_ttl"],
+        keepalive_timeout=options["keepalive_timeout"],
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=options["total_timeout"],
+        connect=options["connect_timeout"],
+        sock_read=options["read_timeout"],
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
@@ -0,0 +1,156 @@
+"""Token-bucket rate limiting shared by every provider call in the process."""
+import asyncio
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from aurora.config import PROVIDER_RATE_LIMITS
+
+__all__ = [
+    "RateLimitExceeded",
+    "TokenBucket",
+    "get_rate_limiter",
+    "configure_rate_limiter",
+    "rate_limit_state",
+]
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a provider's daily request budget is exhausted."""
+    pass
+
+
+class TokenBucket:
+    """Per-minute token bucket plus a per-day request budget for one provider.
+
+    Tokens refill continuously at ``requests_per_minute / 60`` per second up to
+    ``burst``. Callers reserve tokens under a thread lock and then sleep outside
+    it, so the bucket can be shared by coroutines on any event loop and by
+    worker threads alike. A limit of ``0`` disables that dimension.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: float = 0,
+        requests_per_day: int = 0,
+        burst: int = 1,
+    ):
+        self.provider = provider
+        self.requests_per_minute = requests_per_minute
+        self.requests_per_day = requests_per_day
+        self.burst = max(1, burst)
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._day = datetime.utcnow().date()
+        self._day_count = 0
+        self._total_requests = 0
+        self._waits = 0
+        self._total_wait = 0.0
+
+    @property
+    def _rate(self) -> float:
+        return self.requests_per_minute / 60.0
+
+    def _refill(self, now: float) -> None:
+        if self._rate > 0:
+            elapsed = now - self._updated
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self._rate)
+        self._updated = now
+
+    def _roll_day(self) -> None:
+        today: date = datetime.utcnow().date()
+        if today != self._day:
+            self._day = today
+            self._day_count = 0
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserve ``tokens`` and return how long the caller must wait for them."""
+        with self._lock:
+            self._roll_day()
+            if self.requests_per_day and self._day_count + tokens > self.requests_per_day:
+                raise RateLimitExceeded(
+                    f"{self.provider} daily budget of {self.requests_per_day} requests exhausted"
+                )
+            self._day_count += tokens
+            self._total_requests += tokens
+
+            if self._rate <= 0:
+                return 0.0
+
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+            if wait > 0:
+                self._waits += 1
+                self._total_wait += wait
+            return wait
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """Wait until ``tokens`` requests may be sent to the provider."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, tokens: int = 1) -> None:
+        """Blocking variant of :meth:`acquire` for use from worker threads."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def state(self) -> Dict[str, Any]:
+        """Return a snapshot of the current budget."""
+        with self._lock:
+            self._roll_day()
+            self._refill(time.monotonic())
+            return {
+                "provider": self.provider,
+                "requests_per_minute": self.requests_per_minute,
+                "requests_per_day": self.requests_per_day,
+                "tokens_available": round(self._tokens, 3),
+                "requests_today": self._day_count,
+                "remaining_today": (
+                    max(0, self.requests_per_day - self._day_count)
+                    if self.requests_per_day else None
+                ),
+                "total_requests": self._total_requests,
+                "waits": self._waits,
+                "total_wait_seconds": round(self._total_wait, 3),
+            }
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """Return the process-wide bucket for ``provider``, creating it from config."""
+    with _registry_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limits = PROVIDER_RATE_LIMITS.get(provider, {})
+            limiter = TokenBucket(provider, **limits)
+            _limiters[provider] = limiter
+        return limiter
+
+
+def configure_rate_limiter(
+    provider: str,
+    requests_per_minute: float = 0,
+    requests_per_day: int = 0,
+    burst: int = 1,
+) -> TokenBucket:
+    """Replace the shared bucket for ``provider`` with new limits."""
+    limiter = TokenBucket(provider, requests_per_minute, requests_per_day, burst)
+    with _registry_lock:
+        _limiters[provider] = limiter
+    return limiter
+
+
+def rate_limit_state(provider: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Return budget snapshots for one provider or every configured provider."""
+    providers = [provider] if provider else sorted(set(PROVIDER_RATE_LIMITS) | set(_limiters))
+    return {name: get_rate_limiter(name).state() for name in providers}
@@ -0,0 +1,220 @@
+"""Record raw provider responses to disk and replay them without the network.
+
+In ``record`` mode every provider call made through :meth:`ProviderRecording.call`
+is executed normally and its response (or error) is appended to
+``<dir>/responses.jsonl.gz`` together with how long the call took. In
+``replay`` mode the same calls are answered from that file, after sleeping
+the recorded duration divided by ``speed`` (``speed=0`` answers immediately).
+Rate limiters are bypassed on replay because no provider is contacted.
+
+DataFrames (yfinance statements) are stored as ``split`` dictionaries with
+their datetime period labels, everything else as JSON.
+"""
+import asyncio
+import atexit
+import gzip
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+from aurora.config import PROVIDER_RECORDING
+
+__all__ = [
+    "RECORDING_MODES",
+    "ProviderRecording",
+    "RecordedProviderError",
+    "RecordingMissError",
+    "get_provider_recording",
+]
+
+T = TypeVar("T")
+
+RECORDING_MODES = ("live", "record", "replay")
+RECORDING_FILE = "responses.jsonl.gz"
+
+# Request parameters never written to disk
+_SECRET_PARAMS = {"apikey"}
+# Parameters ignored when an exact replay match is missing (they depend on DB state)
+_LOOSE_PARAMS = {"time_from"}
+
+
+class RecordingMissError(LookupError):
+    """Raised on replay when no response was recorded for a call."""
+
+
+class RecordedProviderError(Exception):
+    """Replays a provider error that was captured while recording."""
+
+
+def _canonical_key(key: Any, drop: frozenset = frozenset()) -> str:
+    if isinstance(key, dict):
+        key = {k: v for k, v in key.items() if k not in _SECRET_PARAMS and k not in drop}
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+def _scalar(value: Any) -> Any:
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):  # numpy scalars
+        return _scalar(value.item())
+    return value
+
+
+def encode_payload(value: Any) -> Dict[str, Any]:
+    """Turn a provider response into a JSON-serialisable record payload."""
+    if isinstance(value, pd.DataFrame):
+        return {
+            "type": "dataframe",
+            "index": [_scalar(v) for v in value.index],
+            "columns": [_scalar(v) for v in value.columns],
+            "datetime_columns": isinstance(value.columns, pd.DatetimeIndex),
+            "data": [[_scalar(v) for v in row] for row in value.itertuples(index=False, name=None)],
+        }
+    return {"type": "json", "value": value}
+
+
+def decode_payload(payload: Dict[str, Any]) -> Any:
+    if payload["type"] == "dataframe":
+        columns = payload["columns"]
+        if payload.get("datetime_columns"):
+            columns = pd.DatetimeIndex(pd.to_datetime(columns))
+        try:
+            return pd.DataFrame(payload["data"], index=payload["index"], columns=columns, dtype="float64")
+        except (TypeError, ValueError):
+            return pd.DataFrame(payload["data"], index=payload["index"], columns=columns)
+    return payload["value"]
+
+
+class ProviderRecording:
+    """A recording of provider responses under ``path``, in ``record`` or ``replay`` mode."""
+
+    def __init__(self, path: str, mode: str = "replay", speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Recording mode must be 'record' or 'replay', got {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._file = None
+        self._started = time.monotonic()
+        # Replay indexes: exact key and loose key -> recorded entries in call order
+        self._exact: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._loose: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+
+    @property
+    def file(self) -> Path:
+        return self.path / RECORDING_FILE
+
+    def _load(self) -> None:
+        if not self.file.exists():
+            raise FileNotFoundError(f"No provider recording at {self.file}")
+        with gzip.open(self.file, "rt", encoding="utf-8") as handle:
+            try:
+                for line in handle:
+                    entry = json.loads(line)
+                    self._exact[(entry["provider"], entry["endpoint"], entry["key"])].append(entry)
+                    self._loose[(entry["provider"], entry["endpoint"], entry["loose_key"])].append(entry)
+            except (EOFError, json.JSONDecodeError):
+                # A recorder that was killed leaves its last gzip member unterminated;
+                # every flushed line before that point is still usable
+                pass
+
+    def tickers(self) -> List[str]:
+        """Tickers that have recorded Yahoo responses, in first-seen order."""
+        seen: Dict[str, None] = {}
+        for (provider, _, key), entries in self._exact.items():
+            if provider == "yahoo" and entries:
+                seen.setdefault(json.loads(key), None)
+        return list(seen)
+
+    def _take(self, index: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]], lookup) -> Optional[Dict[str, Any]]:
+        entries = index.get(lookup)
+        if not entries:
+            return None
+        # Serve repeated calls in recorded order; the last response repeats
+        return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.mkdir(parents=True, exist_ok=True)
+                # Appending adds a gzip member per session; readers see one stream
+                self._file = gzip.open(self.file, "at", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self.stats["recorded"] += 1
+
+    async def call(self, provider: str, endpoint: str, key: Any, loader: Callable[[], Awaitable[T]]) -> T:
+        """Run ``loader`` and record it, or answer it from the recording."""
+        exact = _canonical_key(key)
+        loose = _canonical_key(key, frozenset(_LOOSE_PARAMS))
+
+        if self.mode == "replay":
+            with self._lock:
+                entry = self._take(self._exact, (provider, endpoint, exact)) or self._take(
+                    self._loose, (provider, endpoint, loose)
+                )
+                if entry is None:
+                    self.stats["misses"] += 1
+                else:
+                    self.stats["replayed"] += 1
+            if entry is None:
+                raise RecordingMissError(f"No recorded {provider} {endpoint} response for {exact}")
+            if self.speed > 0:
+                await asyncio.sleep(entry["duration"] / self.speed)
+            if "error" in entry:
+                raise RecordedProviderError(entry["error"])
+            return decode_payload(entry["payload"])
+
+        started = time.monotonic()
+        record = {
+            "provider": provider,
+            "endpoint": endpoint,
+            "key": exact,
+            "loose_key": loose,
+            "offset": round(started - self._started, 4),
+        }
+        try:
+            value = await loader()
+        except Exception as e:
+            duration = round(time.monotonic() - started, 4)
+            self._write({**record, "duration": duration, "error": f"{type(e).__name__}: {e}"})
+            raise
+        self._write({**record, "duration": round(time.monotonic() - started, 4), "payload": encode_payload(value)})
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_recording: Optional[ProviderRecording] = None
+_recording_lock = threading.Lock()
+
+
+def get_provider_recording() -> Optional[ProviderRecording]:
+    """Return the process-wide recording from config, or None in live mode."""
+    global _recording
+    settings = PROVIDER_RECORDING
+    if settings["mode"] == "live":
+        return None
+    with _recording_lock:
+        if _recording is None:
+            _recording = ProviderRecording(settings["dir"], settings["mode"], settings["speed"])
+            atexit.register(_recording.close)
+        return _recording
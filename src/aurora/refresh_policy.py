@@ -0,0 +1,217 @@
+"""Adaptive per-ticker refresh intervals for the ingestion job queue.
+
+Each ticker is scored from its recent history:
+
+- news: articles newly linked to the company per day over the lookback window,
+  relative to the busiest ticker
+- fundamentals: whether a new ``financial_data`` period arrived in the window
+- report proximity: how close today is to the date the next quarterly filing
+  is expected (last quarter end + one quarter + the usual filing lag)
+
+A fixed daily refresh budget is then split across tickers in proportion to
+their scores, within ``[min_interval, max_interval]``, so provider quota goes
+to the names where fresh data actually appears.
+"""
+import logging
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, bindparam, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aurora.config import REFRESH_POLICY_SETTINGS
+from aurora.models import Company, FinancialData, IngestionJob, NewsArticleCompany
+
+__all__ = ["allocate_intervals", "score_tickers", "update_job_intervals"]
+
+logger = logging.getLogger("AuroraRefreshPolicy")
+
+DAY_SECONDS = 86400
+
+# Relative weight of each signal in a ticker's score
+SIGNAL_WEIGHTS = {"news": 0.5, "fundamentals": 0.2, "report": 0.3}
+# Every ticker keeps a small share so a quiet name is still sampled
+BASE_SCORE = 0.05
+
+# Quarterly filings land roughly one quarter plus a filing lag after the last period end
+QUARTER_DAYS = 91
+FILING_LAG_DAYS = 35
+# Width (days) of the window around the expected filing date that raises priority
+REPORT_WINDOW_DAYS = 10
+
+# Transaction-scoped advisory lock so one worker per pass recomputes intervals
+_ADVISORY_LOCK_KEY = 0x4155524F  # 'AURO'
+
+
+def report_proximity(last_report_date: Optional[date], today: date) -> float:
+    """1.0 on the expected next filing date, falling off over ``REPORT_WINDOW_DAYS``."""
+    if last_report_date is None:
+        return 0.0
+    expected = last_report_date + timedelta(days=QUARTER_DAYS + FILING_LAG_DAYS)
+    days_off = (today - expected).days
+    return math.exp(-(days_off ** 2) / (2 * REPORT_WINDOW_DAYS ** 2))
+
+
+async def score_tickers(
+    session: AsyncSession,
+    tickers: List[str],
+    lookback_days: Optional[int] = None,
+) -> Dict[str, float]:
+    """Score each ticker by how much fresh data it produced recently.
+
+    Tickers not in ``companies`` yet score 1.0 so they are ingested promptly.
+    """
+    lookback_days = lookback_days or REFRESH_POLICY_SETTINGS["lookback_days"]
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=lookback_days)
+
+    companies = dict(
+        (await session.execute(select(Company.ticker, Company.id).where(Company.ticker.in_(tickers)))).all()
+    )
+    company_ids = list(companies.values())
+
+    articles = dict(
+        (
+            await session.execute(
+                select(NewsArticleCompany.company_id, func.count())
+                .where(
+                    NewsArticleCompany.company_id.in_(company_ids),
+                    NewsArticleCompany.created_at >= since,
+                )
+                .group_by(NewsArticleCompany.company_id)
+            )
+        ).all()
+    )
+    financials = {
+        company_id: (last_quarter, last_created)
+        for company_id, last_quarter, last_created in (
+            await session.execute(
+                select(
+                    FinancialData.company_id,
+                    func.max(FinancialData.report_date).filter(FinancialData.report_type == "10-Q"),
+                    func.max(FinancialData.created_at),
+                )
+                .where(FinancialData.company_id.in_(company_ids))
+                .group_by(FinancialData.company_id)
+            )
+        ).all()
+    }
+
+    busiest = max(articles.values(), default=0) or 1
+    scores: Dict[str, float] = {}
+    for ticker in tickers:
+        company_id = companies.get(ticker)
+        if company_id is None:
+            scores[ticker] = 1.0
+            continue
+        last_quarter, last_created = financials.get(company_id, (None, None))
+        signals = {
+            "news": articles.get(company_id, 0) / busiest,
+            "fundamentals": 1.0 if last_created and last_created >= since else 0.0,
+            "report": report_proximity(last_quarter, now.date()),
+        }
+        scores[ticker] = BASE_SCORE + sum(SIGNAL_WEIGHTS[k] * v for k, v in signals.items())
+    return scores
+
+
+def allocate_intervals(
+    scores: Dict[str, float],
+    budget_per_day: float,
+    min_interval: float,
+    max_interval: float,
+) -> Dict[str, int]:
+    """Split ``budget_per_day`` refreshes across tickers in proportion to score.
+
+    Every ticker gets at least one refresh per ``max_interval`` and at most one
+    per ``min_interval``; runs a capped ticker cannot use are handed to the
+    rest. Returns the refresh interval in seconds per ticker.
+    """
+    if not scores:
+        return {}
+    floor = DAY_SECONDS / max_interval
+    ceiling = DAY_SECONDS / min_interval
+    runs = {ticker: floor for ticker in scores}
+    remaining = max(budget_per_day - floor * len(scores), 0.0)
+    open_tickers = set(scores)
+
+    # Water-filling: give out the remaining budget by score until it is spent
+    # or every ticker hits the ceiling
+    while remaining > 1e-9 and open_tickers:
+        total = sum(scores[t] for t in open_tickers)
+        spent = 0.0
+        for ticker in list(open_tickers):
+            share = remaining * (scores[ticker] / total if total else 1 / len(open_tickers))
+            grant = min(share, ceiling - runs[ticker])
+            runs[ticker] += grant
+            spent += grant
+            if runs[ticker] >= ceiling - 1e-9:
+                open_tickers.discard(ticker)
+        remaining -= spent
+        if spent <= 1e-9:
+            break
+
+    return {ticker: int(round(DAY_SECONDS / runs[ticker])) for ticker in scores}
+
+
+async def update_job_intervals(session: AsyncSession, base_interval: Optional[int] = None) -> Dict[str, int]:
+    """Recompute ``interval_seconds`` for every recurring job.
+
+    The daily budget is ``REFRESH_BUDGET_PER_DAY``, or, when that is 0, the
+    number of refreshes the recurring jobs would get at ``base_interval``
+    (default: at their current intervals), so adapting shifts quota between
+    tickers without raising total provider usage. Queued jobs whose interval
+    shrank are pulled forward. Returns the new intervals; empty when another
+    worker holds the policy lock. The caller commits.
+    """
+    locked = (
+        await session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+    ).scalar_one()
+    if not locked:
+        return {}
+
+    jobs = dict(
+        (
+            await session.execute(
+                select(IngestionJob.ticker, IngestionJob.interval_seconds).where(
+                    IngestionJob.interval_seconds.is_not(None)
+                )
+            )
+        ).all()
+    )
+    if not jobs:
+        return {}
+
+    settings = REFRESH_POLICY_SETTINGS
+    if settings["budget_per_day"]:
+        budget = settings["budget_per_day"]
+    elif base_interval:
+        budget = len(jobs) * DAY_SECONDS / base_interval
+    else:
+        budget = sum(DAY_SECONDS / interval for interval in jobs.values())
+
+    scores = await score_tickers(session, list(jobs))
+    intervals = allocate_intervals(scores, budget, settings["min_interval"], settings["max_interval"])
+
+    now = datetime.now(timezone.utc)
+    changed = [
+        {"job_ticker": ticker, "job_interval": interval, "due_by": now + timedelta(seconds=interval)}
+        for ticker, interval in intervals.items()
+        if interval != jobs[ticker]
+    ]
+    if changed:
+        table = IngestionJob.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.ticker == bindparam("job_ticker"))
+            .values(
+                interval_seconds=bindparam("job_interval"),
+                next_run_at=func.least(table.c.next_run_at, bindparam("due_by", type_=DateTime(timezone=True))),
+            ),
+            changed,
+        )
+    logger.info(
+        "Refresh intervals for %d tickers (budget %.0f/day): %s",
+        len(intervals), budget, intervals,
+    )
+    return intervals
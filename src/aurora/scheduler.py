@@ -1,19 +1,202 @@
 import asyncio
 import logging
 import os
-from typing import List, Callable, Any
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from aiohttp import web
 
 from aurora.agents.data_ingestion import DataIngestionAgent
+from aurora.analytics import refresh_financial_metrics, refresh_sentiment
+from aurora.config import FUNDAMENTALS_SETTINGS, NEWS_BATCH, SENTIMENT_SETTINGS
+from aurora.database import async_engine, get_pool_stats
+from aurora.jobs import JobWorker, enqueue_jobs
+from aurora.log import configure_logging
+from aurora.metrics import get_metrics_registry
+from aurora.providers import get_provider_cache
 
 logger = logging.getLogger("AuroraScheduler")
 
+# What to do with slots that passed while a fixed-rate/cron task was late
+CATCH_UP_POLICIES = ("latest", "skip", "all")
+
+
+def shard_items(items: List[Any], shards: int) -> List[List[Any]]:
+    """Split ``items`` round-robin into at most ``shards`` non-empty groups."""
+    shards = max(1, min(shards, len(items)))
+    return [items[i::shards] for i in range(shards)] if items else []
+
+
+class CronSchedule:
+    """A five-field cron expression (minute hour day-of-month month day-of-week), in UTC.
+
+    Supports ``*``, numbers, ranges (``1-5``), steps (``*/15``, ``0-30/10``) and
+    comma-separated lists. Day-of-week is 0-6 with Sunday as 0 (7 also means Sunday).
+    """
+
+    _FIELDS = (
+        ("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)
+    )
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        values = [
+            self._parse_field(part, low, high) for part, (_, low, high) in zip(parts, self._FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = {d % 7 for d in weekdays}
+        # Standard cron: when both day fields are restricted, either may match
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f"Invalid cron step in {field!r}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return in_weekdays
+        if self._any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first matching minute strictly after ``moment``."""
+        candidate = moment.astimezone(timezone.utc).replace(second=0, microsecond=0)
+        candidate += timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(
+                    year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+class FixedRateSchedule:
+    """Slots every ``seconds`` from the first slot, independent of run duration."""
+
+    def __init__(self, seconds: float, start_delay: float = 0.0):
+        if seconds <= 0:
+            raise ValueError("Fixed-rate period must be positive")
+        self.seconds = seconds
+        self.start_delay = start_delay
+        self._origin: Optional[float] = None
+
+    def next_after(self, moment: datetime) -> datetime:
+        now = moment.timestamp()
+        if self._origin is None:
+            self._origin = now + self.start_delay
+            return datetime.fromtimestamp(self._origin, timezone.utc)
+        # Small epsilon so a slot's own (rounded) timestamp maps to the next slot
+        slots = max(int((now - self._origin) / self.seconds + 1e-6) + 1, 0)
+        following = self._origin + slots * self.seconds
+        if following <= now:
+            following += self.seconds
+        # Rounding to microseconds can land a slot back on ``moment`` itself
+        if datetime.fromtimestamp(following, timezone.utc) <= moment:
+            following += self.seconds
+        return datetime.fromtimestamp(following, timezone.utc)
+
+
+class TaskStats:
+    """Run counts, latency and lateness for one scheduled task."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.runs = 0
+        self.failures = 0
+        self.skipped_overlap = 0
+        self.skipped_missed = 0
+        self.running = 0
+        self.last_started: Optional[datetime] = None
+        self.last_latency = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+
+    def record_start(self, lateness: float) -> None:
+        self.running += 1
+        self.last_started = datetime.now(timezone.utc)
+        self.lateness_total += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+
+    def record_finish(self, latency: float, failed: bool) -> None:
+        self.running -= 1
+        self.runs += 1
+        self.failures += int(failed)
+        self.last_latency = latency
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        started = self.runs + self.running
+        return {
+            "name": self.name,
+            "runs": self.runs,
+            "failures": self.failures,
+            "running": self.running,
+            "skipped_overlap": self.skipped_overlap,
+            "skipped_missed": self.skipped_missed,
+            "last_started": self.last_started.isoformat() if self.last_started else None,
+            "last_latency": round(self.last_latency, 3),
+            "avg_latency": round(self.latency_total / self.runs, 3) if self.runs else 0.0,
+            "max_latency": round(self.latency_max, 3),
+            "avg_lateness": round(self.lateness_total / started, 3) if started else 0.0,
+            "max_lateness": round(self.lateness_max, 3),
+        }
+
 
 class AsyncScheduler:
     """A lightweight asyncio-based scheduler for periodic tasks.
 
+    ``add_periodic_task`` waits ``seconds`` after each run finishes (fixed delay).
+    ``add_fixed_rate_task`` and ``add_cron_task`` fire on fixed slots instead, with
+    optional jitter, a cap on overlapping runs and a catch-up policy for late slots:
+    ``latest`` runs once, for the newest of the missed slots, ``skip`` drops
+    them and ``all`` runs each of them.
+
     Usage:
         scheduler = AsyncScheduler()
         scheduler.add_periodic_task(func, seconds=300, *args, **kwargs)
+        scheduler.add_fixed_rate_task(func, seconds=300, jitter=5, *args, **kwargs)
+        scheduler.add_cron_task(func, "*/15 * * * *", *args, **kwargs)
         asyncio.run(scheduler.start())
     """
 
@@ -22,6 +205,9 @@ class AsyncScheduler:
         # Each runner is a callable that returns an awaitable (coroutine)
         # Use Any to avoid strict typing issues with different awaitable types
         self._runners: List[Callable[[], Any]] = []
+        # In-flight runs started by fixed-rate and cron runners
+        self._inflight: Set[asyncio.Task] = set()
+        self._stats: Dict[str, TaskStats] = {}
         self._stop = False
 
     def add_periodic_task(self, coro_func: Callable[..., Any], seconds: int, *args, **kwargs):
@@ -36,6 +222,155 @@ class AsyncScheduler:
         # store the runner function (async function) directly
         self._runners.append(runner)
 
+    def add_fixed_rate_task(
+        self,
+        coro_func: Callable[..., Any],
+        seconds: float,
+        *args,
+        name: Optional[str] = None,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        catch_up: str = "latest",
+        start_delay: float = 0.0,
+        **kwargs,
+    ) -> TaskStats:
+        """Run ``coro_func`` every ``seconds`` measured from slot to slot.
+
+        The first slot is ``start_delay`` seconds after the scheduler starts.
+        """
+        schedule = FixedRateSchedule(seconds, start_delay=start_delay)
+        return self._add_slotted_task(
+            schedule, coro_func, args, kwargs, name, jitter, max_concurrency, catch_up
+        )
+
+    def add_cron_task(
+        self,
+        coro_func: Callable[..., Any],
+        cron: str,
+        *args,
+        name: Optional[str] = None,
+        jitter: float = 0.0,
+        max_concurrency: int = 1,
+        catch_up: str = "latest",
+        **kwargs,
+    ) -> TaskStats:
+        """Run ``coro_func`` at the times matched by a five-field UTC cron expression."""
+        return self._add_slotted_task(
+            CronSchedule(cron), coro_func, args, kwargs, name, jitter, max_concurrency, catch_up
+        )
+
+    def _add_slotted_task(
+        self,
+        schedule: Any,
+        coro_func: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict[str, Any],
+        name: Optional[str],
+        jitter: float,
+        max_concurrency: int,
+        catch_up: str,
+    ) -> TaskStats:
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}")
+        name = name or f"{getattr(coro_func, '__name__', 'task')}-{len(self._runners)}"
+        stats = TaskStats(name)
+        self._stats[name] = stats
+
+        async def run_once(slot: datetime, planned: float) -> None:
+            stats.record_start(max(0.0, time.time() - planned))
+            started = time.perf_counter()
+            failed = False
+            try:
+                await coro_func(*args, **kwargs)
+            except Exception:
+                failed = True
+                logger.exception("Scheduled task %s failed (slot %s)", name, slot.isoformat())
+            finally:
+                stats.record_finish(time.perf_counter() - started, failed)
+
+        def launch(slot: datetime, planned: float) -> None:
+            if stats.running >= max_concurrency:
+                stats.skipped_overlap += 1
+                logger.warning("Skipping %s slot %s: previous run still active", name, slot.isoformat())
+                return
+            task = asyncio.get_running_loop().create_task(run_once(slot, planned))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+        async def runner():
+            slot = schedule.next_after(datetime.now(timezone.utc))
+            while not self._stop:
+                planned = slot.timestamp() + (random.uniform(0, jitter) if jitter > 0 else 0.0)
+                delay = planned - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                # Slots that also came due while we were waiting or running late
+                now = datetime.now(timezone.utc)
+                missed = []
+                following = schedule.next_after(slot)
+                while following <= now:
+                    missed.append(following)
+                    following = schedule.next_after(following)
+
+                if catch_up == "all":
+                    for due in [slot] + missed:
+                        launch(due, due.timestamp())
+                elif catch_up == "skip" and missed:
+                    stats.skipped_missed += len(missed) + 1
+                    logger.warning("Skipping %d missed slots of %s", len(missed) + 1, name)
+                else:
+                    stats.skipped_missed += len(missed)
+                    if missed:
+                        # Run once, for the newest slot that is due
+                        slot = missed[-1]
+                        planned = slot.timestamp()
+                    launch(slot, planned)
+                slot = following
+
+        self._runners.append(runner)
+        return stats
+
+    def add_sharded_task(
+        self,
+        coro_func: Callable[..., Any],
+        items: List[Any],
+        seconds: float,
+        shards: int,
+        *args,
+        items_arg: str = "tickers",
+        name: Optional[str] = None,
+        jitter: float = 0.0,
+        catch_up: str = "latest",
+        **kwargs,
+    ) -> List[TaskStats]:
+        """Spread ``items`` over the period as evenly staggered fixed-rate shards.
+
+        Shard ``i`` receives its items as ``items_arg`` and first fires
+        ``i * seconds / shards`` after start, so every item still runs once per
+        period while load arrives as a steady stream instead of one burst.
+        """
+        groups = shard_items(items, shards)
+        name = name or getattr(coro_func, "__name__", "task")
+        return [
+            self.add_fixed_rate_task(
+                coro_func,
+                seconds,
+                *args,
+                name=f"{name}-shard{i}",
+                jitter=jitter,
+                catch_up=catch_up,
+                start_delay=i * seconds / len(groups),
+                **{items_arg: group},
+                **kwargs,
+            )
+            for i, group in enumerate(groups)
+        ]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-task run counts, latency and lateness for fixed-rate and cron tasks."""
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
     async def start(self):
         logger.info("Starting AsyncScheduler with %d runners", len(self._runners))
         loop = asyncio.get_running_loop()
@@ -51,7 +386,7 @@ class AsyncScheduler:
     def stop(self):
         logger.info("Stopping scheduler")
         self._stop = True
-        for t in self._tasks:
+        for t in self._tasks + list(self._inflight):
             t.cancel()
 
 
@@ -75,19 +410,124 @@ def load_tickers_from_env() -> List[str]:
     return [t.strip().upper() for t in raw.split(",") if t.strip()]
 
 
+async def run_queue_worker(tickers: List[str], interval: int) -> None:
+    """Enqueue ``tickers`` as recurring jobs and drain the shared Postgres queue.
+
+    Every node runs this same loop; enqueueing is idempotent and claims use
+    SKIP LOCKED, so adding containers spreads tickers without double-fetching.
+    """
+    await enqueue_jobs(tickers, interval_seconds=interval)
+    await JobWorker(base_interval=interval).run_forever()
+
+
+def collect_runtime_gauges(scheduler: Optional[AsyncScheduler] = None) -> None:
+    """Copy pool, cache and scheduler task stats into the metrics registry as gauges."""
+    registry = get_metrics_registry()
+    for pool, stats in get_pool_stats().items():
+        for key in ("size", "checked_out", "overflow", "checkouts", "wait_seconds_total", "timeouts"):
+            registry.set_gauge(f"db_pool_{key}", stats[key], pool=pool)
+    for key, value in get_provider_cache().stats().items():
+        if key != "enabled":
+            registry.set_gauge(f"provider_cache_{key}", value)
+    if scheduler is not None:
+        for name, stats in scheduler.get_stats().items():
+            for key in ("runs", "failures", "running", "skipped_overlap", "skipped_missed", "last_latency"):
+                registry.set_gauge(f"scheduler_task_{key}", stats[key], task=name)
+
+
+async def start_metrics_server(
+    port: int, host: str = "0.0.0.0", scheduler: Optional[AsyncScheduler] = None
+) -> web.AppRunner:
+    """Serve ``/metrics`` (Prometheus text) and ``/metrics.json`` on ``host:port``."""
+    registry = get_metrics_registry()
+
+    async def metrics(request: web.Request) -> web.Response:
+        collect_runtime_gauges(scheduler)
+        return web.Response(text=registry.export_prometheus(), content_type="text/plain")
+
+    async def metrics_json(request: web.Request) -> web.Response:
+        collect_runtime_gauges(scheduler)
+        return web.json_response(registry.snapshot())
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/metrics.json", metrics_json)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, port)
+    return runner
+
+
 async def main_loop():
+    mode = os.getenv("SCHEDULE_MODE", "local").lower()
     interval = int(os.getenv("SCHEDULE_INTERVAL_SECONDS", "3600"))
+    cron = os.getenv("SCHEDULE_CRON", "").strip()
+    jitter = float(os.getenv("SCHEDULE_JITTER_SECONDS", "0"))
+    catch_up = os.getenv("SCHEDULE_CATCH_UP", "latest")
+    # 0 = automatic: up to one shard per minute of the interval. With batched
+    # news every shard requests the whole market-wide feed, so the automatic
+    # default is a single shard there
+    shards = int(os.getenv("SCHEDULE_SHARDS", "0")) or (1 if NEWS_BATCH else max(1, interval // 60))
+    if NEWS_BATCH and shards > 1 and not cron:
+        logger.warning(
+            "SCHEDULE_SHARDS=%d with NEWS_BATCH: each shard fetches the market-wide news feed", shards
+        )
+    metrics_port = int(os.getenv("METRICS_PORT", "0"))
     tickers = load_tickers_from_env()
 
     scheduler = AsyncScheduler()
-    # add ingestion runner
-    scheduler.add_periodic_task(run_ingestion_for_tickers, seconds=interval, tickers=tickers)
+    metrics_server = (
+        await start_metrics_server(metrics_port, scheduler=scheduler) if metrics_port else None
+    )
+
+    if mode == "queue":
+        try:
+            await run_queue_worker(tickers, interval)
+        finally:
+            if metrics_server:
+                await metrics_server.cleanup()
+            await async_engine.dispose()
+        return
+
+    # add ingestion runner on fixed slots (cron expression if given)
+    if cron:
+        scheduler.add_cron_task(
+            run_ingestion_for_tickers, cron, name="ingestion",
+            jitter=jitter, catch_up=catch_up, tickers=tickers,
+        )
+    else:
+        # stagger ticker shards evenly across the interval
+        scheduler.add_sharded_task(
+            run_ingestion_for_tickers, tickers, interval, shards, name="ingestion",
+            jitter=jitter, catch_up=catch_up,
+        )
 
-    await scheduler.start()
+    # keep the precomputed sentiment series current with what was ingested
+    if SENTIMENT_SETTINGS["refresh_seconds"] > 0:
+        scheduler.add_fixed_rate_task(
+            refresh_sentiment, SENTIMENT_SETTINGS["refresh_seconds"], name="sentiment",
+            start_delay=SENTIMENT_SETTINGS["refresh_seconds"],
+        )
+    # derive ratios, TTM sums and growth for companies whose fundamentals changed
+    if FUNDAMENTALS_SETTINGS["refresh_seconds"] > 0:
+        scheduler.add_fixed_rate_task(
+            refresh_financial_metrics, FUNDAMENTALS_SETTINGS["refresh_seconds"], name="fundamentals",
+            start_delay=FUNDAMENTALS_SETTINGS["refresh_seconds"],
+        )
+
+    try:
+        await scheduler.start()
+    finally:
+        logger.info("Scheduler task stats: %s", scheduler.get_stats())
+        if metrics_server:
+            await metrics_server.cleanup()
+        # Close pooled asyncpg connections while the loop is still running
+        await async_engine.dispose()
 
 
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO)
+    configure_logging()
     try:
         asyncio.run(main_loop())
     except KeyboardInterrupt:
@@ -75,6 +75,40 @@ class NewsSentiment(NewsSentimentBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class NewsArticleBase(BaseModel):
+    url: str
+    published_at: datetime
+    title: str
+    summary: Optional[str] = None
+    source: str
+    sentiment_score: Optional[Decimal] = None
+    sentiment_label: Optional[str] = None
+
+class NewsArticleCreate(NewsArticleBase):
+    pass
+
+class NewsArticle(NewsArticleBase):
+    id: int
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class NewsArticleCompanyBase(BaseModel):
+    company_id: int
+    article_id: int
+    published_at: datetime
+    relevance_score: Optional[Decimal] = None
+    ticker_sentiment_score: Optional[Decimal] = None
+    ticker_sentiment_label: Optional[str] = None
+
+class NewsArticleCompanyCreate(NewsArticleCompanyBase):
+    pass
+
+class NewsArticleCompany(NewsArticleCompanyBase):
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
 class ResearchReportBase(BaseModel):
     company_id: int
     report_type: str
@@ -0,0 +1,272 @@
+"""Opt-in SQL statement profiler and N+1 detector.
+
+:class:`SQLProfiler` listens to ``before/after_cursor_execute`` on one or more
+engines and attributes every statement to the logical units active in the
+current :func:`aurora.log.log_context` (by default ``ticker`` and
+``run_id``). For each unit it counts statements, DB seconds and rows, and it
+keeps per-unit counts of normalised statement *shapes* (literals, bind
+parameters and ``IN``/``VALUES`` lists collapsed) so that a query issued once
+per row shows up as a repeated shape.
+
+``database.sql_profiler`` is attached to both engines when ``SQL_PROFILE`` is
+set; :meth:`SQLProfiler.profile` attaches it for one block, e.g. in a test::
+
+    with sql_profiler.profile():
+        await agent.run(["AAPL", "MSFT"])
+    sql_profiler.assert_budget(12, unit="ticker", max_repeats=5)
+"""
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from aurora.log import current_context
+
+__all__ = ["SQLProfiler", "StatementBudgetExceeded", "normalize_statement"]
+
+_STARTED_KEY = "aurora_sql_profiler_started"
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_CAST = re.compile(r"::[\w\[\]]+(?:\(\d+(?:,\s*\d+)?\))?")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_ROWS = re.compile(r"(\(\?(?:, \?)*\))(?:\s*,\s*\1)+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape: literals and parameters become ``?``."""
+    shape = _COMMENT.sub(" ", statement)
+    shape = _STRING.sub("?", shape)
+    shape = _CAST.sub("", shape)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _SPACE.sub(" ", shape).strip()
+    # IN (?, ?, ?) and multi-row VALUES (?, ?), (?, ?) differ only in length
+    shape = _ROWS.sub(r"\1, ...", shape)
+    shape = _LIST.sub("(?...)", shape)
+    return shape
+
+
+class StatementBudgetExceeded(AssertionError):
+    """Raised by :meth:`SQLProfiler.assert_budget` when a unit goes over budget."""
+
+
+class _UnitStats:
+    __slots__ = ("statements", "seconds", "rows", "shapes")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.shapes: Counter = Counter()
+
+    def add(self, shape: str, seconds: float, rows: int) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.rows += rows
+        self.shapes[shape] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"statements": self.statements, "seconds": round(self.seconds, 6), "rows": self.rows}
+
+
+class SQLProfiler:
+    """Per-unit statement counts, DB time and rows for the engines it is attached to."""
+
+    def __init__(self, units: Sequence[str] = ("ticker", "run_id"), repeat_threshold: int = 5):
+        self.units = tuple(units)
+        self.repeat_threshold = repeat_threshold
+        self._lock = threading.Lock()
+        self._engines: List[Engine] = []
+        self._profiling = 0
+        self.reset()
+
+    # -- wiring ---------------------------------------------------------
+
+    @property
+    def attached(self) -> bool:
+        return bool(self._engines)
+
+    def attach(self, *engines: Any) -> None:
+        """Start listening on ``engines`` (sync engines or ``AsyncEngine``)."""
+        for engine in engines:
+            engine = getattr(engine, "sync_engine", engine)
+            if engine in self._engines:
+                continue
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            event.listen(engine, "handle_error", self._error)
+            self._engines.append(engine)
+
+    def detach(self) -> None:
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+            event.remove(engine, "handle_error", self._error)
+        self._engines = []
+
+    @property
+    def retaining(self) -> bool:
+        """True inside :meth:`profile`, where callers read the stats afterwards."""
+        return self._profiling > 0
+
+    @contextmanager
+    def profile(self, *engines: Any, reset: bool = True) -> Iterator["SQLProfiler"]:
+        """Profile the block; attaches to ``engines`` (default: both app engines) if needed."""
+        if not engines:
+            from aurora.database import async_engine, engine
+
+            engines = (engine, async_engine)
+        was_attached = self.attached
+        if reset:
+            self.reset()
+        self.attach(*engines)
+        self._profiling += 1
+        try:
+            yield self
+        finally:
+            self._profiling -= 1
+            if not was_attached:
+                self.detach()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._total = _UnitStats()
+            self._units: Dict[Tuple[str, Any], _UnitStats] = defaultdict(_UnitStats)
+
+    def forget(self, unit: str, *values: Any) -> None:
+        """Drop the stats of finished units so a long-running process stays bounded."""
+        with self._lock:
+            for value in values:
+                self._units.pop((unit, value), None)
+
+    # -- event handlers ---------------------------------------------------
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get(_STARTED_KEY)
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        rows = getattr(cursor, "rowcount", -1)
+        rows = rows if isinstance(rows, int) and rows > 0 else 0
+        self._record(statement, seconds, rows)
+
+    def _error(self, exception_context) -> None:
+        conn = exception_context.connection
+        started = conn.info.get(_STARTED_KEY) if conn is not None else None
+        if started:
+            seconds = time.perf_counter() - started.pop()
+            if exception_context.statement:
+                self._record(exception_context.statement, seconds, 0)
+
+    def _record(self, statement: str, seconds: float, rows: int) -> None:
+        shape = normalize_statement(statement)
+        context = current_context()
+        with self._lock:
+            self._total.add(shape, seconds, rows)
+            for unit in self.units:
+                value = context.get(unit)
+                if value is not None:
+                    self._units[(unit, value)].add(shape, seconds, rows)
+
+    # -- reporting --------------------------------------------------------
+
+    def unit_stats(self, unit: str, value: Any) -> Dict[str, Any]:
+        """Totals for one unit, e.g. ``unit_stats("ticker", "AAPL")``."""
+        with self._lock:
+            stats = self._units.get((unit, value))
+            return stats.as_dict() if stats else _UnitStats().as_dict()
+
+    def repeated(self, threshold: Optional[int] = None, unit: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Statement shapes issued more than ``threshold`` times within one unit.
+
+        Defaults to the finest unit (the first in ``units``), where a repeated
+        shape is most likely a per-row query.
+        """
+        threshold = self.repeat_threshold if threshold is None else threshold
+        unit = unit or (self.units[0] if self.units else None)
+        found = []
+        with self._lock:
+            for (name, value), stats in self._units.items():
+                if name != unit:
+                    continue
+                for shape, count in stats.shapes.items():
+                    if count > threshold:
+                        found.append({"unit": name, "value": value, "shape": shape, "count": count})
+        return sorted(found, key=lambda item: -item["count"])
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """Totals, per-unit stats, the most frequent shapes and repeated-shape suspects."""
+        with self._lock:
+            units: Dict[str, Dict[str, Any]] = {unit: {} for unit in self.units}
+            for (name, value), stats in self._units.items():
+                units[name][str(value)] = stats.as_dict()
+            total = self._total.as_dict()
+            shapes = [
+                {"shape": shape, "count": count}
+                for shape, count in self._total.shapes.most_common(top)
+            ]
+        return {"total": total, "units": units, "top_shapes": shapes, "repeated": self.repeated()}
+
+    def summary(self, unit: Optional[str] = None) -> Dict[str, Any]:
+        """Compact totals plus per-unit averages and maxima, suitable for logging."""
+        unit = unit or (self.units[0] if self.units else None)
+        with self._lock:
+            per_unit = [stats for (name, _), stats in self._units.items() if name == unit]
+            total = self._total.as_dict()
+        summary: Dict[str, Any] = dict(total)
+        if per_unit:
+            summary[f"{unit}s"] = len(per_unit)
+            summary[f"statements_per_{unit}"] = round(sum(s.statements for s in per_unit) / len(per_unit), 2)
+            summary[f"max_statements_per_{unit}"] = max(s.statements for s in per_unit)
+        return summary
+
+    def assert_budget(
+        self,
+        max_statements: int,
+        unit: Optional[str] = None,
+        value: Any = None,
+        max_repeats: Optional[int] = None,
+    ) -> None:
+        """Fail if any ``unit`` (or just ``unit=value``) ran more than ``max_statements``.
+
+        With ``unit=None`` the budget applies to everything recorded. With
+        ``max_repeats`` no single statement shape may run more often than that
+        within one unit either.
+        """
+        problems = []
+        with self._lock:
+            if unit is None:
+                if self._total.statements > max_statements:
+                    problems.append(f"{self._total.statements} statements > budget {max_statements}")
+                candidates = []
+            else:
+                candidates = [
+                    (name_value, stats) for name_value, stats in self._units.items()
+                    if name_value[0] == unit and (value is None or name_value[1] == value)
+                ]
+            for (name, unit_value), stats in candidates:
+                if stats.statements > max_statements:
+                    problems.append(
+                        f"{name}={unit_value}: {stats.statements} statements > budget {max_statements}"
+                    )
+        if max_repeats is not None:
+            for item in self.repeated(max_repeats, unit):
+                if value is None or item["value"] == value:
+                    problems.append(
+                        f"{item['unit']}={item['value']}: shape repeated {item['count']}x "
+                        f"(> {max_repeats}): {item['shape'][:200]}"
+                    )
+        if problems:
+            raise StatementBudgetExceeded("SQL statement budget exceeded:\n  " + "\n  ".join(problems))
@@ -0,0 +1,259 @@
+"""Tests for the COPY-based bulk loader.
+
+Most run against a recording DB-API connection; the partial re-load test
+writes to the configured Postgres database and is skipped when none is
+reachable.
+"""
+import csv
+import io
+
+import pytest
+from sqlalchemy import text
+
+from aurora import bulk_load
+from aurora.database import engine
+
+
+class FakeCursor:
+    """Records COPY payloads and statements; keeps bulk_load_progress in memory."""
+
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+        self._row = None
+
+    def execute(self, sql, params=None):
+        self.db.statements.append(sql)
+        if sql.startswith("DELETE FROM bulk_load_progress"):
+            self.db.progress.pop(params, None)
+        elif sql.startswith("INSERT INTO bulk_load_progress"):
+            dataset, source, size, chunk_size = params
+            self.db.progress.setdefault((dataset, source), [size, chunk_size, 0])
+        elif sql.startswith("SELECT source_size"):
+            self._row = tuple(self.db.progress[params])
+        elif sql.startswith("UPDATE bulk_load_progress SET chunks_done"):
+            chunks_done, _, dataset, source = params
+            self.db.progress[(dataset, source)][2] = chunks_done
+        elif sql.startswith("UPDATE bulk_load_progress SET source_size"):
+            size, chunk_size, dataset, source = params
+            self.db.progress[(dataset, source)][:2] = [size, chunk_size]
+        elif sql.startswith("INSERT INTO"):
+            self.rowcount = len(self.db.copies[-1])
+            if self.db.fail_on_merge and len(self.db.copies) == self.db.fail_on_merge:
+                raise RuntimeError("connection lost")
+
+    def fetchone(self):
+        return self._row
+
+    def copy_expert(self, sql, buffer):
+        self.db.copy_sql = sql
+        self.db.copies.append(list(csv.reader(io.StringIO(buffer.read()))))
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db.commits += 1
+
+    def rollback(self):
+        self.db.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.progress = {}
+        self.statements = []
+        self.copies = []
+        self.copy_sql = None
+        self.commits = self.rollbacks = 0
+        self.fail_on_merge = None
+
+    def raw_connection(self):
+        return FakeConnection(self)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(bulk_load, "engine", db)
+    return db
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_companies_are_staged_in_chunks(db, tmp_path):
+    path = _write_csv(
+        tmp_path / "companies.csv", ["ticker", "name", "sector"],
+        [[" aapl ", "Apple", "Technology"], ["msft", "Microsoft", ""], ["nvda", "NVIDIA", "Technology"]],
+    )
+    summary = bulk_load.load_file("companies", path, chunk_size=2)
+
+    assert summary["chunks"] == 2
+    assert summary["rows_staged"] == 3
+    assert summary["rows_merged"] == 3
+    assert db.copy_sql.startswith("COPY stage_companies (ticker, name, sector) FROM STDIN")
+    assert db.copies[0][0] == ["AAPL", "Apple", "Technology"]
+    # Empty cells are staged as NULL
+    assert db.copies[0][1] == ["MSFT", "Microsoft", ""]
+    assert db.progress[("companies", summary["source"])][2] == 2
+
+
+def test_fundamentals_merge_resolves_company_ids(db, tmp_path):
+    path = _write_csv(
+        tmp_path / "fundamentals.csv", ["ticker", "report_date", "report_type", "revenue"],
+        [["AAPL", "2024-03-31", "10-Q", "90753000000"]],
+    )
+    bulk_load.load_file("fundamentals", path)
+    merge = next(s for s in db.statements if s.startswith("INSERT INTO financial_data"))
+    assert "JOIN companies c ON c.ticker = s.ticker" in merge
+    assert "ON CONFLICT (company_id, report_date, report_type) DO UPDATE" in merge
+
+
+def test_partial_file_only_updates_its_columns(db, tmp_path):
+    path = _write_csv(tmp_path / "companies.csv", ["name", "ticker"], [["Apple Inc.", "AAPL"]])
+    bulk_load.load_file("companies", path)
+
+    merge = next(s for s in db.statements if s.startswith("INSERT INTO companies"))
+    assert merge.startswith("INSERT INTO companies (ticker, name) SELECT")
+    assert merge.endswith("ON CONFLICT (ticker) DO UPDATE SET name = EXCLUDED.name")
+    assert db.copies[0] == [["AAPL", "Apple Inc."]]
+
+
+def test_key_only_file_does_not_overwrite_rows(db, tmp_path):
+    path = _write_csv(tmp_path / "fundamentals.csv", ["ticker", "report_date", "report_type"],
+                      [["AAPL", "2024-03-31", "10-Q"]])
+    bulk_load.load_file("fundamentals", path)
+    merge = next(s for s in db.statements if s.startswith("INSERT INTO financial_data"))
+    assert merge.endswith("ON CONFLICT (company_id, report_date, report_type) DO NOTHING")
+
+
+def test_news_links_keep_missing_sentiment_columns():
+    statements = bulk_load.DATASETS["news"].merge_statements(
+        ["ticker", "url", "published_at", "title", "source", "relevance_score"]
+    )
+    assert statements[0].endswith(
+        "ON CONFLICT (url) DO UPDATE SET published_at = EXCLUDED.published_at, "
+        "title = EXCLUDED.title, source = EXCLUDED.source"
+    )
+    assert statements[1].endswith(
+        "DO UPDATE SET published_at = EXCLUDED.published_at, relevance_score = EXCLUDED.relevance_score"
+    )
+
+
+def test_interrupted_load_resumes_after_last_merged_chunk(db, tmp_path):
+    path = _write_csv(tmp_path / "companies.csv", ["ticker", "name"], [[f"T{i}", f"Co {i}"] for i in range(5)])
+
+    db.fail_on_merge = 2
+    with pytest.raises(RuntimeError, match="connection lost"):
+        bulk_load.load_file("companies", path, chunk_size=2)
+    assert db.rollbacks == 1
+
+    db.fail_on_merge = None
+    db.copies.clear()
+    summary = bulk_load.load_file("companies", path, chunk_size=2)
+    assert summary["chunks_skipped"] == 1
+    assert [row[0] for chunk in db.copies for row in chunk] == ["T2", "T3", "T4"]
+
+    # A completed file is not merged again, and a different chunk size needs --restart
+    db.copies.clear()
+    assert bulk_load.load_file("companies", path, chunk_size=2)["rows_staged"] == 0
+    with pytest.raises(RuntimeError, match="--restart"):
+        bulk_load.load_file("companies", path, chunk_size=3)
+    assert bulk_load.load_file("companies", path, chunk_size=3, restart=True)["rows_staged"] == 5
+
+
+def test_missing_required_columns(db, tmp_path):
+    path = _write_csv(tmp_path / "fundamentals.csv", ["ticker", "revenue"], [["AAPL", "1"]])
+    with pytest.raises(ValueError, match="report_date, report_type"):
+        bulk_load.load_file("fundamentals", path)
+
+
+def test_unsupported_file_type(db, tmp_path):
+    path = tmp_path / "companies.json"
+    path.write_text("[]")
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        bulk_load.load_file("companies", str(path))
+
+
+# -- partial re-load against Postgres -----------------------------------------
+
+TICKER = "BL9901"
+
+
+def _postgres_available():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1 FROM bulk_load_progress LIMIT 1"))
+        return True
+    except Exception:
+        return False
+    finally:
+        engine.dispose()
+
+
+def _delete_test_rows():
+    with engine.begin() as conn:
+        params = {"ticker": TICKER}
+        conn.execute(text(
+            "DELETE FROM financial_data WHERE company_id IN "
+            "(SELECT id FROM companies WHERE ticker = :ticker)"
+        ), params)
+        conn.execute(text("DELETE FROM companies WHERE ticker = :ticker"), params)
+
+
+@pytest.mark.skipif(not _postgres_available(), reason="needs a Postgres database with the Aurora schema")
+def test_partial_reload_keeps_stored_values(tmp_path):
+    full = tmp_path / "full"
+    partial = tmp_path / "partial"
+    full.mkdir()
+    partial.mkdir()
+    _delete_test_rows()
+    try:
+        bulk_load.load_file("companies", _write_csv(
+            full / "companies.csv", ["ticker", "name", "sector"], [[TICKER, "Bulk Test", "Technology"]]
+        ))
+        bulk_load.load_file("fundamentals", _write_csv(
+            full / "fundamentals.csv", ["ticker", "report_date", "report_type", "revenue", "net_income"],
+            [[TICKER, "2024-03-31", "10-Q", "100", "10"]],
+        ))
+        # Files that leave sector and net_income out
+        bulk_load.load_file("companies", _write_csv(
+            partial / "companies.csv", ["ticker", "name"], [[TICKER, "Bulk Test Renamed"]]
+        ))
+        bulk_load.load_file("fundamentals", _write_csv(
+            partial / "fundamentals.csv", ["ticker", "report_date", "report_type", "revenue"],
+            [[TICKER, "2024-03-31", "10-Q", "120"]],
+        ))
+
+        with engine.connect() as conn:
+            company = conn.execute(
+                text("SELECT name, sector FROM companies WHERE ticker = :ticker"), {"ticker": TICKER}
+            ).one()
+            period = conn.execute(text(
+                "SELECT f.revenue, f.net_income FROM financial_data f "
+                "JOIN companies c ON c.id = f.company_id WHERE c.ticker = :ticker"
+            ), {"ticker": TICKER}).one()
+        assert tuple(company) == ("Bulk Test Renamed", "Technology")
+        assert (float(period.revenue), float(period.net_income)) == (120.0, 10.0)
+    finally:
+        _delete_test_rows()
+        with engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM bulk_load_progress WHERE source LIKE :prefix"),
+                {"prefix": f"{tmp_path.resolve()}%"},
+            )
+        engine.dispose()
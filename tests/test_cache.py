@@ -0,0 +1,140 @@
+"""Tests for the provider response cache."""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from aurora.providers import cache as cache_module
+from aurora.providers.cache import ProviderCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ProviderCache(ttl=60, cache_dir=None, enabled=True)
+    cache.set(("yahoo", "info", "AAPL"), {"longName": "Apple"})
+    clock.now += 59
+    assert cache.get(("yahoo", "info", "AAPL")) == {"longName": "Apple"}
+    clock.now += 1
+    assert cache.get(("yahoo", "info", "AAPL"), "expired") == "expired"
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ProviderCache(ttl=60, max_entries=2, cache_dir=None, enabled=True)
+    cache.set(("yahoo", "info", "A"), 1)
+    cache.set(("yahoo", "info", "B"), 2)
+    assert cache.get(("yahoo", "info", "A")) == 1  # A is now the most recent
+    cache.set(("yahoo", "info", "C"), 3)
+    assert cache.get(("yahoo", "info", "B")) is None
+    assert cache.get(("yahoo", "info", "A")) == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_entries_survive_a_new_cache(clock, tmp_path):
+    ProviderCache(ttl=60, cache_dir=str(tmp_path), enabled=True).set(("yahoo", "info", "AAPL"), [1, 2])
+
+    reloaded = ProviderCache(ttl=60, cache_dir=str(tmp_path), enabled=True)
+    assert reloaded.get(("yahoo", "info", "AAPL")) == [1, 2]
+    assert reloaded.stats()["disk_hits"] == 1
+
+    clock.now += 61
+    expired = ProviderCache(ttl=60, cache_dir=str(tmp_path), enabled=True)
+    assert expired.get(("yahoo", "info", "AAPL")) is None
+    assert list(tmp_path.glob("*.pkl")) == []
+
+
+def test_corrupt_disk_entry_is_a_miss(clock, tmp_path):
+    cache = ProviderCache(ttl=60, cache_dir=str(tmp_path), enabled=True)
+    cache.set(("yahoo", "info", "AAPL"), "value")
+    for path in tmp_path.glob("*.pkl"):
+        path.write_bytes(b"not a pickle")
+    assert ProviderCache(ttl=60, cache_dir=str(tmp_path), enabled=True).get(("yahoo", "info", "AAPL")) is None
+
+
+def test_get_or_fetch_loads_once(clock):
+    cache = ProviderCache(ttl=60, cache_dir=None, enabled=True)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return "fresh"
+
+    async def fetch_twice():
+        return [await cache.get_or_fetch(("yahoo", "info", "AAPL"), loader) for _ in range(2)]
+
+    assert asyncio.run(fetch_twice()) == ["fresh", "fresh"]
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_share_one_load(clock):
+    cache = ProviderCache(ttl=60, cache_dir=None, enabled=True)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "fresh"
+
+    async def fetch_concurrently():
+        return await asyncio.gather(*(cache.get_or_fetch(("yahoo", "info", "AAPL"), loader) for _ in range(5)))
+
+    assert asyncio.run(fetch_concurrently()) == ["fresh"] * 5
+    assert len(calls) == 1
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached(clock):
+    cache = ProviderCache(ttl=60, cache_dir=None, enabled=True)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ConnectionError("provider down")
+
+    async def fetch_concurrently():
+        return await asyncio.gather(
+            *(cache.get_or_fetch(("yahoo", "info", "AAPL"), loader) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(fetch_concurrently())
+    assert [type(result) for result in results] == [ConnectionError] * 3
+    assert len(calls) == 1
+    assert cache.get(("yahoo", "info", "AAPL")) is None
+
+
+def test_empty_frames_are_not_cached(clock):
+    cache = ProviderCache(ttl=60, cache_dir=None, enabled=True)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return pd.DataFrame() if len(calls) == 1 else pd.DataFrame({"Total Revenue": [1.0]})
+
+    async def fetch_twice():
+        return [await cache.get_or_fetch(("yahoo", "quarterly_financials", "AAPL"), loader) for _ in range(2)]
+
+    empty, loaded = asyncio.run(fetch_twice())
+    assert empty.empty and not loaded.empty
+    assert len(calls) == 2
+
+
+def test_disabled_cache_always_loads(clock, tmp_path):
+    cache = ProviderCache(ttl=60, cache_dir=str(tmp_path), enabled=False)
+    cache.set(("yahoo", "info", "AAPL"), "value")
+    assert cache.get(("yahoo", "info", "AAPL")) is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,202 @@
+"""Tests for DataIngestionAgent: statement parsing and the per-ticker SQL budget.
+
+The budget test replays a provider recording built here, so it needs no
+network, but it does write to the configured Postgres database and is
+skipped when none is reachable.
+"""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects import postgresql
+
+from aurora.agents.data_ingestion import _STATEMENT_ROWS, DataIngestionAgent, statements_to_records
+from aurora.database import AsyncSessionLocal, async_engine, sql_profiler
+from aurora.models import (
+    Company, FinancialData, IngestionWatermark, NewsArticle, NewsArticleCompany,
+)
+from aurora.providers.recording import ProviderRecording
+
+PERIODS = pd.DatetimeIndex(["2024-03-31", "2023-12-31", "2023-09-30"])
+
+
+def _statement(name, scale=1.0):
+    rows = list(_STATEMENT_ROWS[name]) + ["Unmapped Line Item"]
+    values = [[scale * (i + 1) * (j + 1) for j in range(len(PERIODS))] for i in range(len(rows))]
+    return pd.DataFrame(values, index=rows, columns=PERIODS)
+
+
+def test_statements_to_records():
+    balance = _statement("balance_sheet")
+    balance.loc["Total Assets", PERIODS[1]] = None
+    records = statements_to_records(_statement("financials"), balance, pd.DataFrame(), "10-Q")
+
+    assert [r["report_date"] for r in records] == [date(2024, 3, 31), date(2023, 12, 31), date(2023, 9, 30)]
+    latest = records[0]
+    assert latest["report_type"] == "10-Q"
+    assert latest["revenue"] == 1.0
+    assert latest["eps_diluted"] == 5.0
+    assert latest["current_liabilities"] == 6.0
+    assert records[1]["total_assets"] is None
+    # Statements that came back empty leave their columns None
+    assert latest["operating_cash_flow"] is None
+    assert "Unmapped Line Item" not in latest
+
+
+def test_statements_to_records_without_data():
+    assert statements_to_records(pd.DataFrame(), None, pd.DataFrame(), "10-K") == []
+
+
+class _ReturningSession:
+    """Records statements and returns the given ``RETURNING`` flags."""
+
+    def __init__(self, flags):
+        self.flags = flags
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.flags))
+
+
+def test_unchanged_financial_rows_are_not_rewritten():
+    records = [
+        {"report_date": date(2024, 3, 31), "report_type": "10-Q", "revenue": 2.0, "net_income": None},
+        {"report_date": date(2023, 12, 31), "report_type": "10-Q", "revenue": 1.0, "net_income": 0.5},
+    ]
+    # The upsert returns one row: the other was left alone by the WHERE clause
+    session = _ReturningSession([False])
+    agent = DataIngestionAgent({"alpha_vantage_key": "test"})
+    counts = asyncio.run(agent.store_financial_data(7, records, session=session))
+
+    assert counts == {"inserted": 0, "updated": 1, "unchanged": 1}
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert (
+        "WHERE (coalesce(excluded.net_income, financial_data.net_income), "
+        "coalesce(excluded.revenue, financial_data.revenue)) "
+        "IS DISTINCT FROM (financial_data.net_income, financial_data.revenue)"
+    ) in sql
+
+
+def test_stage_summary_since_baseline():
+    agent = DataIngestionAgent({"alpha_vantage_key": "test"})
+    for seconds in (0.02, 0.3):
+        agent.metrics.observe("stage_seconds", seconds, agent=agent.name, stage="summary_test")
+    baseline = agent.stage_counts()
+    agent.metrics.observe("stage_seconds", 2.0, agent=agent.name, stage="summary_test")
+
+    cumulative = agent.stage_summary()["summary_test"]
+    assert cumulative["count"] == 3
+    assert agent.stage_summary(since=baseline)["summary_test"] == {
+        "count": 1, "sum": 2.0, "p50": 2.5, "p99": 2.5,
+    }
+    # Stages with nothing new since the baseline are left out
+    assert "summary_test" not in agent.stage_summary(since=agent.stage_counts())
+
+
+# -- statement budget against a replayed recording ---------------------------
+
+TICKERS = ["BX9901", "BX9902", "BX9903"]
+NEWS_PER_TICKER = 20
+NEWS_LIMIT = 50
+# Statements one ticker may issue, and how often one statement shape may
+# repeat within it; per-row queries (N+1) blow through both
+MAX_STATEMENTS_PER_TICKER = 20
+MAX_REPEATS_PER_TICKER = 3
+
+
+def _postgres_available():
+    async def ping():
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1 FROM ingestion_watermarks LIMIT 1"))
+            return True
+        except Exception:
+            return False
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(ping())
+
+
+def _news_feed(ticker):
+    published = datetime(2024, 5, 1, 9, tzinfo=timezone.utc)
+    return {"feed": [
+        {
+            "title": f"{ticker} headline {i}",
+            "url": f"https://bench.example/{ticker}/{i}",
+            "source": "Test Wire",
+            "summary": "",
+            "time_published": (published + timedelta(minutes=i)).strftime("%Y%m%dT%H%M%S"),
+            "overall_sentiment_score": 0.1,
+            "overall_sentiment_label": "Neutral",
+            "ticker_sentiment": [{
+                "ticker": ticker, "relevance_score": "0.8",
+                "ticker_sentiment_score": "0.25", "ticker_sentiment_label": "Somewhat-Bullish",
+            }],
+        }
+        for i in range(NEWS_PER_TICKER)
+    ]}
+
+
+async def _record_fixture(path):
+    """Write a recording with every provider call ingesting ``TICKERS`` makes."""
+    recording = ProviderRecording(str(path), "record")
+
+    async def record(provider, endpoint, key, value):
+        async def loader():
+            return value
+        await recording.call(provider, endpoint, key, loader)
+
+    for ticker in TICKERS:
+        await record("yahoo", "info", ticker, {
+            "longName": f"{ticker} Test Corp", "sector": "Technology", "industry": "Testing",
+            "country": "United States", "currency": "USD", "marketCap": 10**10,
+        })
+        await record("yahoo", "quarterly_financials", ticker, _statement("financials", 1e6))
+        await record("yahoo", "quarterly_balance_sheet", ticker, _statement("balance_sheet", 1e7))
+        await record("yahoo", "quarterly_cashflow", ticker, _statement("cashflow", 1e6))
+        params = {"function": "NEWS_SENTIMENT", "tickers": ticker, "limit": str(NEWS_LIMIT)}
+        # First run asks for the latest feed; later runs page forward from the watermark
+        await record("alpha_vantage", "NEWS_SENTIMENT", {**params, "sort": "LATEST"}, _news_feed(ticker))
+        await record("alpha_vantage", "NEWS_SENTIMENT", {**params, "sort": "EARLIEST"}, _news_feed(ticker))
+    recording.close()
+
+
+async def _delete_test_rows():
+    async with AsyncSessionLocal() as session:
+        company_ids = select(Company.id).where(Company.ticker.in_(TICKERS))
+        await session.execute(delete(NewsArticleCompany).where(NewsArticleCompany.company_id.in_(company_ids)))
+        await session.execute(delete(NewsArticle).where(NewsArticle.url.like("https://bench.example/BX99%")))
+        await session.execute(delete(FinancialData).where(FinancialData.company_id.in_(company_ids)))
+        await session.execute(delete(IngestionWatermark).where(IngestionWatermark.company_id.in_(company_ids)))
+        await session.execute(delete(Company).where(Company.ticker.in_(TICKERS)))
+        await session.commit()
+
+
+@pytest.mark.skipif(not _postgres_available(), reason="needs a Postgres database with the Aurora schema")
+def test_replayed_ingestion_stays_within_statement_budget(tmp_path):
+    asyncio.run(_record_fixture(tmp_path))
+    recording = ProviderRecording(str(tmp_path), "replay", speed=0)
+    agent = DataIngestionAgent({"recording": recording, "news_feed_limit": NEWS_LIMIT, "news_batch": False})
+
+    async def ingest_twice():
+        try:
+            await _delete_test_rows()
+            # A fresh load, then an incremental re-run where every row is unchanged
+            for _ in range(2):
+                with sql_profiler.profile(async_engine):
+                    results = await agent.run(TICKERS)
+                assert {r["status"] for r in results.values()} == {"ok"}
+                sql_profiler.assert_budget(
+                    MAX_STATEMENTS_PER_TICKER, unit="ticker", max_repeats=MAX_REPEATS_PER_TICKER
+                )
+        finally:
+            await _delete_test_rows()
+            await async_engine.dispose()
+
+    asyncio.run(ingest_twice())
+    assert recording.stats["misses"] == 0
@@ -0,0 +1,151 @@
+"""Tests for the vectorized derived-metric computation and what a refresh recomputes."""
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from aurora.analytics.fundamentals import (
+    INPUT_COLUMNS, RATIO_COLUMNS, _input_hash_query, compute_derived_metrics, refresh_financial_metrics,
+)
+
+
+def _periods(company_id, report_type, dates, **columns):
+    frame = pd.DataFrame({
+        "company_id": company_id,
+        "report_type": report_type,
+        "report_date": pd.to_datetime(dates).date,
+    })
+    for column in INPUT_COLUMNS:
+        frame[column] = columns.get(column, [None] * len(dates))
+    return frame
+
+
+QUARTERS = ["2023-03-31", "2023-06-30", "2023-09-30", "2023-12-31", "2024-03-31"]
+
+
+def _frame():
+    quarterly = _periods(
+        1, "10-Q", QUARTERS,
+        revenue=[100, 110, 120, 130, 150],
+        net_income=[10, 10, 10, 20, 30],
+        eps_diluted=[1.0, 1.0, 1.0, 2.0, 3.0],
+        market_cap=[None, None, None, None, 7000],
+        total_equity=[500, 500, 500, 500, 0],
+        total_liabilities=[250, 250, 250, 250, 300],
+        current_assets=[300, 300, 300, 300, 300],
+        current_liabilities=[200, 200, 200, 200, 150],
+    )
+    annual = _periods(2, "10-K", ["2022-12-31", "2023-12-31"], revenue=[1000, 1200], net_income=[100, -50])
+    frame = pd.concat([annual, quarterly], ignore_index=True)
+    frame.insert(0, "id", range(1, len(frame) + 1))
+    return frame
+
+
+def test_ttm_and_growth():
+    _, metrics = compute_derived_metrics(_frame())
+    quarters = metrics[metrics["company_id"] == 1].reset_index(drop=True)
+    assert quarters["revenue_ttm"].isna().tolist() == [True, True, True, False, False]
+    assert quarters["revenue_ttm"].iloc[-1] == 510
+    assert quarters["net_income_ttm"].iloc[-1] == 70
+    assert quarters["eps_diluted_ttm"].iloc[-1] == 7.0
+    assert quarters["revenue_growth_qoq"].iloc[-1] == pytest.approx(0.1538)
+    assert quarters["revenue_growth_yoy"].iloc[-1] == pytest.approx(0.5)
+    assert quarters["eps_growth_yoy"].iloc[-1] == pytest.approx(2.0)
+
+    annual = metrics[metrics["company_id"] == 2].reset_index(drop=True)
+    assert annual["revenue_ttm"].tolist() == [1000, 1200]
+    assert annual["revenue_growth_yoy"].iloc[1] == pytest.approx(0.2)
+    assert annual["net_income_growth_yoy"].iloc[1] == pytest.approx(-1.5)
+    assert math.isnan(annual["revenue_growth_qoq"].iloc[1])
+
+
+def test_ratios_skip_non_positive_denominators():
+    frame = _frame()
+    ratios, _ = compute_derived_metrics(frame)
+    latest = ratios.set_index("id").loc[frame["id"].iloc[-1]]
+    assert latest["pe_ratio"] == 100.0
+    assert math.isnan(latest["price_to_book"])  # zero equity
+    assert math.isnan(latest["debt_to_equity"])
+    assert latest["current_ratio"] == 2.0
+    earlier = ratios.set_index("id").loc[frame["id"].iloc[3]]
+    assert earlier["debt_to_equity"] == 0.5
+    assert math.isnan(earlier["pe_ratio"])  # no market cap
+
+
+def test_gap_in_quarters_breaks_ttm():
+    frame = _periods(1, "10-Q", ["2023-03-31", "2023-06-30", "2023-12-31", "2024-03-31"], revenue=[1, 2, 3, 4])
+    frame.insert(0, "id", range(1, 5))
+    _, metrics = compute_derived_metrics(frame)
+    assert metrics["revenue_ttm"].isna().all()
+    assert metrics["revenue_growth_qoq"].isna().tolist() == [True, False, True, False]
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_input_hash_leaves_out_market_cap():
+    sql = _sql(_input_hash_query())
+    assert "financial_data.total_equity" in sql
+    assert "market_cap" not in sql
+
+
+class RefreshSession:
+    """Answers the refresh's SELECTs from fixtures and records its writes."""
+
+    def __init__(self, hashes, stored_hashes, periods, market_rows):
+        self.answers = {"hashes": hashes, "stored": stored_hashes, "periods": periods, "market": market_rows}
+        self.writes = []
+
+    async def execute(self, stmt, params=None):
+        sql = _sql(stmt)
+        if "md5(" in sql:
+            rows = self.answers["hashes"]
+        elif "FROM financial_metrics_inputs" in sql:
+            rows = self.answers["stored"]
+        elif "financial_data.market_cap IS NOT NULL" in sql:
+            rows = self.answers["market"]
+        elif sql.startswith("SELECT financial_data.id"):
+            rows = self.answers["periods"]
+        else:
+            rows = []
+            self.writes.append((sql, params, stmt))
+        return SimpleNamespace(all=lambda: rows, rowcount=len(params) if params else 1)
+
+    async def commit(self):
+        pass
+
+
+def test_price_move_only_refreshes_market_cap_ratios():
+    annual = _frame()
+    annual = annual[annual["company_id"] == 2]
+    for column in RATIO_COLUMNS:
+        annual[column] = None
+    session = RefreshSession(
+        hashes=[(1, "same"), (2, "new")],
+        stored_hashes=[(1, "same"), (2, "old")],
+        periods=list(annual[["id", "company_id", "report_date", "report_type", *INPUT_COLUMNS, *RATIO_COLUMNS]]
+                     .itertuples(index=False)),
+        # Company 1's statements are unchanged but its market cap moved from 7000;
+        # company 2's row is recomputed in full instead
+        market_rows=[
+            (10, 1, 8000, 400, 80, 87.5, 17.5),
+            (20, 2, 9000, 100, 10, None, None),
+        ],
+    )
+    stats = asyncio.run(refresh_financial_metrics(session))
+
+    assert stats["companies"] == 1
+    assert stats["market_ratios_updated"] == 1
+    market_updates = [(sql, params) for sql, params, _ in session.writes if sql.startswith("UPDATE financial_data")]
+    assert len(market_updates) == 1
+    sql, params = market_updates[0]
+    assert "debt_to_equity" not in sql
+    assert params == [{"row_id": 10, "new_pe_ratio": 100.0, "new_price_to_book": 20.0}]
+    # Only the recomputed company's hash is stored
+    stored = next(stmt for sql, _, stmt in session.writes if sql.startswith("INSERT INTO financial_metrics_inputs"))
+    literal = str(stored.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "VALUES (2, 'new')" in literal
@@ -0,0 +1,171 @@
+"""Tests for the Postgres job queue statements, run against a recording session."""
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from aurora import jobs
+from aurora.jobs import JobWorker, claim_jobs, complete_job, enqueue_jobs, fail_job, renew_leases, retry_delay
+
+
+class _Result(SimpleNamespace):
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class RecordingSession:
+    def __init__(self, rowcount=1, rows=()):
+        self.rowcount = rowcount
+        self.rows = [SimpleNamespace(_mapping=row) for row in rows]
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(rowcount=self.rowcount, rows=self.rows)
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _job(**overrides):
+    return {"id": 7, "ticker": "AAPL", "attempts": 1, "max_attempts": 3, "interval_seconds": None, **overrides}
+
+
+def test_claim_leases_due_jobs_skipping_locked_rows():
+    claimed = {"id": 7, "ticker": "AAPL", "attempts": 1, "max_attempts": 5, "interval_seconds": 3600}
+    session = RecordingSession(rows=[claimed])
+    jobs = asyncio.run(claim_jobs(session, "worker-1", limit=10, lease_seconds=300))
+
+    assert jobs == [claimed]
+    sql = _sql(session.statements[0])
+    assert sql.startswith("UPDATE ingestion_jobs SET status='running'")
+    assert "locked_by='worker-1'" in sql
+    assert "attempts=(ingestion_jobs.attempts + 1)" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY ingestion_jobs.priority DESC, ingestion_jobs.next_run_at" in sql
+    assert "LIMIT 10" in sql
+    # Due: queued and scheduled, or running with an expired lease
+    assert "ingestion_jobs.status = 'queued' AND ingestion_jobs.next_run_at <= now()" in sql
+    assert "ingestion_jobs.status = 'running' AND ingestion_jobs.locked_at < now() -" in sql
+    assert "RETURNING ingestion_jobs.id, ingestion_jobs.ticker" in sql
+
+
+def test_renew_only_touches_own_running_leases():
+    session = RecordingSession(rowcount=2)
+    assert asyncio.run(renew_leases(session, "worker-1", [1, 2])) == 2
+    sql = _sql(session.statements[0])
+    assert "SET locked_at=now()" in sql
+    assert "ingestion_jobs.id IN (1, 2)" in sql
+    assert "ingestion_jobs.locked_by = 'worker-1'" in sql
+    assert "ingestion_jobs.status = 'running'" in sql
+
+    idle = RecordingSession()
+    assert asyncio.run(renew_leases(idle, "worker-1", [])) == 0
+    assert idle.statements == []
+
+
+def test_complete_reports_whether_the_lease_was_still_held():
+    session = RecordingSession(rowcount=1)
+    assert asyncio.run(complete_job(session, _job(), "worker-1"))
+    sql = _sql(session.statements[0])
+    assert "ingestion_jobs.id = 7 AND ingestion_jobs.locked_by = 'worker-1'" in sql
+    assert "locked_by=NULL" in sql and "attempts=0" in sql
+
+    assert not asyncio.run(complete_job(RecordingSession(rowcount=0), _job(), "worker-1"))
+
+
+def test_complete_requeues_from_the_stored_interval():
+    session = RecordingSession()
+    asyncio.run(complete_job(session, _job(interval_seconds=60), "worker-1"))
+    sql = _sql(session.statements[0])
+    # The refresh policy may change interval_seconds while the job runs
+    assert "make_interval(0, 0, 0, 0, 0, 0, ingestion_jobs.interval_seconds)" in sql
+    assert "WHEN (ingestion_jobs.interval_seconds IS NOT NULL) THEN 'queued' ELSE 'done'" in sql
+
+
+def test_fail_retries_then_gives_up():
+    session = RecordingSession()
+    assert asyncio.run(fail_job(session, _job(), "worker-1", "boom" * 1000)) == "queued"
+    sql = _sql(session.statements[0])
+    assert "status='queued'" in sql
+    assert "ingestion_jobs.locked_by = 'worker-1'" in sql
+    # Errors are truncated to fit the row
+    assert "boom" * 500 in sql and "boom" * 501 not in sql
+
+    assert asyncio.run(fail_job(RecordingSession(), _job(attempts=3), "worker-1", "boom")) == "failed"
+    # Recurring jobs skip to their next interval instead of failing for good
+    recurring = RecordingSession()
+    assert asyncio.run(fail_job(recurring, _job(attempts=3, interval_seconds=600), "w", "boom")) == "queued"
+    assert "attempts=0" in _sql(recurring.statements[0])
+
+
+def test_enqueue_keeps_adaptive_intervals():
+    def enqueue_sql(adaptive):
+        session = RecordingSession()
+        asyncio.run(enqueue_jobs(["aapl"], interval_seconds=3600, session=session, adaptive=adaptive))
+        return _sql(session.statements[0])
+
+    assert "interval_seconds = coalesce(ingestion_jobs.interval_seconds, excluded.interval_seconds)" in (
+        enqueue_sql(adaptive=True)
+    )
+    assert "interval_seconds = excluded.interval_seconds" in enqueue_sql(adaptive=False)
+
+
+def test_fail_reports_a_lost_lease():
+    assert asyncio.run(fail_job(RecordingSession(rowcount=0), _job(), "worker-1", "boom")) == "lost"
+
+
+def test_retry_delay_is_capped_with_jitter():
+    for attempts in range(1, 12):
+        delay = retry_delay(attempts, base=10, cap=300)
+        ceiling = min(300, 10 * 2 ** (attempts - 1))
+        assert ceiling / 2 <= delay <= ceiling
+
+
+class _WorkerSession(RecordingSession):
+    """Session handed out by a fake ``AsyncSessionLocal``; fails renewals on demand."""
+
+    def __init__(self, db):
+        super().__init__(rows=db.claimable)
+        self.db = db
+        db.claimable = []
+
+    async def execute(self, stmt):
+        sql = _sql(stmt)
+        if "SET locked_at=now()" in sql:
+            self.db.renewals += 1
+            if self.db.renewals <= self.db.failing_renewals:
+                raise ConnectionError("database went away")
+        self.db.statements.append(sql)
+        return await super().execute(stmt)
+
+    async def commit(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _SlowAgent:
+    async def run(self, tickers):
+        await asyncio.sleep(0.05)
+        return {ticker: {"status": "ok"} for ticker in tickers}
+
+
+def test_worker_survives_failed_lease_renewals(monkeypatch):
+    db = SimpleNamespace(
+        claimable=[_job(attempts=0)], renewals=0, failing_renewals=2, statements=[],
+    )
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", lambda: _WorkerSession(db))
+    # Renews every 10ms while the 50ms ingestion runs
+    worker = JobWorker(worker_id="worker-1", lease_seconds=0.03, agent=_SlowAgent(), adaptive=False)
+
+    assert asyncio.run(worker.run_once()) == 1
+    # The first renewals failed and were retried; the job still completed
+    assert db.renewals > db.failing_renewals
+    assert any("SET locked_at=now()" in sql for sql in db.statements)
+    assert worker.stats["completed"] == 1
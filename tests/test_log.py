@@ -0,0 +1,117 @@
+"""Tests for the structured logging pipeline's filters and formatters."""
+import asyncio
+import json
+import logging
+
+import pytest
+
+from aurora import log as log_module
+from aurora.agents.base import BaseAgent
+from aurora.log import ContextFilter, JsonFormatter, SamplingFilter, TextFormatter, log_context, parse_level
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(log_module, "time", clock)
+    return clock
+
+
+def _record(msg, level=logging.WARNING, name="AuroraTest", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, (), None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_parse_level():
+    assert parse_level("WARN") == logging.WARNING
+    assert parse_level("info") == logging.INFO
+    assert parse_level(logging.ERROR) == logging.ERROR
+    assert parse_level("nonsense") == logging.INFO
+
+
+def test_sampling_passes_a_burst_per_window_and_reports_suppressed(clock):
+    sampler = SamplingFilter(window=60, burst=2)
+    passed = [sampler.filter(_record("Error processing news item")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    clock.now += 60
+    record = _record("Error processing news item")
+    assert sampler.filter(record)
+    assert record.suppressed == 3
+
+
+def test_sampling_groups_by_sample_key(clock):
+    sampler = SamplingFilter(window=60, burst=1)
+    # Different messages, one key: sampled together
+    assert sampler.filter(_record("bad item 1", sample_key="news_item"))
+    assert not sampler.filter(_record("bad item 2", sample_key="news_item"))
+    # Different keys and plain messages are sampled separately
+    assert sampler.filter(_record("bad item 3", sample_key="other"))
+    assert sampler.filter(_record("bad item 4"))
+
+
+def test_sampling_ignores_lower_levels_and_can_be_disabled(clock):
+    sampler = SamplingFilter(window=60, burst=1)
+    assert all(sampler.filter(_record("progress", level=logging.INFO)) for _ in range(10))
+    disabled = SamplingFilter(window=60, burst=0)
+    assert all(disabled.filter(_record("same warning")) for _ in range(10))
+
+
+def test_context_fields_are_task_local():
+    context_filter = ContextFilter()
+    seen = {}
+
+    async def ingest(ticker):
+        with log_context(run_id="r1", ticker=ticker):
+            await asyncio.sleep(0)
+            record = _record("stored", level=logging.INFO)
+            context_filter.filter(record)
+            seen[ticker] = record.fields
+
+    async def main():
+        await asyncio.gather(ingest("AAPL"), ingest("MSFT"))
+
+    asyncio.run(main())
+    assert seen == {"AAPL": {"run_id": "r1", "ticker": "AAPL"}, "MSFT": {"run_id": "r1", "ticker": "MSFT"}}
+    record = _record("outside", level=logging.INFO)
+    context_filter.filter(record)
+    assert not hasattr(record, "fields")
+
+
+def test_formatters_render_fields():
+    record = _record("Stored %d items", level=logging.INFO, fields={"ticker": "AAPL"}, sample_key="k")
+    record.args = (3,)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Stored 3 items"
+    assert entry["ticker"] == "AAPL"
+    assert entry["level"] == "INFO"
+    assert "sample_key" not in entry
+    assert TextFormatter().format(record).endswith("INFO - AuroraTest: Stored 3 items ticker=AAPL")
+
+
+class _IdleAgent(BaseAgent):
+    async def initialize(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def run(self):
+        pass
+
+
+def test_creating_an_agent_leaves_logging_unconfigured(monkeypatch):
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", [])
+    _IdleAgent("Idle")
+    assert root.handlers == []
@@ -0,0 +1,142 @@
+"""Tests for incremental news fetching against a fake Alpha Vantage feed."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from aurora.agents.data_ingestion import DataIngestionAgent, format_time_from
+
+START = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _article(i, ticker="AAPL"):
+    published = START + timedelta(minutes=i)
+    return {
+        "title": f"Article {i}",
+        "url": f"https://news.example/{ticker}/{i}",
+        "source": "Example",
+        "summary": "",
+        "time_published": published.strftime("%Y%m%dT%H%M%S"),
+        "overall_sentiment_score": 0.1,
+        "overall_sentiment_label": "Neutral",
+        "ticker_sentiment": [
+            {"ticker": ticker, "relevance_score": "0.9", "ticker_sentiment_score": "0.2",
+             "ticker_sentiment_label": "Neutral"},
+        ],
+    }
+
+
+class FakeFeed:
+    """Serves NEWS_SENTIMENT requests from a fixed article list."""
+
+    def __init__(self, articles):
+        self.articles = articles
+        self.requests = []
+
+    async def __call__(self, params):
+        self.requests.append(dict(params))
+        items = self.articles
+        if "time_from" in params:
+            items = [a for a in items if a["time_published"][:13] >= params["time_from"]]
+        if params.get("tickers"):
+            items = [a for a in items if any(e["ticker"] == params["tickers"] for e in a["ticker_sentiment"])]
+        items = sorted(items, key=lambda a: a["time_published"], reverse=params.get("sort") != "EARLIEST")
+        return items[: int(params["limit"])]
+
+
+def _agent(feed, **config):
+    agent = DataIngestionAgent({"alpha_vantage_key": "test", "news_feed_limit": 50, **config})
+    agent.fetch_news_feed = feed
+    return agent
+
+
+def test_incremental_fetch_pages_past_the_limit():
+    feed = FakeFeed([_article(i) for i in range(120)])
+    items = asyncio.run(_agent(feed).fetch_news_sentiment("AAPL", since=START))
+
+    assert len(items) == 120
+    assert len({item["url"] for item in items}) == 120
+    assert items[0]["published_at"] > items[-1]["published_at"]  # newest first
+    assert all(request["sort"] == "EARLIEST" for request in feed.requests)
+    assert len(feed.requests) == 3
+
+
+def test_truncated_fetch_stops_at_newest_received_article():
+    feed = FakeFeed([_article(i) for i in range(120)])
+    items = asyncio.run(_agent(feed, news_max_pages=1).fetch_news_sentiment("AAPL", since=START))
+
+    # Only the oldest page arrives, so the watermark cannot skip unfetched articles
+    assert len(items) == 50
+    assert max(item["published_at"] for item in items) == START + timedelta(minutes=49)
+
+
+def test_first_fetch_requests_latest():
+    feed = FakeFeed([_article(i) for i in range(10)])
+    items = asyncio.run(_agent(feed).fetch_news_sentiment("AAPL"))
+
+    assert len(items) == 10
+    assert feed.requests == [{"tickers": "AAPL", "limit": "50", "sort": "LATEST"}]
+
+
+def test_time_from_has_minute_precision():
+    assert format_time_from(START + timedelta(seconds=42)) == "20240501T0900"
+
+
+def _batch_agent(feed):
+    return _agent(feed, news_batch_limit=50)
+
+
+def test_batch_covers_all_tickers_when_not_truncated():
+    feed = FakeFeed([_article(i, ticker) for i in range(10) for ticker in ("AAPL", "MSFT")])
+    watermarks = {"AAPL": START, "MSFT": START + timedelta(minutes=5)}
+    routed = asyncio.run(_batch_agent(feed).fetch_news_sentiment_batch(["AAPL", "MSFT"], watermarks))
+
+    assert set(routed) == {"AAPL", "MSFT"}
+    assert feed.requests[0]["time_from"] == "20240501T0900"
+
+
+def test_truncated_batch_leaves_out_tickers_behind_the_feed():
+    articles = [_article(i, "AAPL") for i in range(100)] + [_article(i, "MSFT") for i in range(90, 100)]
+    watermarks = {"AAPL": START, "MSFT": START + timedelta(minutes=95), "NVDA": None}
+    routed = asyncio.run(_batch_agent(FakeFeed(articles)).fetch_news_sentiment_batch(
+        ["AAPL", "MSFT", "NVDA"], watermarks
+    ))
+
+    # The newest 50 articles reach back to minute 60, past MSFT's watermark only
+    assert set(routed) == {"MSFT"}
+    assert len(routed["MSFT"]) == 10
+
+
+def test_batch_is_skipped_when_no_ticker_has_a_watermark():
+    feed = FakeFeed([_article(i) for i in range(10)])
+    routed = asyncio.run(_batch_agent(feed).fetch_news_sentiment_batch(["AAPL", "MSFT"], {"AAPL": None}))
+
+    # First run: every ticker fetches its own latest feed instead
+    assert routed == {}
+    assert feed.requests == []
+
+
+def test_batch_leaves_tickers_without_watermark_to_per_ticker_fetches():
+    feed = FakeFeed([_article(i, ticker) for i in range(10) for ticker in ("AAPL", "NVDA")])
+    watermarks = {"AAPL": START + timedelta(minutes=3), "NVDA": None}
+    routed = asyncio.run(_batch_agent(feed).fetch_news_sentiment_batch(["AAPL", "NVDA"], watermarks))
+
+    assert set(routed) == {"AAPL"}
+    assert feed.requests[0]["time_from"] == "20240501T0903"
+
+
+def test_batch_skips_watermarks_older_than_the_last_truncated_feed():
+    articles = [_article(i, "AAPL") for i in range(100)] + [_article(i, "MSFT") for i in range(90, 100)]
+    feed = FakeFeed(articles)
+    agent = _batch_agent(feed)
+    watermarks = {"AAPL": START, "MSFT": START + timedelta(minutes=95)}
+    asyncio.run(agent.fetch_news_sentiment_batch(["AAPL", "MSFT"], watermarks))
+
+    # The truncated feed reached back to minute 60: AAPL's watermark is out of
+    # reach, so only MSFT is batched and the window starts at its watermark
+    feed.requests.clear()
+    routed = asyncio.run(agent.fetch_news_sentiment_batch(["AAPL", "MSFT"], watermarks))
+    assert set(routed) == {"MSFT"}
+    assert feed.requests[0]["time_from"] == "20240501T1035"
+
+    feed.requests.clear()
+    assert asyncio.run(agent.fetch_news_sentiment_batch(["AAPL"], watermarks)) == {}
+    assert feed.requests == []
@@ -0,0 +1,105 @@
+"""Tests for the per-provider token-bucket rate limiter."""
+import asyncio
+
+import pytest
+
+from aurora.providers import rate_limit
+from aurora.providers.rate_limit import (
+    RateLimitExceeded,
+    TokenBucket,
+    configure_rate_limiter,
+    get_rate_limiter,
+    rate_limit_state,
+)
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket("test", requests_per_minute=60, burst=3)
+    for _ in range(3):
+        bucket.acquire_sync()
+    assert clock.slept == []
+
+    bucket.acquire_sync()
+    bucket.acquire_sync()
+    assert clock.slept == pytest.approx([1.0, 1.0])
+
+    # Idle time refills tokens, but never past the burst size
+    clock.now += 60
+    for _ in range(3):
+        bucket.acquire_sync()
+    assert len(clock.slept) == 2
+    assert bucket.state()["tokens_available"] == 0
+
+
+def test_waiting_callers_queue_behind_each_other(clock):
+    bucket = TokenBucket("test", requests_per_minute=30, burst=1)
+    # Reservations made at the same instant wait 0s, 2s, 4s
+    waits = [bucket._reserve(1) for _ in range(3)]
+    assert waits == pytest.approx([0.0, 2.0, 4.0])
+    state = bucket.state()
+    assert state["waits"] == 2
+    assert state["total_wait_seconds"] == pytest.approx(6.0)
+
+
+def test_daily_budget(clock):
+    bucket = TokenBucket("test", requests_per_day=2)
+    bucket.acquire_sync()
+    bucket.acquire_sync()
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire_sync()
+    assert bucket.state()["remaining_today"] == 0
+    assert bucket.state()["total_requests"] == 2
+
+
+def test_unlimited_bucket_never_waits(clock):
+    bucket = TokenBucket("test")
+
+    async def burst():
+        await asyncio.gather(*(bucket.acquire() for _ in range(50)))
+
+    asyncio.run(burst())
+    assert clock.slept == []
+    assert bucket.state()["remaining_today"] is None
+
+
+def test_async_acquire_sleeps_for_the_reserved_wait(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket("test", requests_per_minute=120, burst=1)
+    asyncio.run(bucket.acquire())
+    asyncio.run(bucket.acquire())
+    assert slept == pytest.approx([0.5])
+
+
+def test_registry_shares_one_bucket_per_provider():
+    bucket = configure_rate_limiter("registry-test", requests_per_minute=10, burst=2)
+    assert get_rate_limiter("registry-test") is bucket
+    assert rate_limit_state("registry-test")["registry-test"]["requests_per_minute"] == 10
+    replaced = configure_rate_limiter("registry-test", requests_per_minute=20)
+    assert get_rate_limiter("registry-test") is replaced
@@ -0,0 +1,114 @@
+"""Tests for provider record/replay."""
+import asyncio
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from aurora.providers.recording import (
+    ProviderRecording,
+    RecordedProviderError,
+    RecordingMissError,
+    _canonical_key,
+)
+
+
+def _returning(value):
+    async def loader():
+        return value
+    return loader
+
+
+def _raising(error):
+    async def loader():
+        raise error
+    return loader
+
+
+def test_canonical_key_ignores_order_and_secrets():
+    key = _canonical_key({"tickers": "AAPL", "apikey": "secret", "function": "NEWS_SENTIMENT"})
+    assert key == _canonical_key({"function": "NEWS_SENTIMENT", "tickers": "AAPL", "apikey": "other"})
+    assert "secret" not in key
+    assert _canonical_key({"a": 1, "time_from": "x"}, frozenset({"time_from"})) == _canonical_key({"a": 1})
+    assert _canonical_key("AAPL") == '"AAPL"'
+
+
+def test_secrets_are_not_written(tmp_path):
+    recording = ProviderRecording(str(tmp_path), "record")
+    asyncio.run(recording.call("alpha_vantage", "NEWS_SENTIMENT", {"apikey": "secret", "q": 1}, _returning({})))
+    recording.close()
+    with gzip.open(recording.file, "rt") as handle:
+        assert "secret" not in handle.read()
+
+
+def test_replay_matches_exact_then_loose_key(tmp_path):
+    recording = ProviderRecording(str(tmp_path), "record")
+    params = {"function": "NEWS_SENTIMENT", "tickers": "AAPL", "time_from": "20240101T0000"}
+
+    async def record():
+        await recording.call("alpha_vantage", "NEWS_SENTIMENT", params, _returning({"feed": [1]}))
+        await recording.call("alpha_vantage", "NEWS_SENTIMENT", params, _returning({"feed": [2]}))
+        with pytest.raises(ValueError):
+            await recording.call("yahoo", "info", "MSFT", _raising(ValueError("boom")))
+
+    asyncio.run(record())
+    recording.close()
+
+    replay = ProviderRecording(str(tmp_path), "replay", speed=0)
+
+    async def play():
+        # Repeated calls come back in recorded order, then the last one repeats
+        first = await replay.call("alpha_vantage", "NEWS_SENTIMENT", params, _raising(AssertionError()))
+        second = await replay.call("alpha_vantage", "NEWS_SENTIMENT", params, _raising(AssertionError()))
+        third = await replay.call("alpha_vantage", "NEWS_SENTIMENT", params, _raising(AssertionError()))
+        assert [first, second, third] == [{"feed": [1]}, {"feed": [2]}, {"feed": [2]}]
+
+        with pytest.raises(RecordedProviderError, match="ValueError: boom"):
+            await replay.call("yahoo", "info", "MSFT", _raising(AssertionError()))
+        with pytest.raises(RecordingMissError):
+            await replay.call("alpha_vantage", "NEWS_SENTIMENT", {**params, "tickers": "NVDA"}, _returning({}))
+
+    asyncio.run(play())
+    assert replay.stats == {"recorded": 0, "replayed": 4, "misses": 1}
+    assert replay.tickers() == ["MSFT"]
+
+    # A different watermark only changes time_from, which the loose key ignores
+    moved = asyncio.run(ProviderRecording(str(tmp_path), "replay", speed=0).call(
+        "alpha_vantage", "NEWS_SENTIMENT", {**params, "time_from": "20240301T0000"}, _raising(AssertionError())
+    ))
+    assert moved == {"feed": [1]}
+
+
+def test_dataframes_round_trip(tmp_path):
+    frame = pd.DataFrame(
+        [[1.5, None], [2.0, 3.0]],
+        index=["Total Revenue", "Net Income"],
+        columns=pd.DatetimeIndex(["2024-03-31", "2023-12-31"]),
+    )
+    recording = ProviderRecording(str(tmp_path), "record")
+    asyncio.run(recording.call("yahoo", "quarterly_financials", "AAPL", _returning(frame)))
+    recording.close()
+
+    replayed = asyncio.run(
+        ProviderRecording(str(tmp_path), "replay", speed=0).call(
+            "yahoo", "quarterly_financials", "AAPL", _raising(AssertionError())
+        )
+    )
+    pd.testing.assert_frame_equal(replayed, frame, check_freq=False)
+
+
+def test_truncated_recording_keeps_flushed_lines(tmp_path):
+    recording = ProviderRecording(str(tmp_path), "record")
+    asyncio.run(recording.call("yahoo", "info", "AAPL", _returning({"longName": "Apple"})))
+    recording.close()
+    data = recording.file.read_bytes()
+    recording.file.write_bytes(data + gzip.compress(json.dumps({"partial": True}).encode())[:-8])
+
+    replay = ProviderRecording(str(tmp_path), "replay", speed=0)
+    assert asyncio.run(replay.call("yahoo", "info", "AAPL", _raising(AssertionError()))) == {"longName": "Apple"}
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        ProviderRecording("unused", "live")
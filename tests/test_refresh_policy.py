@@ -0,0 +1,37 @@
+"""Tests for the adaptive refresh interval allocation."""
+from datetime import date
+
+import pytest
+
+from aurora.refresh_policy import DAY_SECONDS, allocate_intervals, report_proximity
+
+
+def _runs(intervals):
+    return {ticker: DAY_SECONDS / interval for ticker, interval in intervals.items()}
+
+
+def test_budget_split_by_score_within_bounds():
+    intervals = allocate_intervals({"HOT": 3.0, "WARM": 1.0, "COLD": 0.0}, 60, 600, 86400)
+    runs = _runs(intervals)
+    assert sum(runs.values()) == pytest.approx(60, rel=0.01)
+    assert runs["HOT"] == pytest.approx(3 * (runs["WARM"] - 1) + 1, rel=0.01)
+    assert intervals["COLD"] == 86400
+
+
+def test_capped_tickers_hand_budget_to_the_rest():
+    intervals = allocate_intervals({"A": 100.0, "B": 1.0, "C": 1.0}, 40, 3600, 86400)
+    runs = _runs(intervals)
+    assert intervals["A"] == 3600
+    assert runs["B"] == pytest.approx((40 - 24) / 2, rel=0.01)
+    assert intervals["B"] == intervals["C"]
+
+
+def test_small_budget_keeps_everyone_at_the_floor():
+    assert allocate_intervals({"A": 1.0, "B": 2.0}, 1, 600, 7200) == {"A": 7200, "B": 7200}
+    assert allocate_intervals({}, 100, 600, 7200) == {}
+
+
+def test_report_proximity_peaks_near_reporting_season():
+    far = report_proximity(date(2024, 3, 31), date(2024, 4, 5))
+    near = report_proximity(date(2024, 3, 31), date(2024, 7, 20))
+    assert 0 <= far < near <= 1
@@ -0,0 +1,97 @@
+"""Tests for the scheduler's schedules, catch-up and sharding."""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from aurora.scheduler import AsyncScheduler, CronSchedule, FixedRateSchedule, shard_items
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_shard_items_round_robin():
+    assert shard_items(list(range(7)), 3) == [[0, 3, 6], [1, 4], [2, 5]]
+    assert shard_items(["A", "B"], 5) == [["A"], ["B"]]
+    assert shard_items(["A", "B"], 0) == [["A", "B"]]
+    assert shard_items([], 4) == []
+
+
+def test_cron_steps_and_ranges():
+    schedule = CronSchedule("*/15 9-16 * * 1-5")
+    # Friday 16:50 -> Monday 09:00
+    assert schedule.next_after(_utc(2024, 5, 3, 16, 50)) == _utc(2024, 5, 6, 9, 0)
+    assert schedule.next_after(_utc(2024, 5, 6, 9, 0)) == _utc(2024, 5, 6, 9, 15)
+    assert schedule.next_after(_utc(2024, 5, 6, 9, 7, 30)) == _utc(2024, 5, 6, 9, 15)
+
+
+def test_cron_day_fields_match_either_when_both_restricted():
+    schedule = CronSchedule("0 0 1 * 0")
+    # 2024-06-01 is a Saturday, 2024-06-02 a Sunday
+    assert schedule.next_after(_utc(2024, 5, 31, 12)) == _utc(2024, 6, 1)
+    assert schedule.next_after(_utc(2024, 6, 1, 12)) == _utc(2024, 6, 2)
+
+
+def test_cron_sunday_as_seven_and_month_rollover():
+    assert CronSchedule("30 6 * * 7").next_after(_utc(2024, 5, 6)) == _utc(2024, 5, 12, 6, 30)
+    assert CronSchedule("0 0 1 1 *").next_after(_utc(2024, 3, 1)) == _utc(2025, 1, 1)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "61 * * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_cron_that_never_matches():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(_utc(2024, 1, 1))
+
+
+def test_fixed_rate_slots_ignore_run_duration():
+    schedule = FixedRateSchedule(60, start_delay=5)
+    start = _utc(2024, 1, 1, 12)
+    first = schedule.next_after(start)
+    assert first == start + timedelta(seconds=5)
+    # A run that overran two slots resumes on the grid, not 60s after it finished
+    assert schedule.next_after(first + timedelta(seconds=150)) == first + timedelta(seconds=180)
+    assert schedule.next_after(first) == first + timedelta(seconds=60)
+
+
+def test_fixed_rate_rejects_non_positive_period():
+    with pytest.raises(ValueError):
+        FixedRateSchedule(0)
+
+
+def test_fixed_rate_sub_second_slots_always_advance():
+    schedule = FixedRateSchedule(0.1)
+    # An origin whose slots round onto microsecond boundaries
+    slot = schedule.next_after(datetime.fromtimestamp(1700000461.684514, timezone.utc))
+    for _ in range(10):
+        following = schedule.next_after(slot)
+        # Microsecond rounding must never map a slot back onto itself
+        assert following > slot
+        slot = following
+
+
+def test_latest_catch_up_runs_the_newest_missed_slot():
+    scheduler = AsyncScheduler()
+    calls = []
+
+    async def task():
+        calls.append(time.time())
+        if len(calls) == 1:
+            # Block the loop past four more slots
+            time.sleep(0.45)
+        else:
+            scheduler.stop()
+
+    stats = scheduler.add_fixed_rate_task(task, 0.1, catch_up="latest")
+    asyncio.run(asyncio.wait_for(scheduler.start(), timeout=5))
+
+    assert len(calls) == 2
+    assert stats.skipped_missed >= 3
+    # Lateness is measured against the slot that ran, not the oldest missed one
+    assert stats.lateness_max < 0.1
@@ -0,0 +1,89 @@
+"""Tests for the daily sentiment aggregates."""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurora.analytics.sentiment import ROLLING_WINDOWS, compute_sentiment_daily, refresh_start_day
+
+
+def _links(rows):
+    return pd.DataFrame(
+        [
+            {"company_id": company_id, "published_at": pd.Timestamp(published, tz="UTC"), "score": score}
+            for company_id, published, score in rows
+        ]
+    )
+
+
+def _incremental(links, stored, first_new):
+    """Refresh ``stored`` the way refresh_sentiment does after new articles arrive."""
+    starts, seeds = {}, {}
+    for company_id, first_new_day in first_new.items():
+        previous = stored[stored["company_id"] == company_id]
+        last_day = previous["day"].max() if not previous.empty else None
+        starts[company_id] = refresh_start_day(first_new_day, last_day)
+        seeded = previous[(previous["day"] < starts[company_id]) & previous["ewma_sentiment"].notna()]
+        if not seeded.empty:
+            seeds[company_id] = seeded["ewma_sentiment"].iloc[-1]
+    lookback = timedelta(days=max(ROLLING_WINDOWS) - 1)
+    since = links["company_id"].map(lambda c: pd.Timestamp(starts[c] - lookback, tz="UTC"))
+    return compute_sentiment_daily(links[links["published_at"] >= since], starts, seeds, ewma_span=5)
+
+
+def _full(links):
+    days = pd.to_datetime(links["published_at"]).dt.date
+    starts = days.groupby(links["company_id"]).min().to_dict()
+    return compute_sentiment_daily(links, starts, ewma_span=5)
+
+
+def test_refresh_start_day():
+    assert refresh_start_day(date(2024, 1, 10), None) == date(2024, 1, 10)
+    assert refresh_start_day(date(2024, 1, 10), date(2024, 1, 2)) == date(2024, 1, 3)
+    assert refresh_start_day(date(2024, 1, 1), date(2024, 1, 2)) == date(2024, 1, 1)
+
+
+def test_rows_are_dense_between_news_days():
+    result = _full(_links([(1, "2024-01-01 10:00", 0.5), (1, "2024-01-04 10:00", -0.5)]))
+    assert list(result["day"]) == [date(2024, 1, d) for d in range(1, 5)]
+    assert list(result["article_count"]) == [1, 0, 0, 1]
+    assert result["mean_sentiment"].isna().tolist() == [False, True, True, False]
+    assert result["count_7d"].tolist() == [1, 1, 1, 2]
+    assert result["mean_7d"].iloc[-1] == pytest.approx(0.0)
+    # The EWMA carries over quiet days
+    assert result["ewma_sentiment"].iloc[1] == result["ewma_sentiment"].iloc[0]
+
+
+def test_incremental_after_gap_matches_full_refresh():
+    before = _links([(1, "2024-01-01 09:00", 0.2), (1, "2024-01-02 09:00", 0.6)])
+    stored = _full(before)
+    links = pd.concat([before, _links([(1, "2024-01-10 09:00", -0.4)])], ignore_index=True)
+
+    incremental = _incremental(links, stored, {1: date(2024, 1, 10)})
+    full = _full(links)
+    assert list(incremental["day"]) == [date(2024, 1, d) for d in range(3, 11)]
+    pd.testing.assert_frame_equal(
+        incremental, full[full["day"] >= date(2024, 1, 3)].reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_incremental_matches_full_refresh_on_random_history():
+    rng = np.random.default_rng(7)
+    count = 600
+    links = pd.DataFrame({
+        "company_id": rng.choice([1, 2, 3], count),
+        "published_at": pd.Timestamp("2024-01-01", tz="UTC")
+        + pd.to_timedelta(rng.integers(0, 150 * 24, count), unit="h"),
+        "score": np.where(rng.random(count) < 0.1, np.nan, rng.uniform(-1, 1, count)),
+    })
+    cutoff = pd.Timestamp("2024-04-01", tz="UTC")
+    stored = _full(links[links["published_at"] < cutoff])
+    new = links[links["published_at"] >= cutoff]
+    first_new = pd.to_datetime(new["published_at"]).dt.date.groupby(new["company_id"]).min().to_dict()
+
+    incremental = _incremental(links, stored, first_new)
+    full = _full(links)
+    starts = incremental.groupby("company_id")["day"].min()
+    expected = full[full["day"] >= full["company_id"].map(starts)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(incremental, expected, check_dtype=False)
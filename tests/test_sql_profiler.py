@@ -0,0 +1,73 @@
+"""Tests for statement normalisation and the SQL profiler, on an in-memory SQLite engine."""
+import pytest
+from sqlalchemy import create_engine, text
+
+from aurora.log import log_context
+from aurora.sql_profiler import SQLProfiler, StatementBudgetExceeded, normalize_statement
+
+
+@pytest.mark.parametrize("statement, shape", [
+    ("SELECT * FROM companies WHERE ticker = 'AAPL' AND id = 42", "SELECT * FROM companies WHERE ticker = ? AND id = ?"),
+    ("SELECT id FROM t WHERE a = $1 AND b = %(b)s AND c = :c", "SELECT id FROM t WHERE a = ? AND b = ? AND c = ?"),
+    ("SELECT x::numeric(10,3), y::text FROM t -- trailing\nWHERE z = 1.5e3", "SELECT x, y FROM t WHERE z = ?"),
+    ("SELECT * FROM t WHERE id IN ($1, $2, $3)", "SELECT * FROM t WHERE id IN (?...)"),
+    ("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4), ($5, $6)", "INSERT INTO t (a, b) VALUES (?...), ..."),
+    ("SELECT  col1,\n\t col2 FROM t2 /* hint */", "SELECT col1, col2 FROM t2"),
+])
+def test_normalize_statement(statement, shape):
+    assert normalize_statement(statement) == shape
+
+
+def test_rows_and_lists_of_any_length_share_a_shape():
+    assert normalize_statement("SELECT 1 WHERE a IN (1, 2)") == normalize_statement("SELECT 1 WHERE a IN (1, 2, 3, 4)")
+    assert normalize_statement("VALUES ($1, $2)") != normalize_statement("VALUES ($1, $2), ($3, $4)")
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, ticker TEXT)"))
+    yield engine
+    engine.dispose()
+
+
+def _per_row_lookups(engine, ticker, count):
+    with log_context(ticker=ticker, run_id="r1"), engine.connect() as conn:
+        for i in range(count):
+            conn.execute(text("SELECT id FROM items WHERE id = :id"), {"id": i})
+
+
+def test_profile_attributes_statements_to_units(engine):
+    profiler = SQLProfiler(units=("ticker", "run_id"), repeat_threshold=3)
+    with profiler.profile(engine):
+        assert profiler.retaining
+        _per_row_lookups(engine, "AAPL", 5)
+        _per_row_lookups(engine, "MSFT", 2)
+    assert not profiler.attached
+
+    assert profiler.unit_stats("ticker", "AAPL")["statements"] == 5
+    assert profiler.unit_stats("run_id", "r1")["statements"] == 7
+    assert profiler.summary()["max_statements_per_ticker"] == 5
+    suspects = profiler.repeated()
+    assert [(s["value"], s["count"]) for s in suspects] == [("AAPL", 5)]
+    assert suspects[0]["shape"] == "SELECT id FROM items WHERE id = ?"
+
+    profiler.forget("ticker", "AAPL")
+    assert profiler.unit_stats("ticker", "AAPL")["statements"] == 0
+
+
+def test_assert_budget(engine):
+    profiler = SQLProfiler(units=("ticker",))
+    with profiler.profile(engine):
+        _per_row_lookups(engine, "AAPL", 4)
+        _per_row_lookups(engine, "MSFT", 1)
+
+    profiler.assert_budget(4, unit="ticker")
+    profiler.assert_budget(1, unit="ticker", value="MSFT")
+    with pytest.raises(StatementBudgetExceeded, match="ticker=AAPL: 4 statements"):
+        profiler.assert_budget(3, unit="ticker")
+    with pytest.raises(StatementBudgetExceeded, match="repeated 4x"):
+        profiler.assert_budget(10, unit="ticker", max_repeats=2)
+    with pytest.raises(StatementBudgetExceeded):
+        profiler.assert_budget(4)